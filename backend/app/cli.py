@@ -0,0 +1,208 @@
+# backend/app/cli.py
+"""
+Maintenance commands. Run from backend/:
+
+    python -m app.cli db-upgrade [REVISION]
+    python -m app.cli db-downgrade REVISION
+    python -m app.cli db-current
+    python -m app.cli search-rebuild
+    python -m app.cli outbox-worker [--once] [--batch-size N]
+    python -m app.cli outbox-requeue-dead
+    python -m app.cli counters-reconcile
+    python -m app.cli tokens-sweep [--loop] [--batch-size N]
+    python -m app.cli offers-expire [--loop] [--batch-size N]
+    python -m app.cli candidates-import FILE --user-id N [--format csv|ndjson] [--on-conflict skip|update]
+    python -m app.cli storage-migrate [--dry-run]
+"""
+from __future__ import annotations
+
+import argparse
+
+
+def _db_upgrade(args: argparse.Namespace) -> int:
+    from app.services import migrations
+
+    migrations.upgrade(args.revision)
+    print(f"[db] schema at revision {migrations.current()}")
+    return 0
+
+
+def _db_downgrade(args: argparse.Namespace) -> int:
+    from app.services import migrations
+
+    migrations.downgrade(args.revision)
+    print(f"[db] schema at revision {migrations.current()}")
+    return 0
+
+
+def _db_current(args: argparse.Namespace) -> int:
+    from app.services import migrations
+
+    at, expected = migrations.current(), migrations.head()
+    print(f"[db] schema at revision {at or 'none'} (head: {expected})")
+    return 0 if at == expected else 1
+
+
+def _search_rebuild(args: argparse.Namespace) -> int:
+    from app.services import search
+
+    count = search.rebuild_index()
+    print(f"[search] rebuilt {search.backend.name} index: {count} documents")
+    return 0
+
+
+def _outbox_worker(args: argparse.Namespace) -> int:
+    from app.services import outbox
+
+    options = {"batch_size": args.batch_size, "poll_interval": args.poll_interval}
+    totals = outbox.run_worker(once=args.once, **{k: v for k, v in options.items() if v is not None})
+    print(f"[outbox] worker finished: {totals}")
+    return 0
+
+
+def _outbox_requeue_dead(args: argparse.Namespace) -> int:
+    from app.database import SessionLocal
+    from app.services import outbox
+
+    db = SessionLocal()
+    try:
+        count = outbox.requeue_dead(db)
+    finally:
+        db.close()
+    print(f"[outbox] requeued {count} dead-lettered mails")
+    return 0
+
+
+def _counters_reconcile(args: argparse.Namespace) -> int:
+    from app.services import counters
+
+    drift = counters.reconcile()
+    for name, (stored, actual) in drift.items():
+        print(f"[counters] {name}: {stored} -> {actual}")
+    print(f"[counters] reconciled, {len(drift)} counters corrected")
+    return 0
+
+
+def _tokens_sweep(args: argparse.Namespace) -> int:
+    from app.services import token_sweeper
+
+    options = {"batch_size": args.batch_size, "retention_hours": args.retention_hours}
+    options = {k: v for k, v in options.items() if v is not None}
+    if args.loop:
+        token_sweeper.run(**options)
+        return 0
+    count = token_sweeper.sweep_once(**options)
+    print(f"[tokens] swept {count} expired/used signature tokens")
+    return 0
+
+
+def _offers_expire(args: argparse.Namespace) -> int:
+    from app.services import offer_expiry
+
+    options = {"batch_size": args.batch_size} if args.batch_size else {}
+    if args.loop:
+        offer_expiry.run(**options)
+        return 0
+    count = offer_expiry.expire_once(**options)
+    print(f"[offers] expired {count} overdue offers")
+    return 0
+
+
+def _candidates_import(args: argparse.Namespace) -> int:
+    from app.database import SessionLocal
+    from app.services import candidate_import
+
+    fmt = args.format or ("ndjson" if args.file.endswith((".ndjson", ".jsonl")) else "csv")
+    with open(args.file, encoding="utf-8-sig") as fh:
+        text = fh.read()
+    db = SessionLocal()
+    try:
+        out = candidate_import.import_records(
+            db, candidate_import.parse(text, fmt), args.user_id,
+            on_conflict=args.on_conflict, chunk_size=args.chunk_size,
+        )
+    except ValueError as exc:
+        print(f"[import] {exc}")
+        return 2
+    finally:
+        db.close()
+    for item in out.results:
+        if item.result in ("invalid", "failed"):
+            print(f"[import] row {item.row}: {item.error}")
+    print(f"[import] created {out.created}, updated {out.updated}, skipped {out.skipped}, "
+          f"invalid {out.invalid}, failed {out.failed}")
+    return 1 if out.invalid or out.failed else 0
+
+
+def _storage_migrate(args: argparse.Namespace) -> int:
+    from app.services import storage
+
+    totals = storage.migrate_legacy(dry_run=args.dry_run)
+    verb = "would move" if args.dry_run else "moved"
+    print(
+        f"[storage] {verb} {totals['files']} files into the {storage.get_storage().name} backend; "
+        f"paths rewritten on {totals['offers']} offers, {totals['profiles']} profiles; "
+        f"{totals['unrecognised']} unrecognised paths left as they were"
+    )
+    return 1 if totals["unrecognised"] else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("db-upgrade", help="apply schema migrations (adopts a create_all-built database)")
+    p.add_argument("revision", nargs="?", default="head")
+    p.set_defaults(func=_db_upgrade)
+
+    p = sub.add_parser("db-downgrade", help="revert schema migrations down to REVISION")
+    p.add_argument("revision")
+    p.set_defaults(func=_db_downgrade)
+
+    p = sub.add_parser("db-current", help="show the schema revision; exits 1 if behind head")
+    p.set_defaults(func=_db_current)
+
+    p = sub.add_parser("search-rebuild", help="rebuild the /admin/users keyword index from scratch")
+    p.set_defaults(func=_search_rebuild)
+
+    p = sub.add_parser("outbox-worker", help="send queued mails from the email outbox")
+    p.add_argument("--once", action="store_true", help="process one batch and exit")
+    p.add_argument("--batch-size", type=int, default=None)
+    p.add_argument("--poll-interval", type=float, default=None)
+    p.set_defaults(func=_outbox_worker)
+
+    p = sub.add_parser("outbox-requeue-dead", help="move dead-lettered mails back to pending")
+    p.set_defaults(func=_outbox_requeue_dead)
+
+    p = sub.add_parser("counters-reconcile", help="recount the dashboard counters from the tables")
+    p.set_defaults(func=_counters_reconcile)
+
+    p = sub.add_parser("tokens-sweep", help="delete expired and used offer signature tokens")
+    p.add_argument("--loop", action="store_true", help="keep sweeping every TOKEN_SWEEP_INTERVAL seconds")
+    p.add_argument("--batch-size", type=int, default=None)
+    p.add_argument("--retention-hours", type=float, default=None)
+    p.set_defaults(func=_tokens_sweep)
+
+    p = sub.add_parser("offers-expire", help="move Sent offers past expire_at to Expired")
+    p.add_argument("--loop", action="store_true", help="keep sweeping every OFFER_EXPIRY_INTERVAL seconds")
+    p.add_argument("--batch-size", type=int, default=None)
+    p.set_defaults(func=_offers_expire)
+
+    p = sub.add_parser("candidates-import", help="bulk-load candidates from a CSV or NDJSON file")
+    p.add_argument("file")
+    p.add_argument("--user-id", type=int, required=True, help="user the imported candidates belong to")
+    p.add_argument("--format", choices=["csv", "ndjson"], default=None, help="default: from the file extension")
+    p.add_argument("--on-conflict", choices=["skip", "update"], default="skip")
+    p.add_argument("--chunk-size", type=int, default=1000)
+    p.set_defaults(func=_candidates_import)
+
+    p = sub.add_parser("storage-migrate", help="move pre-storage offer files and uploads into the storage backend")
+    p.add_argument("--dry-run", action="store_true", help="count what would move, change nothing")
+    p.set_defaults(func=_storage_migrate)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
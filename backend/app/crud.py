@@ -1,11 +1,48 @@
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
 from . import models, schemas
 from passlib.context import CryptContext
 from typing import Optional
 from datetime import datetime, timedelta
+from contextlib import contextmanager
 import hashlib, secrets
 
-def create_candidate(db: Session, candidate: schemas.CandidateCreate, user_id: int | None = None):
+## Unit of work
+# Write helpers take commit=True by default (commit + refresh, as before). Pass commit=False to
+# group several calls into one transaction: objects are only added (and flushed when an id is
+# needed), and the caller commits once, e.g.
+#
+#     with crud.unit_of_work(db):
+#         crud.update_offer_files(db, offer=offer, pdf_path=path, commit=False)
+#         crud.mark_offer_sent(db, offer=offer, commit=False)
+
+@contextmanager
+def unit_of_work(db: Session):
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+def _save(db: Session, obj, commit: bool, *, flush: bool = False):
+    db.add(obj)
+    if commit:
+        db.commit()
+        db.refresh(obj)
+    elif flush:
+        db.flush()
+    return obj
+
+def _get_offer(db: Session, offer_id: Optional[int], offer: Optional[models.Offer]) -> models.Offer:
+    if offer is not None:
+        return offer
+    offer = db.query(models.Offer).filter(models.Offer.id == offer_id).first()
+    if not offer:
+        raise ValueError(f"Offer {offer_id} not found")
+    return offer
+
+def create_candidate(db: Session, candidate: schemas.CandidateCreate, user_id: int | None = None, *, commit: bool = True):
     db_candidate = models.Candidate(
         first_name=candidate.first_name,
         last_name=candidate.last_name,
@@ -16,10 +53,7 @@ def create_candidate(db: Session, candidate: schemas.CandidateCreate, user_id: i
         status="Applied",
         user_id=user_id
     )
-    db.add(db_candidate)
-    db.commit()
-    db.refresh(db_candidate)
-    return db_candidate
+    return _save(db, db_candidate, commit, flush=True)
 
 def get_candidate(db: Session, candidate_id: int):
     return db.query(models.Candidate).filter(models.Candidate.id == candidate_id).first()
@@ -37,13 +71,10 @@ def get_password_hash(password: str):
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
-def create_user(db: Session, user: schemas.UserCreate):
+def create_user(db: Session, user: schemas.UserCreate, *, commit: bool = True):
     hashed_pw = get_password_hash(user.password)
     db_user = models.User(username=user.username, email=user.email, hashed_password=hashed_pw)
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    return _save(db, db_user, commit, flush=True)
 
 def get_user_by_email(db: Session, email: str):
     return db.query(models.User).filter(models.User.email == email).first()
@@ -56,37 +87,43 @@ def get_candidate_by_user(db: Session, user_id: int):
 def get_profile(db: Session, candidate_id: int):
     return db.query(models.CandidateProfile).filter(models.CandidateProfile.candidate_id == candidate_id).first()
 
-def get_or_create_profile(db: Session, candidate_id: int):
+def get_or_create_profile(db: Session, candidate_id: int, *, commit: bool = True):
     prof = get_profile(db, candidate_id)
     if prof:
         return prof
     prof = models.CandidateProfile(candidate_id=candidate_id)
-    db.add(prof)
-    db.commit()
-    db.refresh(prof)
-    return prof
+    return _save(db, prof, commit, flush=True)
 
-def update_profile(db: Session, candidate_id: int, data: "schemas.CandidateProfileUpdate"):
-    prof = get_or_create_profile(db, candidate_id)
+def update_profile(
+    db: Session,
+    candidate_id: int,
+    data: "schemas.CandidateProfileUpdate",
+    *,
+    profile: Optional[models.CandidateProfile] = None,
+    commit: bool = True,
+):
+    prof = profile or get_or_create_profile(db, candidate_id, commit=commit)
     for field, value in data.dict(exclude_unset=True).items():
         setattr(prof, field, value)
-    db.add(prof)
-    db.commit()
-    db.refresh(prof)
-    return prof
+    return _save(db, prof, commit)
 
-def set_profile_file(db: Session, candidate_id: int, kind: str, path: str):
-    prof = get_or_create_profile(db, candidate_id)
+def set_profile_file(
+    db: Session,
+    candidate_id: int,
+    kind: str,
+    path: str,
+    *,
+    profile: Optional[models.CandidateProfile] = None,
+    commit: bool = True,
+):
+    if kind not in ("resume", "photo"):
+        raise ValueError("kind must be 'resume' or 'photo'")
+    prof = profile or get_or_create_profile(db, candidate_id, commit=commit)
     if kind == "resume":
         prof.resume_path = path
-    elif kind == "photo":
-        prof.photo_path = path
     else:
-        raise ValueError("kind must be 'resume' or 'photo'")
-    db.add(prof)
-    db.commit()
-    db.refresh(prof)
-    return prof
+        prof.photo_path = path
+    return _save(db, prof, commit)
 
 
 def create_offer(
@@ -94,8 +131,12 @@ def create_offer(
     data: schemas.OfferCreate,
     html_body: Optional[str] = None,
     pdf_path: Optional[str] = None,
+    *,
+    candidate: Optional[models.Candidate] = None,
+    commit: bool = True,
 ) -> models.Offer:
-    candidate = db.query(models.Candidate).filter(models.Candidate.id == data.candidate_id).first()
+    if candidate is None:
+        candidate = db.query(models.Candidate).filter(models.Candidate.id == data.candidate_id).first()
     if not candidate:
         raise ValueError(f"Candidate {data.candidate_id} not found")
 
@@ -109,49 +150,79 @@ def create_offer(
         html_body=html_body,
         pdf_path=pdf_path,
     )
-    db.add(offer)
-    db.commit()
-    db.refresh(offer)
-    return offer
-
-
-def mark_offer_sent(db: Session, offer_id: int) -> models.Offer:
+    return _save(db, offer, commit, flush=True)
+
+
+def create_offers_bulk(db: Session, items: list[schemas.OfferCreate]) -> list[int]:
+    """Insert Draft offers in one multi-row INSERT. Returns ids in input order. Does not commit."""
+    if not items:
+        return []
+    rows = [
+        {
+            "candidate_id": d.candidate_id,
+            "job_title": d.job_title,
+            "salary": d.salary,
+            "start_date": d.start_date,
+            "expire_at": d.expire_at,
+            "status": models.OfferStatus.DRAFT,
+        }
+        for d in items
+    ]
+    stmt = insert(models.Offer).returning(models.Offer.id, sort_by_parameter_order=True)
+    return list(db.scalars(stmt, rows))
+
+
+def mark_offer_sent(
+    db: Session,
+    offer_id: Optional[int] = None,
+    *,
+    offer: Optional[models.Offer] = None,
+    commit: bool = True,
+) -> models.Offer:
     """Mark the Offer (SENT）。"""
-    offer = db.query(models.Offer).filter(models.Offer.id == offer_id).first()
-    if not offer:
-        raise ValueError(f"Offer {offer_id} not found")
+    offer = _get_offer(db, offer_id, offer)
     offer.status = models.OfferStatus.SENT
-    db.add(offer)
-    db.commit()
-    db.refresh(offer)
-    return offer
+    return _save(db, offer, commit)
 
 
 def mark_offer_signed(
     db: Session,
-    offer_id: int,
+    offer_id: Optional[int],
     signer_name: str,
     signed_pdf_path: Optional[str] = None,
+    *,
+    offer: Optional[models.Offer] = None,
+    signed_at: Optional[datetime] = None,
+    commit: bool = True,
 ) -> models.Offer:
     """Offer SIGNED。"""
-    offer = db.query(models.Offer).filter(models.Offer.id == offer_id).first()
-    if not offer:
-        raise ValueError(f"Offer {offer_id} not found")
+    offer = _get_offer(db, offer_id, offer)
     offer.status = models.OfferStatus.SIGNED
-    offer.signed_at = datetime.utcnow()
+    offer.signed_at = signed_at or datetime.utcnow()
     offer.signed_by_name = signer_name
     if signed_pdf_path:
         offer.signed_pdf_path = signed_pdf_path
-    db.add(offer)
-    db.commit()
-    db.refresh(offer)
-    return offer
+    return _save(db, offer, commit)
 
 
 def get_offer_by_id(db: Session, offer_id: int) -> Optional[models.Offer]:
     return db.query(models.Offer).filter(models.Offer.id == offer_id).first()
 
 
+def offer_filters(
+    *,
+    status: Optional[models.OfferStatus] = None,
+    candidate_id: Optional[int] = None,
+) -> list:
+    """WHERE clauses behind list_offers (also used by the offers export)."""
+    filters = []
+    if status:
+        filters.append(models.Offer.status == status)
+    if candidate_id:
+        filters.append(models.Offer.candidate_id == candidate_id)
+    return filters
+
+
 def list_offers(
     db: Session,
     *,
@@ -160,11 +231,7 @@ def list_offers(
     limit: int = 50,
     offset: int = 0,
 ) -> list[models.Offer]:
-    q = db.query(models.Offer)
-    if status:
-        q = q.filter(models.Offer.status == status)
-    if candidate_id:
-        q = q.filter(models.Offer.candidate_id == candidate_id)
+    q = db.query(models.Offer).filter(*offer_filters(status=status, candidate_id=candidate_id))
     return q.order_by(models.Offer.id.desc()).offset(offset).limit(limit).all()
 
 
@@ -176,68 +243,94 @@ def _hash_token(raw: str) -> str:
 
 def create_signature_token(
     db: Session,
-    offer_id: int,
+    offer_id: Optional[int] = None,
     ttl_hours: int = 72,
+    *,
+    offer: Optional[models.Offer] = None,
+    commit: bool = True,
 ) -> str:
 
-    offer = db.query(models.Offer).filter(models.Offer.id == offer_id).first()
-    if not offer:
-        raise ValueError(f"Offer {offer_id} not found")
+    offer = _get_offer(db, offer_id, offer)
 
     raw = secrets.token_urlsafe(24)
     token = models.OfferSignatureToken(
-        offer_id=offer_id,
+        offer=offer,
         token_hash=_hash_token(raw),
         expires_at=datetime.utcnow() + timedelta(hours=ttl_hours),
     )
-    db.add(token)
-    db.commit()
-    db.refresh(token)
+    _save(db, token, commit)
     return raw  
 
 
-def verify_and_consume_token(
+def create_signature_tokens_bulk(
+    db: Session,
+    offer_ids: list[int],
+    ttl_hours: int = 72,
+) -> dict[int, str]:
+    """One token per offer in a single multi-row INSERT. Returns {offer_id: raw token}. Does not commit."""
+    if not offer_ids:
+        return {}
+    expires_at = datetime.utcnow() + timedelta(hours=ttl_hours)
+    raw_tokens = {offer_id: secrets.token_urlsafe(24) for offer_id in offer_ids}
+    db.execute(
+        insert(models.OfferSignatureToken),
+        [
+            {"offer_id": offer_id, "token_hash": _hash_token(raw), "expires_at": expires_at}
+            for offer_id, raw in raw_tokens.items()
+        ],
+    )
+    return raw_tokens
+
+
+def get_valid_token(
     db: Session,
     raw_token: str,
 ) -> Optional[models.OfferSignatureToken]:
+    """The token if it is known, unused and unexpired, without consuming it (e.g. to show the offer)."""
+    T = models.OfferSignatureToken
+    return db.scalars(
+        select(T).where(T.token_hash == _hash_token(raw_token), T.used_at.is_(None), T.expires_at > datetime.utcnow())
+    ).first()
 
-    token_hash = _hash_token(raw_token)
-    tok = (
-        db.query(models.OfferSignatureToken)
-        .filter(models.OfferSignatureToken.token_hash == token_hash)
-        .first()
-    )
-    if not tok:
-        return None
-    if tok.used_at is not None:
-        return None
-    if tok.expires_at < datetime.utcnow():
-        return None
-
-    tok.used_at = datetime.utcnow()
-    db.add(tok)
+
+def verify_and_consume_token(
+    db: Session,
+    raw_token: str,
+) -> Optional[models.OfferSignatureToken]:
+    """Mark the token used and return it, or None if unknown, used or expired.
+
+    One conditional UPDATE ... RETURNING: of two concurrent requests with the same token, only
+    the first one gets a row back.
+    """
+    now = datetime.utcnow()
+    T = models.OfferSignatureToken
+    tok = db.scalars(
+        update(T)
+        .where(T.token_hash == _hash_token(raw_token), T.used_at.is_(None), T.expires_at > now)
+        .values(used_at=now)
+        .returning(T)
+    ).first()
     db.commit()
-    db.refresh(tok)
     return tok
 
 def update_offer_files(
     db: Session,
     *,
-    offer_id: int,
+    offer_id: int | None = None,
+    offer: models.Offer | None = None,
     html_body: str | None = None,
     pdf_path: str | None = None,
+    pdf_sha256: str | None = None,
+    commit: bool = True,
 ) -> models.Offer:
-    offer = db.query(models.Offer).filter(models.Offer.id == offer_id).first()
-    if not offer:
-        raise ValueError(f"Offer {offer_id} not found")
+    offer = _get_offer(db, offer_id, offer)
 
     if html_body is not None:
         offer.html_body = html_body
     if pdf_path is not None:
         offer.pdf_path = pdf_path
+    if pdf_sha256 is not None:
+        offer.pdf_sha256 = pdf_sha256
 
-    db.add(offer)
-    db.commit()
-    db.refresh(offer)
-    return offer
+    return _save(db, offer, commit)
 
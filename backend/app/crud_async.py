@@ -0,0 +1,152 @@
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from . import models, schemas
+from .crud import _hash_token, offer_filters
+from typing import Optional
+from datetime import datetime
+from contextlib import asynccontextmanager
+
+## Async CRUD
+# Same helpers as app.crud for the `async def` routes (AsyncSession from database.get_async_db).
+# Semantics match the sync versions, including commit=False + unit_of_work to batch writes:
+#
+#     async with crud_async.unit_of_work(db):
+#         await crud_async.update_profile(db, candidate.id, data, commit=False)
+#
+# AsyncSession never lazy-loads: relationships must be loaded explicitly (selectinload) before
+# being touched outside an await.
+
+@asynccontextmanager
+async def unit_of_work(db: AsyncSession):
+    try:
+        yield db
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+async def _save(db: AsyncSession, obj, commit: bool, *, flush: bool = False):
+    db.add(obj)
+    if commit:
+        await db.commit()
+        await db.refresh(obj)
+    elif flush:
+        await db.flush()
+    return obj
+
+async def _first(db: AsyncSession, stmt):
+    return (await db.execute(stmt.limit(1))).scalars().first()
+
+async def count(db: AsyncSession, model, *where) -> int:
+    return (await db.execute(select(func.count()).select_from(model).where(*where))).scalar_one()
+
+
+## Users / candidates
+async def get_user(db: AsyncSession, user_id: int) -> Optional[models.User]:
+    return await _first(db, select(models.User).where(models.User.id == user_id))
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[models.User]:
+    return await _first(db, select(models.User).where(models.User.email == email))
+
+async def get_candidate(db: AsyncSession, candidate_id: int) -> Optional[models.Candidate]:
+    return await _first(db, select(models.Candidate).where(models.Candidate.id == candidate_id))
+
+async def get_candidate_by_user(db: AsyncSession, user_id: int) -> Optional[models.Candidate]:
+    return await _first(db, select(models.Candidate).where(models.Candidate.user_id == user_id))
+
+async def create_candidate(
+    db: AsyncSession, candidate: schemas.CandidateCreate, user_id: int | None = None, *, commit: bool = True
+) -> models.Candidate:
+    db_candidate = models.Candidate(
+        first_name=candidate.first_name,
+        last_name=candidate.last_name,
+        email=candidate.email,
+        mobile=candidate.mobile,
+        job_title=candidate.job_title,
+        address=candidate.address,
+        status="Applied",
+        user_id=user_id
+    )
+    return await _save(db, db_candidate, commit, flush=True)
+
+
+## Candidate Profile CRUD
+async def get_profile(db: AsyncSession, candidate_id: int) -> Optional[models.CandidateProfile]:
+    return await _first(
+        db, select(models.CandidateProfile).where(models.CandidateProfile.candidate_id == candidate_id)
+    )
+
+async def get_or_create_profile(db: AsyncSession, candidate_id: int, *, commit: bool = True):
+    prof = await get_profile(db, candidate_id)
+    if prof:
+        return prof
+    prof = models.CandidateProfile(candidate_id=candidate_id)
+    return await _save(db, prof, commit, flush=True)
+
+async def update_profile(
+    db: AsyncSession,
+    candidate_id: int,
+    data: "schemas.CandidateProfileUpdate",
+    *,
+    profile: Optional[models.CandidateProfile] = None,
+    commit: bool = True,
+):
+    prof = profile or await get_or_create_profile(db, candidate_id, commit=commit)
+    for field, value in data.dict(exclude_unset=True).items():
+        setattr(prof, field, value)
+    return await _save(db, prof, commit)
+
+async def set_profile_file(
+    db: AsyncSession,
+    candidate_id: int,
+    kind: str,
+    path: str,
+    *,
+    profile: Optional[models.CandidateProfile] = None,
+    commit: bool = True,
+):
+    if kind not in ("resume", "photo"):
+        raise ValueError("kind must be 'resume' or 'photo'")
+    prof = profile or await get_or_create_profile(db, candidate_id, commit=commit)
+    if kind == "resume":
+        prof.resume_path = path
+    else:
+        prof.photo_path = path
+    return await _save(db, prof, commit)
+
+
+## Offers
+async def get_offer_by_id(db: AsyncSession, offer_id: int) -> Optional[models.Offer]:
+    return await _first(db, select(models.Offer).where(models.Offer.id == offer_id))
+
+async def list_offers(
+    db: AsyncSession,
+    *,
+    status: Optional[models.OfferStatus] = None,
+    candidate_id: Optional[int] = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> list[models.Offer]:
+    stmt = select(models.Offer).where(*offer_filters(status=status, candidate_id=candidate_id))
+    stmt = stmt.order_by(models.Offer.id.desc()).offset(offset).limit(limit)
+    return list((await db.execute(stmt)).scalars())
+
+async def get_offer_job(db: AsyncSession, job_id: str) -> Optional[models.OfferJob]:
+    stmt = select(models.OfferJob).options(selectinload(models.OfferJob.offer)).where(models.OfferJob.id == job_id)
+    return await _first(db, stmt)
+
+async def verify_and_consume_token(db: AsyncSession, raw_token: str) -> Optional[models.OfferSignatureToken]:
+    # single conditional UPDATE ... RETURNING, see crud.verify_and_consume_token
+    now = datetime.utcnow()
+    T = models.OfferSignatureToken
+    tok = (
+        await db.scalars(
+            update(T)
+            .where(T.token_hash == _hash_token(raw_token), T.used_at.is_(None), T.expires_at > now)
+            .values(used_at=now)
+            .returning(T)
+        )
+    ).first()
+    await db.commit()
+    return tok
@@ -1,6 +1,8 @@
 import os
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from dotenv import load_dotenv, find_dotenv
 from pathlib import Path
 
@@ -29,3 +31,44 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# =========================
+# Async engine (async def routes)
+# =========================
+# Same database through an asyncio driver: sqlite -> aiosqlite, postgresql -> asyncpg.
+# Override with ASYNC_DATABASE_URL if the mapping doesn't fit (e.g. another driver).
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "mysql": "mysql+aiomysql"}
+
+
+def async_url(url: str) -> str:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if parsed.drivername in _ASYNC_DRIVERS.values() or backend not in _ASYNC_DRIVERS:
+        return url
+    return parsed.set(drivername=_ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_url(DATABASE_URL)
+
+# sized for many concurrent coroutines; SQLite keeps its dialect's default pool
+_async_pool_args = {} if ASYNC_DATABASE_URL.startswith("sqlite") else {
+    "pool_size": int(os.getenv("DB_ASYNC_POOL_SIZE", "10")),
+    "max_overflow": int(os.getenv("DB_ASYNC_MAX_OVERFLOW", "20")),
+}
+async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_pre_ping=True, **_async_pool_args)
+
+
+class AsyncSyncSession(Session):
+    """Session class behind every AsyncSession: attach session events (after_flush, ...) here."""
+
+
+# expire_on_commit=False: templates read attributes after the commit and can't lazy-load
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False, sync_session_class=AsyncSyncSession
+)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
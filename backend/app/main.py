@@ -2,24 +2,32 @@
 # Imports
 # =========================
 from pathlib import Path
+from urllib.parse import urlencode
+import mimetypes
+import os
+import re
 import secrets
 
-from fastapi import FastAPI, Request, Depends, Form, BackgroundTasks
+from fastapi import FastAPI, Request, Depends, Form, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
 from fastapi import HTTPException
 from starlette.middleware.sessions import SessionMiddleware
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import EmailStr
 
 from datetime import datetime, timedelta
-from sqlalchemy import or_, func
+from sqlalchemy import func, select
 
 from app import models
 from app import crud
-from app.services.mailer import send_invite_email
-from app.database import Base, engine, get_db
+from app import crud_async
+from app.services import outbox, pdf_engine, offer_pipeline, token_sweeper, offer_expiry, documents
+from app.services.pagination import keyset_page, parse_page_size
+from app.services import search, counters, facets, metrics, slow_queries, profiler, export, migrations, storage
+from app.database import async_engine, engine, get_db, get_async_db
 from app.routers import candidates as candidates_router
 from app.routers import portal as portal_router
 from app.routers import auth as auth_router
@@ -34,35 +42,135 @@ app = FastAPI(title="Candidate Intake API")
 
 @app.on_event("startup")
 def _init_db():
-    Base.metadata.create_all(bind=engine)
+    # the schema itself is migrated outside startup (python -m app.cli db-upgrade); refuse to start without it
+    migrations.check()
+    search.ensure_index()
+    counters.ensure()
+    if os.getenv("OUTBOX_INPROCESS_WORKER", "0") == "1":
+        outbox.start_background_worker()
+    if os.getenv("TOKEN_SWEEP_INPROCESS", "0") == "1":
+        token_sweeper.start_background_sweeper()
+    if os.getenv("OFFER_EXPIRY_INPROCESS", "0") == "1":
+        offer_expiry.start_background_sweeper()
+    if os.getenv("PDF_PRESTART", "0") == "1":
+        pdf_engine.get_engine().warm()
+    offer_pipeline.resume_pending()
+
+
+@app.on_event("shutdown")
+def _stop_workers():
+    offer_pipeline.shutdown()
+    pdf_engine.get_engine().shutdown()
+    documents.flush_writes()
+
+
+@app.on_event("shutdown")
+async def _close_async_engine():
+    await async_engine.dispose()
 
 # Static & uploads (absolute paths)
 BASE_DIR = Path(__file__).resolve().parent.parent
 templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
 app.add_middleware(SessionMiddleware, secret_key="super-secret-key")
+app.add_middleware(profiler.ProfilerMiddleware, router=app.router)
+# outermost (added last): times the whole request, including the session middleware
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.instrument(engine, "sync")
+metrics.instrument(async_engine.sync_engine, "async")
+slow_queries.install(engine, "sync")
+slow_queries.install(async_engine.sync_engine, "async")
 
 FRONTEND_DIST_DIR = BASE_DIR / "static" / "forms"
 FRONTEND_INDEX_FILE = FRONTEND_DIST_DIR / "index.html"
 
 app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="static")
-app.mount("/uploads", StaticFiles(directory=str(BASE_DIR / "uploads")), name="uploads")
+
+
+# offer documents (name, salary, signature) go only to the holder of that offer's signing token;
+# uploads are content-addressed, so their keys can't be guessed
+OFFER_FILE_RE = re.compile(r"offers/offer_(\d+)(?:_\w+)?\.\w+")
+
+
+def _may_read(db: Session, key: str, token: str | None) -> bool:
+    if key.startswith("uploads/"):
+        return True
+    match = OFFER_FILE_RE.fullmatch(key)
+    if match is None or not token:
+        return False
+    tok = crud.get_valid_token(db, token)
+    return tok is not None and tok.offer_id == int(match.group(1))
+
+
+@app.get("/files/{key:path}")
+def stored_file(key: str, token: str | None = None, db: Session = Depends(get_db)):
+    """Uploads and generated documents, from whichever backend app.services.storage is using.
+
+    Offer documents need ?token= (the offer's unused, unexpired signing token); anything the caller
+    may not read is a 404, the same as a missing file.
+    """
+    if not _may_read(db, key, token):
+        raise HTTPException(status_code=404, detail="File not found")
+    store = storage.get_storage()
+    try:
+        path = store.local_path(key)
+        if path is not None:
+            return FileResponse(path)
+        data = store.get(key)
+    except (KeyError, storage.StorageError):
+        raise HTTPException(status_code=404, detail="File not found")
+    media_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+    return Response(content=data, media_type=media_type)
+
 
 # Status buckets used by Applicants/Workers views
 WORKER_STATUSES = {"Hired", "Employee", "Active"}
 APPLICANT_STATUSES_EXCLUDE = WORKER_STATUSES
 
+# Admin list views are keyset-paginated; ?total=1 (or ADMIN_LIST_TOTALS=1) adds an approximate total.
+# The list routes are async: keyset_page builds a sync Query, so they run it through
+# AsyncSession.run_sync (same async connection, no worker thread).
+SHOW_LIST_TOTALS = os.getenv("ADMIN_LIST_TOTALS", "0") == "1"
+
+
+def _page_args(request: Request, cursor_param: str = "cursor") -> dict:
+    return {
+        "cursor": request.query_params.get(cursor_param),
+        "page_size": parse_page_size(request.query_params.get("page_size")),
+        "with_total": SHOW_LIST_TOTALS or request.query_params.get("total") == "1",
+    }
+
+
+def _pager(request: Request, page, cursor_param: str = "cursor") -> dict:
+    # prev/next links keep the current filters and only swap the cursor
+    def _url(cursor):
+        if not cursor:
+            return None
+        params = dict(request.query_params)
+        params[cursor_param] = cursor
+        return f"{request.url.path}?{urlencode(params)}"
+
+    return {"page": page, "prev_url": _url(page.prev_cursor), "next_url": _url(page.next_cursor)}
+
+
+def _export_args(request: Request) -> dict:
+    # ?format=csv|ndjson&gzip=1
+    return {
+        "fmt": (request.query_params.get("format") or "csv").lower(),
+        "gzip": request.query_params.get("gzip") == "1",
+    }
+
 
 # =========================
 # Public / Authenticated Landing
 # =========================
 @app.get("/", response_class=HTMLResponse)
-def home(request: Request, db: Session = Depends(get_db)):
+async def home(request: Request, db: AsyncSession = Depends(get_async_db)):
     user_session = request.session.get("user")
     if not user_session:
         return RedirectResponse(url="/auth/login", status_code=303)
 
-    db_user = db.query(models.User).filter(models.User.id == user_session["id"]).first()
-    candidate = db.query(models.Candidate).filter(models.Candidate.user_id == db_user.id).first()
+    db_user = await crud_async.get_user(db, user_session["id"])
+    candidate = await crud_async.get_candidate_by_user(db, db_user.id)
 
     return templates.TemplateResponse(
         "dashboard.html",
@@ -81,9 +189,11 @@ def candidate_form(request: Request):
 # Admin: Dashboard
 # =========================
 @app.get("/admin", response_class=HTMLResponse)
-def admin_dashboard(request: Request, db: Session = Depends(get_db)):
-    candidates_count = db.query(models.Candidate).count()
-    users_count = db.query(models.User).count()
+async def admin_dashboard(request: Request, db: AsyncSession = Depends(get_async_db)):
+    # maintained counters (services.counters), not COUNT(*) per page load
+    totals = await db.run_sync(counters.snapshot)
+    candidates_count = totals.get(counters.total_key(models.Candidate), 0)
+    users_count = totals.get(counters.total_key(models.User), 0)
     training_count = 0
 
     return templates.TemplateResponse(
@@ -97,20 +207,87 @@ def admin_dashboard(request: Request, db: Session = Depends(get_db)):
     )
 
 
+# =========================
+# Admin: Metrics, slow-query log & profiler
+# =========================
+@app.get("/admin/metrics", response_class=PlainTextResponse)
+def admin_metrics():
+    # Prometheus scrape target (services.metrics)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/admin/slow-queries", response_class=HTMLResponse)
+def admin_slow_queries(request: Request):
+    return templates.TemplateResponse(
+        "slow_queries.html",
+        {
+            "request": request,
+            "entries": slow_queries.recent(),
+            "enabled": slow_queries.enabled(),
+            "threshold_ms": slow_queries.THRESHOLD_MS,
+            "buffer_size": slow_queries.BUFFER_SIZE,
+        },
+    )
+
+
+@app.post("/admin/slow-queries/clear")
+def admin_slow_queries_clear():
+    slow_queries.clear()
+    return RedirectResponse(url="/admin/slow-queries", status_code=303)
+
+
+@app.get("/admin/profiles", response_class=HTMLResponse)
+def admin_profiles(request: Request):
+    return templates.TemplateResponse(
+        "profiles.html",
+        {"request": request, "settings": profiler.settings, "profiles": profiler.recent()},
+    )
+
+
+@app.post("/admin/profiles")
+def admin_profiles_configure(
+    enabled: str = Form(""),
+    sample_rate: float = Form(0.05),
+    routes: str = Form(""),
+):
+    profiler.configure(
+        enabled=enabled == "1",
+        sample_rate=sample_rate,
+        routes={r.strip() for r in routes.splitlines() if r.strip()},
+    )
+    return RedirectResponse(url="/admin/profiles", status_code=303)
+
+
+@app.get("/admin/profiles/{name}")
+def admin_profile_download(name: str):
+    path = profiler.path_for(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=name)
+
+
 # =========================
 # Admin: Candidates (raw list)
 # =========================
 @app.get("/admin/candidates", response_class=HTMLResponse)
-def list_candidates(request: Request, db: Session = Depends(get_db)):
-    candidates = db.query(models.Candidate).all()
-    return templates.TemplateResponse("candidates.html", {"request": request, "candidates": candidates})
+async def list_candidates(request: Request, db: AsyncSession = Depends(get_async_db)):
+    page = await db.run_sync(lambda s: keyset_page(
+        s.query(models.Candidate),
+        (models.Candidate.applied_on, models.Candidate.id),
+        descending=True,
+        **_page_args(request),
+    ))
+    return templates.TemplateResponse(
+        "candidates.html",
+        {"request": request, "candidates": page.items, **_pager(request, page)},
+    )
 
 
 # =========================
 # Admin: Workers (Users with worker-status Candidate) + Filters
 # =========================
-@app.get("/admin/users", response_class=HTMLResponse)
-def list_users(request: Request, db: Session = Depends(get_db)):
+def _worker_filters(request: Request) -> dict:
+    """Filter state of the Workers view (shared by the page and its export)."""
     # ---- read query params
     role      = (request.query_params.get("role")      or "").strip()
     status    = (request.query_params.get("status")    or "").strip()
@@ -139,44 +316,46 @@ def list_users(request: Request, db: Session = Depends(get_db)):
     if end_dt:
         cand_filters.append(models.Candidate.applied_on < (end_dt + timedelta(days=1)))
 
-    # keywords across candidate + user fields
+    # keywords across candidate + user fields (served by the search index)
     if q:
-        like = f"%{q}%"
-        cand_filters.append(
-            or_(
-                models.Candidate.first_name.ilike(like),
-                models.Candidate.last_name.ilike(like),
-                models.Candidate.email.ilike(like),
-                models.Candidate.mobile.ilike(like),
-                models.User.username.ilike(like),
-                models.User.email.ilike(like),
-            )
-        )
+        cand_filters.append(search.candidate_filter(q))
+
+    return {
+        "role": role, "status": status, "date_from": date_from, "date_to": date_to, "q": q,
+        "start_dt": start_dt, "end_dt": end_dt, "cand_filters": cand_filters,
+    }
 
-    # ---- single-pass query with join
-    rows = (
-        db.query(models.User, models.Candidate)
+
+@app.get("/admin/users", response_class=HTMLResponse)
+async def list_users(request: Request, db: AsyncSession = Depends(get_async_db)):
+    f = _worker_filters(request)
+    role, status, q = f["role"], f["status"], f["q"]
+    start_dt, end_dt, cand_filters = f["start_dt"], f["end_dt"], f["cand_filters"]
+
+    # ---- single-pass query with join, one keyset page at a time
+    page = await db.run_sync(lambda s: keyset_page(
+        s.query(models.User, models.Candidate)
           .join(models.Candidate, models.Candidate.user_id == models.User.id)
-          .filter(*cand_filters)
-          .order_by(func.lower(models.User.username))
-          .all()
-    )
+          .filter(*cand_filters),
+        (func.lower(models.User.username), models.User.id),
+        **_page_args(request),
+    ))
+    rows = page.items
 
     users = [u for (u, _c) in rows]
     user_candidates = {u.id: c for (u, c) in rows}
 
-    # ---- dropdown data
-    roles = [
-        r for (r,) in (
-            db.query(models.Candidate.job_title)
-              .filter(models.Candidate.status.in_(WORKER_STATUSES))
-              .filter(models.Candidate.job_title.isnot(None))
-              .distinct()
-              .all()
-        ) if r
-    ]
-    roles.sort(key=lambda s: s.lower()) # case-insensitive sort
+    # ---- dropdown data + counts: one GROUP BY (status, role) under the date/keyword filters
+    facet_statuses = WORKER_STATUSES | {status} if status else WORKER_STATUSES
+    worker_facets = await db.run_sync(
+        lambda s: facets.worker_facets(s, facet_statuses, start_dt, end_dt, q)
+    )
+    status_counts = worker_facets.status_counts(role)
+    role_counts = worker_facets.role_counts(status)
+    any_status_count = sum(status_counts.get(s, 0) for s in WORKER_STATUSES)
+    any_role_count = sum(worker_facets.status_counts().get(s, 0) for s in ([status] if status else WORKER_STATUSES))
 
+    roles = sorted(set(role_counts) | ({role} if role else set()), key=lambda s: s.lower()) # case-insensitive sort
     status_options = sorted(WORKER_STATUSES)
 
     flash = request.session.pop("flash", None) # One time flash message
@@ -187,19 +366,40 @@ def list_users(request: Request, db: Session = Depends(get_db)):
             "users": users,
             "user_candidates": user_candidates,
             "flash": flash,
+            **_pager(request, page),
 
             # filter state/choices
             "roles": roles,
             "status_options": status_options,
+            "role_counts": role_counts,
+            "status_counts": status_counts,
+            "any_role_count": any_role_count,
+            "any_status_count": any_status_count,
             "role": role,
             "status": status,
-            "date_from": date_from,
-            "date_to": date_to,
+            "date_from": f["date_from"],
+            "date_to": f["date_to"],
             "q": q,
         },
     )
 
 
+@app.get("/admin/users/export")
+def export_users(request: Request):
+    # same filters and order as the page, every row, streamed (services.export)
+    U, C = models.User, models.Candidate
+    stmt = (
+        select(
+            U.id.label("user_id"), U.username, U.email,
+            C.id.label("candidate_id"), C.first_name, C.last_name, C.job_title, C.status, C.mobile, C.applied_on,
+        )
+        .join(C, C.user_id == U.id)
+        .where(*_worker_filters(request)["cand_filters"])
+        .order_by(func.lower(U.username), U.id)
+    )
+    return export.streaming_export(stmt, "workers", **_export_args(request))
+
+
 # Alias: keep old /admin/staffs working (redirect to canonical /admin/users)
 @app.get("/admin/staffs")
 def list_staffs_redirect():
@@ -219,12 +419,31 @@ def candidate_assessment(request: Request):
     return templates.TemplateResponse("candidate_assessment.html", {"request": request})
 
 @app.get("/admin/candidates-users", response_class=HTMLResponse)
-def list_candidates_users(request: Request, db: Session = Depends(get_db)):
-    candidates = db.query(models.Candidate).all()
-    users = db.query(models.User).all()
+async def list_candidates_users(request: Request, db: AsyncSession = Depends(get_async_db)):
+    # two independent keyset pages on one screen: ?cursor= for candidates, ?users_cursor= for users
+    cand_page = await db.run_sync(lambda s: keyset_page(
+        s.query(models.Candidate),
+        (models.Candidate.applied_on, models.Candidate.id),
+        descending=True,
+        **_page_args(request),
+    ))
+    user_page = await db.run_sync(lambda s: keyset_page(
+        s.query(models.User),
+        (func.lower(models.User.username), models.User.id),
+        **_page_args(request, "users_cursor"),
+    ))
+    user_pager = _pager(request, user_page, "users_cursor")
     return templates.TemplateResponse(
         "candidates_users.html",
-        {"request": request, "candidates": candidates, "users": users},
+        {
+            "request": request,
+            "candidates": cand_page.items,
+            "users": user_page.items,
+            **_pager(request, cand_page),
+            "users_page": user_page,
+            "users_prev_url": user_pager["prev_url"],
+            "users_next_url": user_pager["next_url"],
+        },
     )
 
 
@@ -238,7 +457,6 @@ def new_user_form(request: Request):
 @app.post("/admin/users/new", response_class=HTMLResponse)
 def create_user_and_candidate(
     request: Request,
-    background_tasks: BackgroundTasks,
     username: str = Form(...),
     email: EmailStr = Form(...),
     first_name: str = Form(""),
@@ -258,8 +476,8 @@ def create_user_and_candidate(
             status_code=400,
         )
 
-    temp_password = secrets.token_urlsafe(8)
-    hashed = crud.get_password_hash(temp_password)
+    # a password nobody knows: the invite mail sets the real one when it goes out (outbox._send_invite)
+    hashed = crud.get_password_hash(secrets.token_urlsafe(16))
 
     user = models.User(username=username, email=email, hashed_password=hashed)
     db.add(user); db.commit(); db.refresh(user)
@@ -273,15 +491,11 @@ def create_user_and_candidate(
         status=status or "Applied",
         user_id=user.id,
     )
-    db.add(cand); db.commit()
-
+    db.add(cand)
     if cand.email:
-        background_tasks.add_task(
-            send_invite_email,
-            cand.email,
-            cand.first_name or "",
-            temp_password,
-        )
+        outbox.enqueue(db, "invite", cand.email, first_name=cand.first_name or "", user_id=user.id)
+    db.commit()
+    facets.invalidate()
 
     request.session["flash"] = "User created and invitation email sent."
     return RedirectResponse(url="/admin/users", status_code=303)
@@ -290,21 +504,39 @@ def create_user_and_candidate(
 # =========================
 # Admin: Applicants (list + convert)
 # =========================
+def _applicant_filters() -> list:
+    return [~models.Candidate.status.in_(APPLICANT_STATUSES_EXCLUDE)]
+
+
 @app.get("/admin/applicants", response_class=HTMLResponse)
-def list_applicants(request: Request, db: Session = Depends(get_db)):
-    applicants = (
-        db.query(models.Candidate)
-        .filter(~models.Candidate.status.in_(APPLICANT_STATUSES_EXCLUDE))
-        .all()
-    )
+async def list_applicants(request: Request, db: AsyncSession = Depends(get_async_db)):
+    page = await db.run_sync(lambda s: keyset_page(
+        s.query(models.Candidate).filter(*_applicant_filters()),
+        (models.Candidate.applied_on, models.Candidate.id),
+        descending=True,
+        **_page_args(request),
+    ))
     flash = request.session.pop("flash", None)
-    return templates.TemplateResponse("applicants.html", {"request": request, "applicants": applicants, "flash": flash})
+    return templates.TemplateResponse(
+        "applicants.html",
+        {"request": request, "applicants": page.items, "flash": flash, **_pager(request, page)},
+    )
+
+
+@app.get("/admin/applicants/export")
+def export_applicants(request: Request):
+    C = models.Candidate
+    stmt = (
+        select(C.id, C.first_name, C.last_name, C.email, C.mobile, C.job_title, C.status, C.applied_on)
+        .where(*_applicant_filters())
+        .order_by(C.applied_on.desc(), C.id.desc())
+    )
+    return export.streaming_export(stmt, "applicants", **_export_args(request))
 
 @app.get("/admin/applicants/{candidate_id}/profile")
 def ensure_profile_and_open(
     candidate_id: int,
     request: Request,
-    background_tasks: BackgroundTasks,        
     db: Session = Depends(get_db),
 ):
     cand = db.query(models.Candidate).filter(models.Candidate.id == candidate_id).first()
@@ -329,8 +561,7 @@ def ensure_profile_and_open(
             i += 1
             username = f"{base_username}{i}"
 
-        temp_password = secrets.token_urlsafe(8)
-        hashed = crud.get_password_hash(temp_password)
+        hashed = crud.get_password_hash(secrets.token_urlsafe(16))  # set by the invite mail
 
         user = models.User(
             username=username,
@@ -341,22 +572,17 @@ def ensure_profile_and_open(
         db.flush()           
         cand.user_id = user.id
         db.add(cand)
-        db.commit()
-        
         if cand.email:
-            background_tasks.add_task(
-                send_invite_email,
-                cand.email,
-                cand.first_name or "",
-                temp_password,
-            )
+            outbox.enqueue(db, "invite", cand.email, first_name=cand.first_name or "", user_id=user.id)
+        db.commit()
+
         request.session["flash"] = f"Created user '{username}'. Invitation email sent."
 
     return RedirectResponse(url=f"/portal/profile/admin/{user.id}", status_code=303)
 
 # Robust convert (ensures linked User; placed AFTER simple version)
 @app.post("/admin/applicants/{candidate_id}/convert", response_class=HTMLResponse)
-def convert_applicant_to_worker(candidate_id: int, request: Request, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+def convert_applicant_to_worker(candidate_id: int, request: Request, db: Session = Depends(get_db)):
     cand = db.query(models.Candidate).filter(models.Candidate.id == candidate_id).first()
     if not cand:
         request.session["flash"] = "Candidate not found."
@@ -367,7 +593,6 @@ def convert_applicant_to_worker(candidate_id: int, request: Request, background_
         user = db.query(models.User).filter(models.User.email == cand.email).first()
 
     created_new_user = False
-    temp_password = None
 
     if not user:
         base_username = (
@@ -381,8 +606,7 @@ def convert_applicant_to_worker(candidate_id: int, request: Request, background_
             i += 1
             username = f"{base_username}{i}"
 
-        temp_password = secrets.token_urlsafe(8)
-        hashed = crud.get_password_hash(temp_password)
+        hashed = crud.get_password_hash(secrets.token_urlsafe(16))  # set by the invite mail
 
         user = models.User(
             username=username,
@@ -397,16 +621,12 @@ def convert_applicant_to_worker(candidate_id: int, request: Request, background_
     cand.user_id = user.id
     cand.status = "Hired"
     db.add(cand)
-    db.commit()
 
     # 只有新建用户且有邮箱时才发邀请
-    if created_new_user and cand.email and temp_password:
-        background_tasks.add_task(
-            send_invite_email,
-            cand.email,
-            cand.first_name or "",
-            temp_password,
-        )
+    if created_new_user and cand.email:
+        outbox.enqueue(db, "invite", cand.email, first_name=cand.first_name or "", user_id=user.id)
+    db.commit()
+    facets.invalidate()
 
     if "flash" not in request.session:
         full_name = f"{cand.first_name or ''} {cand.last_name or ''}".strip() or "Candidate"
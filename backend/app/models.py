@@ -1,5 +1,8 @@
+import enum
+import hashlib
+import zlib
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer, DateTime, ForeignKey, Enum, Text
+from sqlalchemy import String, Integer, BigInteger, DateTime, ForeignKey, Enum, Text, Index, LargeBinary
 from sqlalchemy.sql import func
 from .database import Base
 from datetime import datetime, timedelta
@@ -13,6 +16,13 @@ class OfferStatus(str, enum.Enum):
 
 class Candidate(Base):
     __tablename__ = "candidates"
+    # admin list filters/sorts (migration 0003): keyset pages by (applied_on, id), the Workers
+    # view filters by status + role / joining date, and facets group by (status, job_title)
+    __table_args__ = (
+        Index("ix_candidates_applied_on_id", "applied_on", "id"),
+        Index("ix_candidates_status_applied_on", "status", "applied_on"),
+        Index("ix_candidates_status_job_title", "status", "job_title"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     first_name: Mapped[str]
@@ -25,7 +35,7 @@ class Candidate(Base):
     status: Mapped[str] = mapped_column(default="Applied")
     applied_on: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
     user: Mapped["User"] = relationship(back_populates="candidates")
     profile: Mapped["CandidateProfile"] = relationship(back_populates="candidate", uselist=False, cascade="all, delete-orphan")
 
@@ -43,6 +53,10 @@ class User(Base):
     candidates: Mapped[list["Candidate"]] = relationship(back_populates="user", cascade="all, delete-orphan")
 
 
+# /admin/users keyset pages by (lower(username), id); an expression index, so declared outside the class
+Index("ix_users_lower_username_id", func.lower(User.username), User.id)
+
+
 class CandidateProfile(Base):
     __tablename__ = "candidate_profiles"
 
@@ -60,8 +74,22 @@ class CandidateProfile(Base):
 
     candidate: Mapped["Candidate"] = relationship(back_populates="profile")
 
+def pack_html_body(html: str | None) -> dict:
+    """Column values for an offer body: zlib-compressed bytes + sha256 (also for Core bulk UPDATEs)."""
+    if html is None:
+        return {"html_body_z": None, "html_body_sha256": None}
+    raw = html.encode("utf-8")
+    return {"html_body_z": zlib.compress(raw, 6), "html_body_sha256": hashlib.sha256(raw).hexdigest()}
+
+
 class Offer(Base):
     __tablename__ = "offers"
+    # offer-expiry sweep: range scan over Sent offers by deadline (services.offer_expiry);
+    # list_offers(status=...) newest first
+    __table_args__ = (
+        Index("ix_offers_status_expire_at", "status", "expire_at"),
+        Index("ix_offers_status_id", "status", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     candidate_id: Mapped[int] = mapped_column(ForeignKey("candidates.id"), index=True)
@@ -75,8 +103,11 @@ class Offer(Base):
     status: Mapped[OfferStatus] = mapped_column(Enum(OfferStatus), default=OfferStatus.DRAFT, nullable=False)
 
     # 审计/存档
-    html_body: Mapped[str | None] = mapped_column(Text)
+    # rendered body, compressed and deferred: loaded only when .html_body is read (see pack_html_body)
+    html_body_z: Mapped[bytes | None] = mapped_column(LargeBinary, deferred=True)
+    html_body_sha256: Mapped[str | None] = mapped_column(String(64))
     pdf_path: Mapped[str | None] = mapped_column(String(500))        # 未签署版 PDF 路径
+    pdf_sha256: Mapped[str | None] = mapped_column(String(64))       # of the issued PDF, checked when signing (services.signing)
     signed_pdf_path: Mapped[str | None] = mapped_column(String(500)) # 已签署版 PDF 路径
     signed_at: Mapped[datetime | None]
     signed_by_name: Mapped[str | None] = mapped_column(String(200))  # 候选人输入的签名名（简化 e-sign）
@@ -86,9 +117,26 @@ class Offer(Base):
 
     candidate: Mapped["Candidate"] = relationship(back_populates="offers")
 
+    @property
+    def html_body(self) -> str | None:
+        return None if self.html_body_z is None else zlib.decompress(self.html_body_z).decode("utf-8")
+
+    @html_body.setter
+    def html_body(self, html: str | None) -> None:
+        values = pack_html_body(html)
+        # an unchanged body is never rewritten (and the deferred column never loaded to check)
+        if values["html_body_sha256"] != self.html_body_sha256:
+            self.html_body_z = values["html_body_z"]
+            self.html_body_sha256 = values["html_body_sha256"]
+
 
 class OfferSignatureToken(Base):
     __tablename__ = "offer_signature_tokens"
+    # the sweeper's range scans (services.token_sweeper)
+    __table_args__ = (
+        Index("ix_offer_signature_tokens_expires_at", "expires_at"),
+        Index("ix_offer_signature_tokens_used_at", "used_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     offer_id: Mapped[int] = mapped_column(ForeignKey("offers.id"), index=True)
@@ -101,3 +149,52 @@ class OfferSignatureToken(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     offer: Mapped["Offer"] = relationship()
+
+
+class OfferJob(Base):
+    """Progress of an offer created in async mode (render -> pdf -> token -> send), see services.offer_pipeline."""
+    __tablename__ = "offer_jobs"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)   # uuid4 hex
+    offer_id: Mapped[int] = mapped_column(ForeignKey("offers.id"), index=True)
+
+    status: Mapped[str] = mapped_column(String(20), default="queued", index=True)  # queued | running | done | failed
+    step: Mapped[str | None] = mapped_column(String(20))             # current / last step
+    error: Mapped[str | None] = mapped_column(Text)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+
+    offer: Mapped["Offer"] = relationship()
+
+
+class OutboxEmail(Base):
+    """Outgoing mail, written in the same transaction as the change that triggers it; drained by app.services.outbox."""
+    __tablename__ = "email_outbox"
+    __table_args__ = (Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    kind: Mapped[str] = mapped_column(String(50))                    # "invite" | "offer"
+    to_email: Mapped[str] = mapped_column(String(320))
+    domain: Mapped[str] = mapped_column(String(255))                 # recipient domain, for rate limits
+    payload: Mapped[str] = mapped_column(Text)                       # JSON kwargs for the sender
+
+    status: Mapped[str] = mapped_column(String(20), default="pending")  # pending | sending | sent | dead
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    locked_by: Mapped[str | None] = mapped_column(String(100))
+    locked_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    last_error: Mapped[str | None] = mapped_column(Text)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+
+
+class Counter(Base):
+    """Denormalised row counts ("candidates", "candidates.status:Hired", ...), kept by app.services.counters."""
+    __tablename__ = "counters"
+
+    name: Mapped[str] = mapped_column(String(200), primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
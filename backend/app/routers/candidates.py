@@ -1,6 +1,7 @@
 # app/routers/candidates.py
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, EmailStr
 from typing import Optional
@@ -9,7 +10,8 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
 from app.database import get_db
-from app import models
+from app import models, schemas
+from app.services import candidate_import
 
 router = APIRouter()
 
@@ -55,3 +57,45 @@ def api_create_candidate(
     except IntegrityError:
         db.rollback()
         return JSONResponse({"detail": "Email already exists for a candidate."}, status_code=409)
+
+
+# --- bulk import (CSV / NDJSON body), see services.candidate_import ---
+@router.post("/api/v1/hr/recruitment/candidates/import", response_model=schemas.CandidateImportOut)
+async def api_import_candidates(
+    request: Request,
+    format: Optional[str] = None,
+    on_conflict: str = "skip",
+    db: Session = Depends(get_db),
+):
+    session_user = request.session.get("user")
+    if not session_user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    # ?format=, else from Content-Type (text/csv, application/x-ndjson)
+    fmt = (format or ("ndjson" if "json" in request.headers.get("content-type", "") else "csv")).lower()
+    if fmt not in candidate_import.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(candidate_import.FORMATS)}")
+    if on_conflict not in candidate_import.CONFLICT_MODES:
+        raise HTTPException(status_code=400, detail=f"on_conflict must be one of: {', '.join(candidate_import.CONFLICT_MODES)}")
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > candidate_import.MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"Import larger than {candidate_import.MAX_BYTES} bytes")
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Import must be UTF-8")
+
+    # validation + inserts are CPU/DB work: keep them off the event loop
+    try:
+        return await run_in_threadpool(
+            candidate_import.import_records,
+            db,
+            candidate_import.parse(text, fmt),
+            session_user["id"],
+            on_conflict=on_conflict,
+        )
+    except ValueError as exc:  # the session's user no longer exists
+        raise HTTPException(status_code=400, detail=str(exc))
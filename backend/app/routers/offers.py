@@ -1,19 +1,24 @@
-from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
-from datetime import datetime
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app import schemas, models
-from app import crud
-from app.services.documents import generate_original_files
-from app.services import mailer
+from app import crud, crud_async
+from app.services.pdf_engine import PdfQueueFull
+from app.services import export, offer_pipeline
 
 router = APIRouter()
 
+# async mode: commit a Draft offer, return 202 + job id, render/token/send in the background
+OFFER_CREATE_ASYNC = os.getenv("OFFER_CREATE_ASYNC", "0") == "1"
+
+
 @router.post("/admin/offers", response_model=schemas.OfferOut)
 def create_and_send_offer(
     data: schemas.OfferCreate,
-    background_tasks: BackgroundTasks,
     request: Request,
     db: Session = Depends(get_db),
 ):
@@ -22,59 +27,72 @@ def create_and_send_offer(
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
 
-    #Crreate the ooffer
-    offer = crud.create_offer(db, data)
+    #Crreate the ooffer (Draft is committed before rendering; see offer_pipeline.process_offer)
+    offer = crud.create_offer(db, data, candidate=candidate, commit=False)
 
-    #渲染并生成原版文件
-    context = {
-        "candidate_name": getattr(candidate, "full_name", getattr(candidate, "name", "Candidate")),
-        "job_title": data.job_title,
-        "salary": data.salary,
-        "start_date": data.start_date,
-        "offer_valid_until": data.expire_at,
-        "company_name": os.getenv("COMPANY_NAME", "Your Company"),
-        "location": os.getenv("COMPANY_LOCATION", "Melbourne"),
-        "hr_contact_name": os.getenv("EMAIL_FROM_NAME", "HR Team"),
-        "hr_contact_email": os.getenv("SMTP_USER", "hr@example.com"),
-        "offer_id": offer.id,
-        "now": datetime.utcnow(),
-    }
-    orig_html_path, orig_pdf_path = generate_original_files(
-        offer_id=offer.id, template_name="offer_default.html", context=context
-    )
+    # ?async=1 (or OFFER_CREATE_ASYNC=1): hand the pipeline to a background job
+    async_param = request.query_params.get("async")
+    if async_param == "1" or (async_param is None and OFFER_CREATE_ASYNC):
+        job = offer_pipeline.create_job(db, offer)
+        db.commit()  # Draft offer + job in one transaction
+        offer_pipeline.submit_job(job.id)
+        return JSONResponse(
+            {
+                "job_id": job.id,
+                "offer_id": offer.id,
+                "status": "queued",
+                "status_url": f"{request.scope.get('root_path', '')}/api/admin/offers/jobs/{job.id}",
+            },
+            status_code=202,
+        )
 
-    #把   HTML 内容也写回
-    html_body = None
+    db.commit()
     try:
-        with open(orig_html_path, "r", encoding="utf-8") as f:
-            html_body = f.read()
-    except Exception:
-        pass
+        offer = offer_pipeline.process_offer(db, offer, candidate)
+    except PdfQueueFull:
+        raise HTTPException(status_code=503, detail="Offer documents are busy rendering, please retry shortly")
+    return offer
+
+
+@router.get("/admin/offers/export")
+def export_offers(
+    status: models.OfferStatus | None = None,
+    candidate_id: int | None = None,
+    format: str = "csv",
+    gzip: bool = False,
+):
+    # every offer matching crud.list_offers' filters, newest first, streamed (services.export)
+    O = models.Offer
+    stmt = (
+        select(
+            O.id, O.candidate_id, O.job_title, O.salary, O.start_date, O.expire_at, O.status,
+            O.signed_at, O.signed_by_name, O.created_at,
+        )
+        .where(*crud.offer_filters(status=status, candidate_id=candidate_id))
+        .order_by(O.id.desc())
+    )
+    return export.streaming_export(stmt, "offers", fmt=format.lower(), gzip=gzip)
 
-    offer = crud.update_offer_files(db, offer_id=offer.id, html_body=html_body, pdf_path=orig_pdf_path)
 
-    # 5) Create one time sign token
-    raw_token = crud.create_signature_token(db, offer_id=offer.id, ttl_hours=int(os.getenv("OFFER_TOKEN_TTL_HOURS", "72")))
-    base_url = os.getenv("BASE_URL", "http://127.0.0.1:8000")
-    offer_link = f"{base_url}/api/offers/preview?token={raw_token}"  
+@router.get("/admin/offers/jobs/{job_id}", response_model=schemas.OfferJobOut)
+async def get_offer_job(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    # polled by clients of async offer creation: keep it off the threadpool
+    job = await crud_async.get_offer_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
-    #MArk as SENT
-    offer = crud.mark_offer_sent(db, offer.id)
 
-    #异步发信
-    to_email = getattr(candidate, "email", None) or os.getenv("DEV_FALLBACK_EMAIL", "")
-    if to_email:
-        background_tasks.add_task(
-            mailer.send_offer_email,
-            to_email=to_email,
-            candidate_name=context["candidate_name"],
-            offer_link=offer_link,
-            company_name=os.getenv("COMPANY_NAME"),
-            expire_at=data.expire_at,
-        )
-    else:
-        # 无收件人就跳过发信，避免后台任务报错
-        print("[offers] skip sending email: no candidate.email and no DEV_FALLBACK_EMAIL")
+OFFER_BATCH_MAX = int(os.getenv("OFFER_BATCH_MAX", "500"))
 
 
-    return offer
+@router.post("/admin/offers/batch", response_model=schemas.OfferBatchOut)
+def create_and_send_offers_batch(
+    data: list[schemas.OfferCreate],
+    db: Session = Depends(get_db),
+):
+    if len(data) > OFFER_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {OFFER_BATCH_MAX} offers per batch")
+    results = offer_pipeline.issue_batch(db, data)
+    created = sum(1 for r in results if r.ok)
+    return schemas.OfferBatchOut(created=created, failed=len(results) - created, results=results)
@@ -1,45 +1,46 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-import os
 from pathlib import Path
 
-from .. import models, schemas, crud, database
+from .. import models, schemas, crud_async, database
+from ..services import facets, storage, uploads
 
 router = APIRouter(prefix="/portal", tags=["portal"])
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+templates.env.globals["file_url"] = storage.url
 
-UPLOAD_DIR = BASE_DIR / "uploads"
-UPLOAD_DIR.mkdir(exist_ok=True)
+# uploads go through a route class that refuses oversized bodies before parsing them
+upload_router = APIRouter(route_class=uploads.SizeLimitedRoute)
 
 
-def get_current_user(request: Request, db: Session = Depends(database.get_db)) -> models.User:
+async def get_current_user(request: Request, db: AsyncSession = Depends(database.get_async_db)) -> models.User:
     user = request.session.get("user")
     if not user:
         # Not logged in
         raise HTTPException(status_code=401, detail="Not authenticated")
-    db_user = db.query(models.User).filter(models.User.id == user["id"]).first()
+    db_user = await crud_async.get_user(db, user["id"])
     if not db_user:
         raise HTTPException(status_code=401, detail="User not found")
     return db_user
 
 
 @router.get("/profile", response_class=HTMLResponse)
-def profile_form(
+async def profile_form(
     request: Request,
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    candidate = crud.get_candidate_by_user(db, user_id=int(current_user.id))
+    candidate = await crud_async.get_candidate_by_user(db, user_id=int(current_user.id))
     if not candidate:
         return templates.TemplateResponse(
             "dashboard.html",
             {"request": request, "user": current_user, "error": "No candidate record associated with this account."},
         )
-    profile = crud.get_or_create_profile(db, candidate.id)
+    profile = await crud_async.get_or_create_profile(db, candidate.id)
     return templates.TemplateResponse(
         "profile.html",
         {"request": request, "user": current_user, "candidate": candidate, "profile": profile},
@@ -47,17 +48,17 @@ def profile_form(
 
 
 @router.post("/profile", response_class=HTMLResponse)
-def profile_submit(
+async def profile_submit(
     request: Request,
     summary: Optional[str] = Form(None),
     skills: Optional[str] = Form(None),
     linkedin: Optional[str] = Form(None),
     address: Optional[str] = Form(None),
     job_title: Optional[str] = Form(None),   # <-- NEW: role/title field
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    candidate = crud.get_candidate_by_user(db, user_id=int(current_user.id))
+    candidate = await crud_async.get_candidate_by_user(db, user_id=int(current_user.id))
     if not candidate:
         raise HTTPException(status_code=400, detail="No candidate linked to this user")
 
@@ -65,54 +66,57 @@ def profile_submit(
     candidate.job_title = (job_title or "").strip()
     db.add(candidate)
 
-    # Update CandidateProfile fields
+    # Update CandidateProfile fields (one unit of work with the job_title change)
     update = schemas.CandidateProfileUpdate(
         summary=summary, skills=skills, linkedin=linkedin, address=address
     )
-    profile = crud.update_profile(db, candidate.id, update)
+    profile = await crud_async.update_profile(db, candidate.id, update, commit=False)
 
-    db.commit()
+    await db.commit()
+    facets.invalidate()
     return templates.TemplateResponse(
         "profile.html",
         {"request": request, "user": current_user, "candidate": candidate, "profile": profile, "saved": True},
     )
 
 
-@router.post("/profile/upload")
+@upload_router.post("/profile/upload")
 async def upload_file(
     request: Request,
     kind: str = Form(...),  # 'resume' or 'photo'
     file: UploadFile = File(...),
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
     current_user: models.User = Depends(get_current_user),
 ):
     if kind not in {"resume", "photo"}:
         raise HTTPException(status_code=400, detail="kind must be 'resume' or 'photo'")
-    candidate = crud.get_candidate_by_user(db, user_id=int(current_user.id))
+    candidate = await crud_async.get_candidate_by_user(db, user_id=int(current_user.id))
     if not candidate:
         raise HTTPException(status_code=400, detail="No candidate linked to this user")
 
-    filename = file.filename or ""
-    ext = os.path.splitext(filename)[1] or (".png" if kind == "photo" else ".pdf")
+    ext = uploads.safe_ext(file.filename, ".png" if kind == "photo" else ".pdf")
 
-    # Save under uploads/{candidate_id}/
-    folder = UPLOAD_DIR / str(candidate.id)
-    folder.mkdir(parents=True, exist_ok=True)
-    dest = folder / f"{kind}{ext}"
-    with open(dest, "wb") as f:
-        f.write(await file.read())
+    # Stream into the content-addressed store (key uploads/<sha256><ext>); identical files are kept once
+    try:
+        stored = await uploads.store_upload(file, ext=ext)
+    except uploads.UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
 
-    _prof = crud.set_profile_file(db, candidate.id, kind, str(dest))
+    async with crud_async.unit_of_work(db):
+        await crud_async.set_profile_file(db, candidate.id, kind, stored.path, commit=False)
     return RedirectResponse(url="/portal/profile", status_code=303)
 
 
+router.include_router(upload_router)
+
+
 @router.get("/profile/admin/{user_id}", response_class=HTMLResponse)
-def profile_admin(user_id: int, request: Request, db: Session = Depends(database.get_db)):
+async def profile_admin(user_id: int, request: Request, db: AsyncSession = Depends(database.get_async_db)):
     # Admin view of a user's profile (no session requirement)
-    db_user = db.query(models.User).filter(models.User.id == user_id).first()
+    db_user = await crud_async.get_user(db, user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
-    candidate = crud.get_candidate_by_user(db, user_id=int(db_user.id))
+    candidate = await crud_async.get_candidate_by_user(db, user_id=int(db_user.id))
     if not candidate:
         return templates.TemplateResponse(
             "profile.html",
@@ -125,7 +129,7 @@ def profile_admin(user_id: int, request: Request, db: Session = Depends(database
                 "error": "No candidate record linked to this user.",
             },
         )
-    profile = crud.get_or_create_profile(db, candidate.id)
+    profile = await crud_async.get_or_create_profile(db, candidate.id)
     return templates.TemplateResponse(
         "profile.html",
         {"request": request, "user": db_user, "candidate": candidate, "profile": profile, "admin_view": True},
@@ -133,7 +137,7 @@ def profile_admin(user_id: int, request: Request, db: Session = Depends(database
 
 
 @router.post("/profile/admin/{user_id}")
-def admin_save_profile(
+async def admin_save_profile(
     user_id: int,
     request: Request,
     summary: Optional[str] = Form(None),
@@ -141,15 +145,15 @@ def admin_save_profile(
     linkedin: Optional[str] = Form(None),
     address: Optional[str] = Form(None),
     job_title: Optional[str] = Form(None),   # <-- NEW: role/title field
-    db: Session = Depends(database.get_db),
+    db: AsyncSession = Depends(database.get_async_db),
 ):
     # Locate the target user
-    db_user = db.query(models.User).filter(models.User.id == user_id).first()
+    db_user = await crud_async.get_user(db, user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Ensure a candidate exists (create if missing to allow admin editing)
-    candidate = crud.get_candidate_by_user(db, user_id=int(db_user.id))
+    candidate = await crud_async.get_candidate_by_user(db, user_id=int(db_user.id))
     if not candidate:
         candidate = models.Candidate(
             user_id=db_user.id,
@@ -159,19 +163,19 @@ def admin_save_profile(
             status="Applied",
         )
         db.add(candidate)
-        db.flush()
+        await db.flush()
 
     # Update Candidate.job_title (Role)
     candidate.job_title = (job_title or "").strip()
     db.add(candidate)
 
-    # Ensure profile exists and update profile fields
-    _ = crud.get_or_create_profile(db, candidate.id)
+    # Ensure profile exists and update profile fields (single commit for candidate + profile)
     update = schemas.CandidateProfileUpdate(
         summary=summary, skills=skills, linkedin=linkedin, address=address
     )
-    profile = crud.update_profile(db, candidate.id, update)
+    await crud_async.update_profile(db, candidate.id, update, commit=False)
 
-    db.commit()
+    await db.commit()
+    facets.invalidate()
     # Redirect back to the admin view (shows "saved" banner if you want to check query param)
     return RedirectResponse(url=f"/portal/profile/admin/{db_user.id}?saved=1", status_code=303)
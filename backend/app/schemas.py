@@ -78,6 +78,7 @@ class OfferOut(BaseModel):
     expire_at: Optional[datetime] = None
     status: Literal["Draft", "Sent", "Signed", "Expired", "Cancelled"]  
     pdf_path: Optional[str] = None
+    pdf_sha256: Optional[str] = None
     signed_pdf_path: Optional[str] = None
     signed_at: Optional[datetime] = None
     signed_by_name: Optional[str] = None
@@ -89,3 +90,52 @@ class OfferOut(BaseModel):
 
 class OfferSignIn(BaseModel):
     signer_name: str
+
+# Async offer creation (202 + job status)
+class OfferJobOut(BaseModel):
+    id: str
+    offer_id: int
+    status: Literal["queued", "running", "done", "failed"]
+    step: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+    offer: Optional[OfferOut] = None
+
+    class Config:
+        from_attributes = True
+
+# Batch offer issuance
+class OfferBatchItem(BaseModel):
+    index: int                      # position in the request list
+    candidate_id: int
+    ok: bool
+    offer_id: Optional[int] = None
+    status: Optional[str] = None
+    pdf_path: Optional[str] = None
+    error: Optional[str] = None
+
+class OfferBatchOut(BaseModel):
+    created: int
+    failed: int
+    results: list[OfferBatchItem]
+
+# Bulk candidate import (services.candidate_import)
+class CandidateImportRow(CandidateCreate):
+    applied_on: Optional[datetime] = None   # job-board exports carry it; DB default otherwise
+
+class CandidateImportItem(BaseModel):
+    row: int                        # 1-based data row in the file
+    result: Literal["created", "updated", "skipped", "duplicate", "invalid", "failed"]
+    candidate_id: Optional[int] = None
+    email: Optional[str] = None
+    error: Optional[str] = None
+
+class CandidateImportOut(BaseModel):
+    created: int
+    updated: int
+    skipped: int
+    invalid: int
+    failed: int = 0                 # rows of a chunk the database rejected (rolled back)
+    results: list[CandidateImportItem]
@@ -0,0 +1,214 @@
+# backend/app/services/candidate_import.py
+"""
+Bulk candidate import from CSV or NDJSON (job-board exports).
+
+Rows are validated with schemas.CandidateImportRow and written CHUNK_SIZE at a time: one SELECT
+finds which emails already exist, one multi-row INSERT ... ON CONFLICT (email) DO NOTHING
+(on_conflict="skip") or DO UPDATE (on_conflict="update") writes the chunk, and the chunk is
+committed with its counter and search-index updates, then the facet cache is invalidated. Every
+input row gets a result; a bad row never fails the others. An email repeated within the file is
+imported once ("duplicate" after). A chunk the database rejects is rolled back and its rows are
+reported "failed"; chunks committed before it stay.
+
+    POST /api/v1/hr/recruitment/candidates/import?format=csv&on_conflict=skip
+    python -m app.cli candidates-import FILE --user-id N [--format ndjson] [--on-conflict update]
+
+Other dialects than SQLite/PostgreSQL get plain INSERT/UPDATE statements per chunk.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Iterator
+
+from pydantic import ValidationError
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.services import counters, facets, search
+
+CHUNK_SIZE = int(os.getenv("CANDIDATE_IMPORT_CHUNK", "1000"))
+MAX_BYTES = int(os.getenv("CANDIDATE_IMPORT_MAX_BYTES", str(50 * 1024 * 1024)))
+FORMATS = ("csv", "ndjson")
+CONFLICT_MODES = ("skip", "update")
+# columns an "update" import may overwrite (never status or the owning user)
+UPDATABLE = ("first_name", "last_name", "mobile", "job_title", "address")
+
+
+# =========================
+# Parsing
+# =========================
+def parse(text: str, fmt: str) -> Iterator[dict | str]:
+    """Records as dicts; a line that can't be decoded is yielded as its error message."""
+    if fmt == "csv":
+        for record in csv.DictReader(io.StringIO(text)):
+            # blank cells mean "not given", not empty strings
+            yield {k.strip(): (v.strip() or None) if isinstance(v, str) else v for k, v in record.items() if k}
+    elif fmt == "ndjson":
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield f"invalid JSON: {exc}"
+                continue
+            yield record if isinstance(record, dict) else "each line must be a JSON object"
+    else:
+        raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+
+
+def _error_text(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in exc.errors())
+
+
+# =========================
+# Writing
+# =========================
+def _values(row: schemas.CandidateImportRow, user_id: int) -> dict:
+    values = {
+        "first_name": row.first_name,
+        "last_name": row.last_name,
+        "email": row.email,
+        "mobile": row.mobile or "",
+        "job_title": row.job_title or "",
+        "address": row.address or "",
+        "status": "Applied",
+        "user_id": user_id,
+    }
+    if row.applied_on:
+        values["applied_on"] = row.applied_on
+    return values
+
+
+def _write_chunk(db: Session, rows: list[dict], existing: dict[str, int], on_conflict: str) -> dict[str, int]:
+    """Write one chunk; returns {email: id} for the rows inserted or updated."""
+    C = models.Candidate
+    table = C.__table__
+    dialect = db.get_bind().dialect.name
+    # applied_on is optional per row, and a multi-row INSERT needs the same keys everywhere
+    if any("applied_on" in r for r in rows):
+        now = datetime.utcnow()
+        rows = [{"applied_on": now, **r} for r in rows]
+
+    if dialect in ("postgresql", "sqlite"):
+        ins = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(table)
+        if on_conflict == "update":
+            stmt = ins.on_conflict_do_update(
+                index_elements=[table.c.email], set_={c: ins.excluded[c] for c in UPDATABLE}
+            )
+        else:
+            stmt = ins.on_conflict_do_nothing(index_elements=[table.c.email])
+        return {email: id_ for id_, email in db.execute(stmt.returning(table.c.id, table.c.email), rows)}
+
+    written: dict[str, int] = {}
+    new_rows = [r for r in rows if r["email"] not in existing]
+    if new_rows:
+        written.update({email: id_ for id_, email in db.execute(
+            insert(table).returning(table.c.id, table.c.email), new_rows
+        )})
+    if on_conflict == "update":
+        updates = [{"b_email": r["email"], **{c: r[c] for c in UPDATABLE}} for r in rows if r["email"] in existing]
+        if updates:
+            db.execute(update(table).where(table.c.email == bindparam("b_email")), updates)
+            written.update({u["b_email"]: existing[u["b_email"]] for u in updates})
+    return written
+
+
+def import_records(
+    db: Session,
+    records: Iterable[dict | str],
+    user_id: int,
+    *,
+    on_conflict: str = "skip",
+    chunk_size: int = CHUNK_SIZE,
+) -> schemas.CandidateImportOut:
+    if on_conflict not in CONFLICT_MODES:
+        raise ValueError(f"on_conflict must be one of: {', '.join(CONFLICT_MODES)}")
+    # checked once here: a bad owner would otherwise fail every chunk on the foreign key
+    if db.get(models.User, user_id) is None:
+        raise ValueError(f"User {user_id} not found")
+    C = models.Candidate
+    results: list[schemas.CandidateImportItem] = []
+    seen: set[str] = set()
+    numbered = enumerate(records, start=1)
+
+    while True:
+        chunk = list(islice(numbered, chunk_size))
+        if not chunk:
+            break
+
+        # ---- validate
+        valid: list[tuple[int, dict]] = []
+        for row_no, record in chunk:
+            if isinstance(record, str):
+                results.append(schemas.CandidateImportItem(row=row_no, result="invalid", error=record))
+                continue
+            try:
+                row = schemas.CandidateImportRow.model_validate(record)
+            except ValidationError as exc:
+                results.append(schemas.CandidateImportItem(
+                    row=row_no, result="invalid", email=str(record.get("email") or "") or None, error=_error_text(exc)
+                ))
+                continue
+            if row.email in seen:
+                results.append(schemas.CandidateImportItem(
+                    row=row_no, result="duplicate", email=row.email, error="email repeated earlier in the file"
+                ))
+                continue
+            seen.add(row.email)
+            valid.append((row_no, _values(row, user_id)))
+        if not valid:
+            continue
+
+        # ---- write (one transaction per chunk)
+        emails = [v["email"] for _n, v in valid]
+        try:
+            existing = dict(db.execute(select(C.email, C.id).where(C.email.in_(emails))).all())
+            written = _write_chunk(db, [v for _n, v in valid], existing, on_conflict)
+
+            created_ids = [id_ for email, id_ in written.items() if email not in existing]
+            if created_ids:
+                counters.apply(db, {
+                    counters.total_key(C): len(created_ids),
+                    counters.status_key(C, "Applied"): len(created_ids),
+                })
+            if written:
+                search.reindex_candidates(db.connection(), written.values())
+            db.commit()
+        except SQLAlchemyError as exc:
+            db.rollback()
+            error = f"chunk rolled back: {type(exc).__name__}: {getattr(exc, 'orig', None) or exc}"[:500]
+            results.extend(
+                schemas.CandidateImportItem(row=row_no, result="failed", email=v["email"], error=error)
+                for row_no, v in valid
+            )
+            continue
+        if written:
+            facets.invalidate()  # new candidates, or job_title rewritten in "update" mode
+
+        for row_no, v in valid:
+            email = v["email"]
+            if email not in written:
+                # lost an insert race to another writer in skip mode, or already there
+                results.append(schemas.CandidateImportItem(
+                    row=row_no, result="skipped", candidate_id=existing.get(email), email=email,
+                    error="a candidate with this email already exists",
+                ))
+            else:
+                results.append(schemas.CandidateImportItem(
+                    row=row_no, result="updated" if email in existing else "created",
+                    candidate_id=written[email], email=email,
+                ))
+
+    results.sort(key=lambda r: r.row)
+    tally = {k: sum(1 for r in results if r.result == k) for k in ("created", "updated", "skipped", "invalid", "failed")}
+    tally["skipped"] += sum(1 for r in results if r.result == "duplicate")
+    return schemas.CandidateImportOut(**tally, results=results)
@@ -0,0 +1,203 @@
+# backend/app/services/counters.py
+"""
+Row counters for the admin dashboard, so it never runs COUNT(*) on a page load.
+
+Each tracked model gets a total ("candidates") and, if it has a status column, one counter per
+status ("candidates.status:Hired"). A session after_flush hook turns the flush's inserts,
+deletes and status changes into `value = value + delta` upserts on the `counters` table, inside
+the same transaction as the change, so create/convert/delete paths need no extra code.
+Core bulk statements (insert()/update() executemany) skip the hook: call `apply()` next to them.
+
+Reads go through a per-process cache (COUNTERS_CACHE_TTL seconds, cleared on this process's own
+commits). `ensure()` at startup fills an empty table; drift is fixed with
+
+    python -m app.cli counters-reconcile
+
+New dashboard cards plug in with `track(Model, "status_attr")` and read `snapshot(db)`.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import Counter as Deltas
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, event, func, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import AsyncSyncSession, SessionLocal, engine
+
+CACHE_TTL = float(os.getenv("COUNTERS_CACHE_TTL", "30"))
+
+# model -> name of its status attribute (None: total only)
+TRACKED: dict[type, Optional[str]] = {}
+
+
+def track(model: type, status_attr: Optional[str] = None) -> None:
+    TRACKED[model] = status_attr
+
+
+track(models.Candidate, "status")
+track(models.User)
+track(models.Offer, "status")
+
+
+def total_key(model: type) -> str:
+    return model.__tablename__
+
+
+def status_key(model: type, status) -> str:
+    return f"{model.__tablename__}.status:{getattr(status, 'value', status)}"
+
+
+# ---- writes
+def _upsert(conn: Connection, deltas: dict[str, int]) -> None:
+    table = models.Counter.__table__
+    now = datetime.utcnow()
+    # fixed order: concurrent transactions lock the counter rows in the same sequence
+    rows = [{"name": k, "value": v, "updated_at": now} for k, v in sorted(deltas.items()) if v]
+    if not rows:
+        return
+    dialect = conn.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        ins = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(table)
+        conn.execute(
+            ins.on_conflict_do_update(
+                index_elements=[table.c.name],
+                set_={"value": table.c.value + ins.excluded.value, "updated_at": ins.excluded.updated_at},
+            ),
+            rows,
+        )
+        return
+    for row in rows:
+        changed = conn.execute(
+            update(table)
+            .where(table.c.name == row["name"])
+            .values(value=table.c.value + row["value"], updated_at=now)
+        ).rowcount
+        if not changed:
+            conn.execute(table.insert().values(**row))
+
+
+def apply(db: Session, deltas: dict[str, int]) -> None:
+    """Add `deltas` in the session's transaction (for bulk statements the flush hook can't see)."""
+    _upsert(db.connection(), deltas)
+    db.info["counters_dirty"] = True
+
+
+def _status_of(obj, attr: str):
+    return getattr(getattr(obj, attr), "value", getattr(obj, attr))
+
+
+@event.listens_for(SessionLocal, "after_flush")
+@event.listens_for(AsyncSyncSession, "after_flush")
+def _count_flush(session, flush_context) -> None:
+    deltas: Deltas = Deltas()
+    for objs, sign in ((session.new, 1), (session.deleted, -1)):
+        for obj in objs:
+            model = type(obj)
+            if model not in TRACKED:
+                continue
+            deltas[total_key(model)] += sign
+            if TRACKED[model]:
+                deltas[status_key(model, _status_of(obj, TRACKED[model]))] += sign
+    for obj in session.dirty:
+        attr = TRACKED.get(type(obj))
+        if not attr:
+            continue
+        hist = inspect(obj).attrs[attr].history
+        if hist.has_changes():
+            for old in hist.deleted:
+                deltas[status_key(type(obj), old)] -= 1
+            for new in hist.added:
+                deltas[status_key(type(obj), new)] += 1
+    if any(deltas.values()):
+        apply(session, deltas)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+@event.listens_for(AsyncSyncSession, "after_commit")
+def _drop_cache_on_commit(session) -> None:
+    if session.info.pop("counters_dirty", False):
+        invalidate()
+
+
+# ---- reads
+_cache: tuple[float, dict[str, int]] = (0.0, {})
+_cache_lock = threading.Lock()
+
+
+def invalidate() -> None:
+    global _cache
+    with _cache_lock:
+        _cache = (0.0, {})
+
+
+def snapshot(db: Session) -> dict[str, int]:
+    """All counters by name (cached for CACHE_TTL seconds). Missing names mean 0."""
+    global _cache
+    loaded_at, values = _cache
+    if values and time.monotonic() - loaded_at < CACHE_TTL:
+        return values
+    values = {name: value for name, value in db.execute(select(models.Counter.name, models.Counter.value))}
+    with _cache_lock:
+        _cache = (time.monotonic(), values)
+    return values
+
+
+def statuses(values: dict[str, int], model: type) -> dict[str, int]:
+    """{status: count} for `model` out of a snapshot."""
+    prefix = f"{model.__tablename__}.status:"
+    return {k[len(prefix):]: v for k, v in values.items() if k.startswith(prefix) and v}
+
+
+# ---- reconcile
+def _actual(conn: Connection) -> dict[str, int]:
+    actual: dict[str, int] = {}
+    for model, attr in TRACKED.items():
+        if attr:
+            column = getattr(model, attr)
+            total = 0
+            for status, n in conn.execute(select(column, func.count()).group_by(column)):
+                actual[status_key(model, status)] = n
+                total += n
+            actual[total_key(model)] = total
+        else:
+            actual[total_key(model)] = conn.execute(select(func.count()).select_from(model)).scalar_one()
+    return actual
+
+
+def reconcile() -> dict[str, tuple[int, int]]:
+    """Recount everything and overwrite the table. Returns {name: (stored, actual)} for drifted counters."""
+    table = models.Counter.__table__
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # writers' counter upserts wait for this transaction, so their deltas land on top of the recount
+            conn.exec_driver_sql("LOCK TABLE counters IN EXCLUSIVE MODE")
+        stored = {name: value for name, value in conn.execute(select(table.c.name, table.c.value))}
+        actual = _actual(conn)
+        conn.execute(delete(table))
+        now = datetime.utcnow()
+        rows = [{"name": k, "value": v, "updated_at": now} for k, v in sorted(actual.items()) if v]
+        if rows:
+            conn.execute(table.insert(), rows)
+    invalidate()
+    names = set(stored) | set(actual)
+    return {
+        name: (stored.get(name, 0), actual.get(name, 0))
+        for name in sorted(names)
+        if stored.get(name, 0) != actual.get(name, 0)
+    }
+
+
+def ensure() -> None:
+    """Fill the counters from the tables if they have never been computed."""
+    with engine.connect() as conn:
+        empty = conn.execute(select(models.Counter.name).limit(1)).first() is None
+    if empty:
+        reconcile()
@@ -1,16 +1,38 @@
 # backend/app/services/documents.py
+"""
+Offer documents, rendered once and kept in memory: the HTML is a string, the PDF comes back from
+the render pool as bytes (pdf_engine renders straight from the string). Writing them anywhere is
+the caller's last step, store_offer_files(), so the service works without a writable disk.
+
+  OFFER_STORE_HTML    1 = also keep an .html copy next to the PDF in storage (default 0: the
+                      rendered HTML is already in Offer.html_body)
+  OFFER_DEFER_WRITES  1 = store_offer_files() returns the keys at once and writes on a
+                      background thread once the caller's session commits (flushed at shutdown);
+                      a PDF that then fails to write is unlinked from its offer again
+"""
 from __future__ import annotations
 
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 from datetime import datetime
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import SessionLocal
+from app.services.pdf_engine import RenderJob, get_engine
+from app.services.storage import get_storage
 
 BASE_DIR = Path(__file__).resolve().parent.parent  # backend/app
 BACKEND_DIR = BASE_DIR.parent                      # backend
 TEMPLATES_DIR = BACKEND_DIR / "templates" / "offers"
-OUTPUT_DIR = BACKEND_DIR / "generated" / "offers"
+STORE_HTML = os.getenv("OFFER_STORE_HTML", "0") == "1"
+DEFER_WRITES = os.getenv("OFFER_DEFER_WRITES", "0") == "1"
 
 env = Environment(
     loader=FileSystemLoader(str(TEMPLATES_DIR)),
@@ -34,28 +56,16 @@ def render_offer_html(template_name: str, context: dict) -> str:
     return template.render(**context)
 
 
-def save_offer_html(offer_id: int, html: str, *, suffix: str = "") -> str:
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+def offer_key(offer_id: int, suffix: str, ext: str) -> str:
+    # storage key, e.g. "offers/offer_12_orig.pdf" (see app.services.storage)
     suffix = f"_{suffix}" if suffix else ""
-    path = OUTPUT_DIR / f"offer_{offer_id}{suffix}.html"
-    path.write_text(html, encoding="utf-8")
-    return str(path)
+    return f"offers/offer_{offer_id}{suffix}.{ext}"
 
 
-def html_to_pdf(html_path: str) -> Optional[str]:
-    pdf_path = html_path.replace(".html", ".pdf") #transfer html to pdf
-    try:
-        from weasyprint import HTML  # type: ignore
-        HTML(filename=html_path).write_pdf(pdf_path)
-        return pdf_path
-    except Exception:
-        pass
-    try:
-        import pdfkit  # type: ignore
-        pdfkit.from_file(html_path, pdf_path)
-        return pdf_path
-    except Exception:
-        return None
+def html_to_pdf(html: str, *, wait: bool = True) -> Union[Optional[bytes], RenderJob]:
+    # transfer html to pdf on the warm render pool (see pdf_engine); None if no renderer / render failed
+    job = get_engine().submit(html)
+    return job.result() if wait else job
 
 
 def append_signature_footer(html: str, *, signer_name: str, signed_at: datetime, ip: Optional[str]) -> str:
@@ -75,29 +85,111 @@ def append_signature_footer(html: str, *, signer_name: str, signed_at: datetime,
     return html + footer
 
 
-def generate_original_files(
+def render_original(
     *,
-    offer_id: int,
     template_name: str = "offer_default.html",
-    context: dict
-) -> tuple[str, Optional[str]]:
+    context: dict,
+    wait: bool = True,
+) -> tuple[str, Union[Optional[bytes], RenderJob]]:
+    # (html, pdf bytes); wait=False returns a RenderJob instead of the bytes (job.result() / await job.wait())
     html = render_offer_html(template_name, context)
-    html_path = save_offer_html(offer_id, html, suffix="orig")
-    pdf_path = html_to_pdf(html_path)
-    return html_path, pdf_path
+    return html, html_to_pdf(html, wait=wait)
 
 
-def generate_signed_files(
+def render_signed(
     *,
-    offer_id: int,
-    original_html_path: str,
+    original_html: str,
     signer_name: str,
     signed_at: datetime,
-    ip: Optional[str]
-) -> tuple[str, Optional[str]]:
-    src = Path(original_html_path) #create signed version
-    html = src.read_text(encoding="utf-8")
-    signed_html = append_signature_footer(html, signer_name=signer_name, signed_at=signed_at, ip=ip)
-    signed_html_path = save_offer_html(offer_id, signed_html, suffix="signed")
-    signed_pdf_path = html_to_pdf(signed_html_path)
-    return signed_html_path, signed_pdf_path
+    ip: Optional[str],
+    wait: bool = True,
+) -> tuple[str, Union[Optional[bytes], RenderJob]]:
+    # the original is Offer.html_body; no file is read back
+    signed_html = append_signature_footer(original_html, signer_name=signer_name, signed_at=signed_at, ip=ip)
+    return signed_html, html_to_pdf(signed_html, wait=wait)
+
+
+# =========================
+# Persistence (last step)
+# =========================
+_writer: Optional[ThreadPoolExecutor] = None
+_writer_lock = threading.Lock()
+
+
+def _unlink_pdf(offer_id: int, key: str) -> None:
+    """Clear whichever committed column points at `key`: signing then re-renders instead of stamping."""
+    O = models.Offer
+    try:
+        with SessionLocal() as db:
+            db.execute(update(O).where(O.id == offer_id, O.pdf_path == key).values(pdf_path=None, pdf_sha256=None))
+            db.execute(update(O).where(O.id == offer_id, O.signed_pdf_path == key).values(signed_pdf_path=None))
+            db.commit()
+    except Exception as exc:
+        print(f"[documents] offer {offer_id} still points at unwritten {key}: {exc}")
+
+
+def _deferred_put(offer_id: int, key: str, data: bytes) -> None:
+    try:
+        get_storage().put(key, data)
+    except Exception as exc:  # nobody is waiting on a deferred write: report it here
+        print(f"[documents] storing {key} failed: {exc}")
+        if key.endswith(".pdf"):
+            _unlink_pdf(offer_id, key)
+
+
+def _submit_write(offer_id: int, key: str, data: bytes) -> None:
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="offer-docs")
+        _writer.submit(_deferred_put, offer_id, key, data)
+
+
+# deferred writes wait for the commit that stores their keys, so a failed write can always be
+# unlinked afterwards; a rollback drops them along with the keys
+@event.listens_for(SessionLocal, "after_commit")
+def _write_on_commit(session) -> None:
+    for write in session.info.pop("offer_writes", ()):
+        _submit_write(*write)
+
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _drop_on_rollback(session, previous_transaction) -> None:
+    session.info.pop("offer_writes", None)
+
+
+def store_offer_files(
+    offer_id: int,
+    *,
+    suffix: str,
+    html: Optional[str] = None,
+    pdf: Optional[bytes] = None,
+    defer: bool = DEFER_WRITES,
+    db: Optional[Session] = None,
+) -> Optional[str]:
+    """Write the rendered documents to storage; returns the PDF's key (None without a PDF).
+
+    Deferred writes are held until `db` (the session that will store the key) commits.
+    """
+    writes = []
+    if pdf is not None:
+        writes.append((offer_key(offer_id, suffix, "pdf"), pdf))
+    if html is not None and STORE_HTML:
+        writes.append((offer_key(offer_id, suffix, "html"), html.encode("utf-8")))
+    for key, data in writes:
+        if not defer:
+            get_storage().put(key, data)
+        elif db is not None:
+            db.info.setdefault("offer_writes", []).append((offer_id, key, data))
+        else:
+            _submit_write(offer_id, key, data)
+    return offer_key(offer_id, suffix, "pdf") if pdf is not None else None
+
+
+def flush_writes() -> None:
+    """Wait for deferred writes (called at shutdown)."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.shutdown(wait=True)
@@ -0,0 +1,101 @@
+"""
+Status / role facet counts for the /admin/users filter bar.
+
+One GROUP BY (status, job_title) query under the date and keyword filters gives every count the
+dropdowns need: status counts are summed over the selected role, role counts over the selected
+status (each facet ignores its own selection, so the other options stay visible with their counts).
+
+Results are cached per process, keyed by the filter tuple, for FACETS_CACHE_TTL seconds. Routes
+that change a candidate's status or role call `invalidate()` after their commit; other processes
+see the change when their entry expires.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.services import search
+
+CACHE_TTL = float(os.getenv("FACETS_CACHE_TTL", "60"))
+CACHE_MAX_ENTRIES = 256
+
+
+@dataclass(frozen=True)
+class WorkerFacets:
+    # (status, job_title) -> number of workers
+    cells: dict[tuple[str, str], int] = field(default_factory=dict)
+
+    def status_counts(self, role: str = "") -> dict[str, int]:
+        counts: Counter = Counter()
+        for (status, job_title), n in self.cells.items():
+            if not role or job_title == role:
+                counts[status] += n
+        return dict(counts)
+
+    def role_counts(self, status: str = "") -> dict[str, int]:
+        counts: Counter = Counter()
+        for (s, job_title), n in self.cells.items():
+            if job_title and (not status or s == status):
+                counts[job_title] += n
+        return dict(counts)
+
+
+_cache: dict[tuple, tuple[float, WorkerFacets]] = {}
+_cache_lock = threading.Lock()
+
+
+def invalidate() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def _query(
+    db: Session,
+    statuses: tuple[str, ...],
+    start_dt: Optional[datetime],
+    end_dt: Optional[datetime],
+    q: str,
+) -> WorkerFacets:
+    C = models.Candidate
+    stmt = (
+        select(C.status, C.job_title, func.count())
+        .join(models.User, C.user_id == models.User.id)  # same rows as the list's User/Candidate join
+        .where(C.status.in_(statuses))
+        .group_by(C.status, C.job_title)
+    )
+    if start_dt:
+        stmt = stmt.where(C.applied_on >= start_dt)
+    if end_dt:
+        stmt = stmt.where(C.applied_on < end_dt + timedelta(days=1))
+    if q:
+        stmt = stmt.where(search.candidate_filter(q))
+    return WorkerFacets({(status, job_title or ""): n for status, job_title, n in db.execute(stmt)})
+
+
+def worker_facets(
+    db: Session,
+    statuses: Iterable[str],
+    start_dt: Optional[datetime] = None,
+    end_dt: Optional[datetime] = None,
+    q: str = "",
+) -> WorkerFacets:
+    """Counts per (status, role) for candidates in `statuses` under the date/keyword filters."""
+    key = (tuple(sorted(statuses)), start_dt, end_dt, q)
+    hit = _cache.get(key)
+    if hit and time.monotonic() - hit[0] < CACHE_TTL:
+        return hit[1]
+    facets = _query(db, *key)
+    with _cache_lock:
+        if len(_cache) >= CACHE_MAX_ENTRIES:
+            _cache.pop(next(iter(_cache)))  # oldest insert first
+        _cache[key] = (time.monotonic(), facets)
+    return facets
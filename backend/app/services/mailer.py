@@ -1,8 +1,10 @@
-import os, ssl, smtplib
+import os, ssl, threading
 from email.message import EmailMessage
 from datetime import datetime
 import certifi  # 使用 certifi 的 CA
 
+from app.services.smtp_pool import SMTPPool
+
 SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
 SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
 
@@ -19,13 +21,40 @@ try:
 except Exception:
     pass
 
+# Connection pool (keep-alive, one login per connection instead of per mail)
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "4"))
+SMTP_POOL_MAX_MESSAGES = int(os.getenv("SMTP_POOL_MAX_MESSAGES", "100"))
+SMTP_POOL_MAX_IDLE = float(os.getenv("SMTP_POOL_MAX_IDLE", "60"))
+
+_pool: SMTPPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> SMTPPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SMTPPool(
+                SMTP_HOST,
+                SMTP_PORT,
+                username=SMTP_USER,
+                password=SMTP_PASS,
+                use_ssl=SMTP_PORT == 465,   # 465: SMTPS；587: STARTTLS
+                starttls=SMTP_PORT != 465,
+                tls_context=TLS_CONTEXT,
+                timeout=10,
+                max_size=SMTP_POOL_SIZE,
+                max_messages=SMTP_POOL_MAX_MESSAGES,
+                max_idle=SMTP_POOL_MAX_IDLE,
+            )
+        return _pool
+
 def send_invite_email(to_email: str, first_name: str | None, temp_password: str):
+    # raise rather than return: the outbox would record a mail that never went out as sent
     if not (SMTP_USER and SMTP_PASS):
-        print("[mailer] missing SMTP creds: set SMTP_USERNAME/SMTP_PASSWORD (or SMTP_USER/SMTP_PASS) in .env")
-        return
-    if not to_email:                 
-        print("[mailer] missing recipient email") 
-        return
+        raise RuntimeError("missing SMTP creds: set SMTP_USERNAME/SMTP_PASSWORD (or SMTP_USER/SMTP_PASS) in .env")
+    if not to_email:
+        raise ValueError("Missing recipient email")
 
     subject = "Your NDIS Candidate Portal Access"
     html = f"""
@@ -48,17 +77,8 @@ def send_invite_email(to_email: str, first_name: str | None, temp_password: str)
     msg.set_content("Please view this email in HTML.")
     msg.add_alternative(html, subtype="html")
 
-    # 连接并发送（带超时 + TLS；支持 465/587）
-    if SMTP_PORT == 465:
-        with smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, context=TLS_CONTEXT, timeout=10) as server:
-            server.login(SMTP_USER, SMTP_PASS)
-            server.send_message(msg)
-    else:
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=10) as server:
-            server.ehlo()
-            server.starttls(context=TLS_CONTEXT)
-            server.login(SMTP_USER, SMTP_PASS)
-            server.send_message(msg)
+    # 通过连接池发送（带超时 + TLS；支持 465/587）
+    get_pool().send(msg)
 
 def _send_html_via_smtp(to_email: str, subject: str, html: str) -> None:
     if not to_email:
@@ -78,17 +98,7 @@ def _send_html_via_smtp(to_email: str, subject: str, html: str) -> None:
     # HTML 正文
     msg.add_alternative(html, subtype="html")
 
-    # 465: SMTPS；587: STARTTLS
-    if SMTP_PORT == 465:
-        with smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, context=TLS_CONTEXT, timeout=10) as server:
-            server.login(SMTP_USER, SMTP_PASS)
-            server.send_message(msg)
-    else:
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=10) as server:
-            server.ehlo()
-            server.starttls(context=TLS_CONTEXT)
-            server.login(SMTP_USER, SMTP_PASS)
-            server.send_message(msg)
+    get_pool().send(msg)
 
 
 def send_offer_email(
@@ -0,0 +1,256 @@
+# backend/app/services/metrics.py
+"""
+Request and database metrics, published in Prometheus text format at /admin/metrics.
+
+`MetricsMiddleware` times every request and labels it with the route template ("/admin/users",
+"/api/offers/{offer_id}"), not the raw path. Cursor events on the sync engine and on the async
+engine's sync core count statements and DB time; the per-request tally lives in a ContextVar, so
+it follows the request into threadpool routes and AsyncSession.run_sync.
+
+  METRICS_QUERY_WARN   warn when one request runs more than N statements (default 0 = off);
+                       the usual sign of an N+1 loop
+  METRICS_SLOW_WARN_MS warn when one request takes longer than N ms (default 0 = off)
+
+No client library: counters and histograms are plain dicts under a lock, rendered on scrape.
+Values are per process; with several workers, scrape each one (or sum in Prometheus).
+"""
+from __future__ import annotations
+
+import contextvars
+import os
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+QUERY_WARN = int(os.getenv("METRICS_QUERY_WARN", "0"))
+SLOW_WARN_MS = float(os.getenv("METRICS_SLOW_WARN_MS", "0"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+@dataclass
+class RequestStats:
+    statements: int = 0
+    db_seconds: float = 0.0
+    scope: Optional[dict] = None  # ASGI scope, for the route template
+
+
+_current: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("request_stats", default=None)
+
+
+def current() -> Optional[RequestStats]:
+    """Tally for the request being served (None outside a request, e.g. in the outbox worker)."""
+    return _current.get()
+
+
+def current_route() -> Optional[str]:
+    """Method and route template of the request being served, e.g. "GET /admin/users"."""
+    stats = _current.get()
+    if stats is None or stats.scope is None:
+        return None
+    return f"{stats.scope['method']} {_route_template(stats.scope)}"
+
+
+# =========================
+# Registry
+# =========================
+class _Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+_lock = threading.Lock()
+_requests: dict[tuple[str, str, str], int] = {}            # (method, route, status) -> n
+_latency: dict[tuple[str, str], _Histogram] = {}           # (method, route)
+_queries: dict[tuple[str, str], _Histogram] = {}           # statements per request
+_db_seconds: dict[tuple[str, str], float] = {}
+_db_totals = {"statements": 0, "seconds": 0.0}             # including work outside requests
+_engines: dict[str, Engine] = {}
+
+
+def record_request(method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+    key = (method, route)
+    with _lock:
+        _requests[(method, route, str(status))] = _requests.get((method, route, str(status)), 0) + 1
+        _latency.setdefault(key, _Histogram(LATENCY_BUCKETS)).observe(seconds)
+        _queries.setdefault(key, _Histogram(QUERY_BUCKETS)).observe(stats.statements)
+        _db_seconds[key] = _db_seconds.get(key, 0.0) + stats.db_seconds
+
+    if QUERY_WARN and stats.statements > QUERY_WARN:
+        print(f"[metrics] {method} {route}: {stats.statements} SQL statements in one request "
+              f"(threshold {QUERY_WARN}); possible N+1")
+    if SLOW_WARN_MS and seconds * 1000 > SLOW_WARN_MS:
+        print(f"[metrics] {method} {route}: {seconds * 1000:.0f} ms "
+              f"({stats.db_seconds * 1000:.0f} ms in {stats.statements} statements)")
+
+
+# =========================
+# SQL instrumentation
+# =========================
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("metrics_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+    with _lock:
+        _db_totals["statements"] += 1
+        _db_totals["seconds"] += elapsed
+
+
+def instrument(engine: Engine, name: str) -> None:
+    """Count statements and expose pool stats for `engine` (a sync Engine or AsyncEngine.sync_engine)."""
+    if name in _engines:
+        return
+    _engines[name] = engine
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# =========================
+# Middleware
+# =========================
+def _route_template(scope) -> str:
+    route = scope.get("route")  # set by FastAPI when a route matched
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    root = scope.get("root_path", "")
+    for mount in ("/static",):
+        if scope.get("path", "").startswith(root + mount + "/"):
+            return mount + "/{path}"
+    return "<unmatched>"  # 404s: don't let scanners create one series per path
+
+
+class MetricsMiddleware:
+    """ASGI middleware: latency, status and SQL statement count per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope=scope)
+        token = _current.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def _send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _current.reset(token)
+            record_request(scope["method"], _route_template(scope), status, time.perf_counter() - started, stats)
+
+
+# =========================
+# Exposition
+# =========================
+def _labels(**labels) -> str:
+    def _esc(v: str) -> str:
+        return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+    return "{" + ",".join(f'{k}="{_esc(v)}"' for k, v in labels.items()) + "}"
+
+
+def _histogram_lines(name: str, hist: _Histogram, **labels) -> list[str]:
+    lines = []
+    cumulative = 0
+    for bound, n in zip(hist.bounds, hist.counts):
+        cumulative += n
+        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+    lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {hist.count}")
+    lines.append(f"{name}_sum{_labels(**labels)} {hist.sum}")
+    lines.append(f"{name}_count{_labels(**labels)} {hist.count}")
+    return lines
+
+
+def _pool_lines() -> list[str]:
+    lines = [
+        "# HELP db_pool_connections Connections by state for each engine's pool.",
+        "# TYPE db_pool_connections gauge",
+        "# HELP db_pool_overflow Connections opened beyond pool_size (negative: unused pool slots).",
+        "# TYPE db_pool_overflow gauge",
+    ]
+    for name, engine in _engines.items():
+        pool = engine.pool
+        for state, getter in (("size", "size"), ("checked_out", "checkedout"), ("checked_in", "checkedin")):
+            fn = getattr(pool, getter, None)
+            if fn is not None:
+                lines.append(f"db_pool_connections{_labels(engine=name, state=state)} {fn()}")
+        if hasattr(pool, "overflow"):
+            lines.append(f"db_pool_overflow{_labels(engine=name)} {pool.overflow()}")
+    return lines
+
+
+def render() -> str:
+    """Everything in Prometheus text exposition format (version 0.0.4)."""
+    with _lock:
+        requests = sorted(_requests.items())
+        latency = sorted((k, _copy(h)) for k, h in _latency.items())
+        queries = sorted((k, _copy(h)) for k, h in _queries.items())
+        db_seconds = sorted(_db_seconds.items())
+        totals = dict(_db_totals)
+
+    lines = ["# HELP http_requests_total Requests by route template and status.", "# TYPE http_requests_total counter"]
+    for (method, route, status), n in requests:
+        lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {n}")
+
+    lines += ["# HELP http_request_duration_seconds Request latency.", "# TYPE http_request_duration_seconds histogram"]
+    for (method, route), hist in latency:
+        lines += _histogram_lines("http_request_duration_seconds", hist, method=method, route=route)
+
+    lines += ["# HELP http_request_db_statements SQL statements per request.", "# TYPE http_request_db_statements histogram"]
+    for (method, route), hist in queries:
+        lines += _histogram_lines("http_request_db_statements", hist, method=method, route=route)
+
+    lines += ["# HELP http_request_db_seconds_total Time spent in SQL per route.", "# TYPE http_request_db_seconds_total counter"]
+    for (method, route), seconds in db_seconds:
+        lines.append(f"http_request_db_seconds_total{_labels(method=method, route=route)} {seconds}")
+
+    lines += [
+        "# HELP db_statements_total SQL statements executed by this process.",
+        "# TYPE db_statements_total counter",
+        f"db_statements_total {totals['statements']}",
+        "# HELP db_statement_seconds_total Time spent executing SQL in this process.",
+        "# TYPE db_statement_seconds_total counter",
+        f"db_statement_seconds_total {totals['seconds']}",
+    ]
+    lines += _pool_lines()
+    return "\n".join(lines) + "\n"
+
+
+def _copy(hist: _Histogram) -> _Histogram:
+    out = _Histogram(hist.bounds)
+    out.counts, out.sum, out.count = list(hist.counts), hist.sum, hist.count
+    return out
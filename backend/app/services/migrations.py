@@ -0,0 +1,85 @@
+# backend/app/services/migrations.py
+"""
+Versioned schema migrations (Alembic, backend/migrations/), run as a deploy step rather than at
+app startup:
+
+    python -m app.cli db-upgrade [REVISION]     # default: head
+    python -m app.cli db-downgrade REVISION
+    python -m app.cli db-current
+
+A database built by the old create_all() startup has the tables but no alembic_version; the first
+upgrade stamps it at the baseline revision and carries on from there. The app itself only checks
+that the schema is current, and refuses to start if it isn't.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+
+from sqlalchemy import inspect
+
+from app.database import engine
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+BASELINE = "0001"
+
+
+def config():
+    from alembic.config import Config
+
+    return Config(str(BASE_DIR / "alembic.ini"))
+
+
+def current() -> str | None:
+    from alembic.runtime.migration import MigrationContext
+
+    with engine.connect() as conn:
+        return MigrationContext.configure(conn).get_current_revision()
+
+
+def head() -> str | None:
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(config()).get_current_head()
+
+
+def _adopt_unversioned() -> bool:
+    """Stamp a create_all()-built database at the baseline; True if it was one."""
+    from alembic import command
+
+    tables = set(inspect(engine).get_table_names())
+    if "alembic_version" in tables or "candidates" not in tables:
+        return False
+    command.stamp(config(), BASELINE)
+    return True
+
+
+def upgrade(revision: str = "head") -> None:
+    from alembic import command
+
+    if _adopt_unversioned():
+        print(f"[db] existing schema without migration history, stamped at {BASELINE}")
+    command.upgrade(config(), revision)
+
+
+def downgrade(revision: str) -> None:
+    from alembic import command
+
+    command.downgrade(config(), revision)
+
+
+def check() -> None:
+    """Startup check: raise RuntimeError if the schema isn't at the revision the code expects.
+
+    The startup hooks after it (search index, counters, outbox) need the tables, and would otherwise
+    fail with a bare "no such table".
+    """
+    try:
+        at, expected = current(), head()
+    except ImportError:
+        print("[db] alembic not installed; can't check the schema revision")
+        return
+    if at != expected:
+        raise RuntimeError(
+            f"database schema at revision {at or 'none'}, code expects {expected}: "
+            "run `python -m app.cli db-upgrade` first"
+        )
@@ -0,0 +1,82 @@
+# backend/app/services/offer_expiry.py
+"""
+Offer-expiry sweeper: Sent offers past their expire_at become Expired.
+
+Set-based, OFFER_EXPIRY_BATCH offers per transaction. Each batch picks overdue ids from the
+(status, expire_at) index and flips them with one UPDATE that re-checks the status, so an offer
+signed in between is left alone:
+
+    python -m app.cli offers-expire            # one pass, e.g. from cron
+    python -m app.cli offers-expire --loop     # run forever, every OFFER_EXPIRY_INTERVAL seconds
+
+OFFER_EXPIRY_INPROCESS=1 runs the loop in a daemon thread of the web process instead.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select, update
+
+from app import models
+from app.database import SessionLocal
+from app.services import counters
+
+BATCH_SIZE = int(os.getenv("OFFER_EXPIRY_BATCH", "500"))
+INTERVAL = float(os.getenv("OFFER_EXPIRY_INTERVAL", "300"))
+
+
+def expire_once(batch_size: int = BATCH_SIZE, now: Optional[datetime] = None) -> int:
+    """Move overdue Sent offers to Expired. Returns how many changed."""
+    O = models.Offer
+    now = now or datetime.utcnow()
+    sent, expired = models.OfferStatus.SENT, models.OfferStatus.EXPIRED
+    total = 0
+    db = SessionLocal()
+    try:
+        while True:
+            ids = list(db.scalars(
+                select(O.id)
+                .where(O.status == sent, O.expire_at < now)
+                .order_by(O.expire_at)
+                .limit(batch_size)
+            ))
+            if not ids:
+                break
+            changed = db.execute(
+                update(O).where(O.id.in_(ids), O.status == sent).values(status=expired),
+                execution_options={"synchronize_session": False},
+            ).rowcount
+            if changed:
+                counters.apply(db, {
+                    counters.status_key(O, sent): -changed,
+                    counters.status_key(O, expired): changed,
+                })
+            db.commit()
+            total += changed
+            if len(ids) < batch_size:
+                break
+    finally:
+        db.close()
+    return total
+
+
+def run(*, stop: Optional[threading.Event] = None, interval: float = INTERVAL, **options) -> None:
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        try:
+            count = expire_once(**options)
+            if count:
+                print(f"[offers] expired {count} overdue offers")
+        except Exception as exc:  # keep the schedule going; the next pass retries
+            print(f"[offers] expiry sweep failed: {exc}")
+        stop.wait(interval)
+
+
+def start_background_sweeper() -> threading.Event:
+    """Expire offers from a daemon thread in this process (dev / single-box setups)."""
+    stop = threading.Event()
+    threading.Thread(target=run, kwargs={"stop": stop}, name="offer-expiry", daemon=True).start()
+    return stop
@@ -0,0 +1,416 @@
+# backend/app/services/offer_pipeline.py
+"""
+Offer document pipeline: render HTML -> PDF -> signature token -> queue email -> mark Sent.
+
+`process_offer` runs it inline (the classic POST /api/admin/offers). In async mode the route only
+commits the Draft offer plus an OfferJob row and returns 202; `submit_job` then runs the same
+pipeline on a small thread pool, recording the current step on the job so
+GET /api/admin/offers/jobs/{id} can report progress. Jobs survive restarts: `resume_pending`
+(called at startup) re-submits queued jobs and ones stuck in "running" past OFFER_JOB_STALE_SECONDS.
+
+`sign_offer` is the candidate's side: it stamps the signature onto the issued PDF (services.signing)
+instead of rendering the offer again.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+
+from app import crud, models, schemas
+from app.database import SessionLocal
+from app.services import counters, outbox, signing
+from app.services.documents import render_original, render_signed, store_offer_files
+from app.services.pdf_engine import PdfQueueFull
+from app.services.storage import get_storage
+
+PIPELINE_WORKERS = int(os.getenv("OFFER_PIPELINE_WORKERS", "4"))
+JOB_STALE_SECONDS = int(os.getenv("OFFER_JOB_STALE_SECONDS", "600"))
+# a job that finds the PDF queue full goes back to "queued" and is retried after a backoff
+JOB_BUSY_RETRY_SECONDS = float(os.getenv("OFFER_JOB_BUSY_RETRY_SECONDS", "5"))
+JOB_BUSY_MAX_RETRIES = int(os.getenv("OFFER_JOB_BUSY_MAX_RETRIES", "8"))
+TOKEN_TTL_HOURS = int(os.getenv("OFFER_TOKEN_TTL_HOURS", "72"))
+
+
+def build_context(candidate: models.Candidate, offer: models.Offer) -> dict:
+    return {
+        "candidate_name": getattr(candidate, "full_name", getattr(candidate, "name", "Candidate")),
+        "job_title": offer.job_title,
+        "salary": offer.salary,
+        "start_date": offer.start_date,
+        "offer_valid_until": offer.expire_at,
+        "company_name": os.getenv("COMPANY_NAME", "Your Company"),
+        "location": os.getenv("COMPANY_LOCATION", "Melbourne"),
+        "hr_contact_name": os.getenv("EMAIL_FROM_NAME", "HR Team"),
+        "hr_contact_email": os.getenv("SMTP_USER", "hr@example.com"),
+        "offer_id": offer.id,
+        "now": datetime.utcnow(),
+    }
+
+
+def _offer_link(raw_token: str) -> str:
+    base_url = os.getenv("BASE_URL", "http://127.0.0.1:8000")
+    return f"{base_url}/api/offers/preview?token={raw_token}"
+
+
+def _queue_offer_mail(
+    db: Session, candidate: models.Candidate, context: dict, offer_link: str, expire_at,
+) -> Optional[models.OutboxEmail]:
+    to_email = getattr(candidate, "email", None) or os.getenv("DEV_FALLBACK_EMAIL", "")
+    if to_email:
+        return outbox.enqueue(
+            db,
+            "offer",
+            to_email,
+            candidate_name=context["candidate_name"],
+            offer_link=offer_link,
+            company_name=os.getenv("COMPANY_NAME"),
+            expire_at=expire_at,
+        )
+    else:
+        # 无收件人就跳过发信
+        print("[offers] skip sending email: no candidate.email and no DEV_FALLBACK_EMAIL")
+        return None
+
+
+def process_offer(
+    db: Session,
+    offer: models.Offer,
+    candidate: models.Candidate,
+    *,
+    on_step: Optional[Callable[[str], None]] = None,
+) -> models.Offer:
+    """
+    Expects `offer` already committed as Draft, so no transaction is held open while rendering or
+    storing the PDF. Everything after that (html_body/pdf_path, token, outbox mail, Sent) is one
+    unit of work / one commit.
+    """
+    step = on_step or (lambda _name: None)
+    context = build_context(candidate, offer)
+
+    #渲染原版（HTML 字符串 + PDF bytes，都在内存里）
+    step("render")
+    html, pdf = render_original(template_name="offer_default.html", context=context)
+
+    # the PDF is the only thing written out; the HTML goes straight into html_body
+    step("pdf")
+    pdf_key = store_offer_files(offer.id, suffix="orig", html=html, pdf=pdf, db=db)
+    with crud.unit_of_work(db):
+        crud.update_offer_files(
+            db, offer=offer, html_body=html, pdf_path=pdf_key,
+            pdf_sha256=signing.sha256(pdf) if pdf else None, commit=False,
+        )
+
+        # Create one time sign token
+        step("token")
+        raw_token = crud.create_signature_token(db, offer=offer, ttl_hours=TOKEN_TTL_HOURS, commit=False)
+
+        #邮件写入 outbox，和 SENT 状态同一事务提交（由 outbox worker 发送）
+        step("send")
+        _queue_offer_mail(db, candidate, context, _offer_link(raw_token), offer.expire_at)
+
+        #MArk as SENT
+        crud.mark_offer_sent(db, offer=offer, commit=False)
+    return offer
+
+
+# =========================
+# Batch issuance
+# =========================
+def issue_batch(db: Session, items: list[schemas.OfferCreate]) -> list[schemas.OfferBatchItem]:
+    """
+    Issue many offers with a fixed number of round-trips:
+      1. one query for all candidates
+      2. one transaction: multi-row INSERT of Draft offers
+      3. render every document in parallel on the PDF pool (no transaction open meanwhile)
+      4. one transaction: bulk UPDATE files/status to Sent + multi-row INSERT of signature tokens
+         + outbox rows; offers that failed are Cancelled in the same transaction
+    Items fail individually (unknown candidate, render error or no PDF, mail or storage error);
+    the rest still go out. A failed item leaves no live Draft, token or mail behind, so retrying it
+    doesn't duplicate anything. The PDF is stored last, once its mail is queued.
+    """
+    results = [
+        schemas.OfferBatchItem(index=i, candidate_id=d.candidate_id, ok=False) for i, d in enumerate(items)
+    ]
+
+    candidate_ids = {d.candidate_id for d in items}
+    candidates = {
+        c.id: c for c in db.query(models.Candidate).filter(models.Candidate.id.in_(candidate_ids))
+    }
+    valid = []
+    for res, d in zip(results, items):
+        if d.candidate_id in candidates:
+            valid.append((res, d))
+        else:
+            res.error = "Candidate not found"
+
+    offer_ids = crud.create_offers_bulk(db, [d for _res, d in valid])
+    draft = counters.status_key(models.Offer, models.OfferStatus.DRAFT)
+    counters.apply(db, {counters.total_key(models.Offer): len(offer_ids), draft: len(offer_ids)})
+    db.commit()
+
+    # render: HTML inline (cheap), PDFs submitted to the pool and collected afterwards
+    rendered = []
+    for (res, d), offer_id in zip(valid, offer_ids):
+        res.offer_id, res.status = offer_id, models.OfferStatus.DRAFT.value
+        candidate = candidates[d.candidate_id]
+        offer = models.Offer(
+            id=offer_id, candidate_id=d.candidate_id, job_title=d.job_title, salary=d.salary,
+            start_date=d.start_date, expire_at=d.expire_at,
+        )
+        context = build_context(candidate, offer)
+        try:
+            html, job = render_original(template_name="offer_default.html", context=context, wait=False)
+        except PdfQueueFull as exc:
+            res.error = f"PDF queue full: {exc}"
+            continue
+        except Exception as exc:
+            res.error = f"Render failed: {exc}"
+            continue
+        rendered.append((res, d, candidate, context, html, job))
+
+    pdfs = []
+    for res, d, candidate, context, html, job in rendered:
+        pdf = job.result()
+        if pdf is None:
+            res.error = "PDF render failed or timed out"
+        else:
+            pdfs.append((res, d, candidate, context, html, pdf))
+
+    # tokens for the offers about to go out; any whose mail or PDF then fails are deleted again
+    raw_tokens = crud.create_signature_tokens_bulk(db, [res.offer_id for res, *_rest in pdfs], ttl_hours=TOKEN_TTL_HOURS)
+    updates, unsent = [], []
+    for res, d, candidate, context, html, pdf in pdfs:
+        mail = None
+        try:
+            mail = _queue_offer_mail(db, candidate, context, _offer_link(raw_tokens[res.offer_id]), d.expire_at)
+            pdf_path = store_offer_files(res.offer_id, suffix="orig", html=html, pdf=pdf, db=db)
+        except Exception as exc:
+            res.error = f"Sending failed: {exc}"
+            if mail is not None:
+                db.expunge(mail)
+            unsent.append(res.offer_id)
+            continue
+        res.pdf_path = pdf_path
+        updates.append(
+            {
+                "id": res.offer_id,
+                **models.pack_html_body(html),
+                "pdf_path": pdf_path,
+                "pdf_sha256": signing.sha256(pdf),
+                "status": models.OfferStatus.SENT,
+            }
+        )
+        res.ok, res.status = True, models.OfferStatus.SENT.value
+    if unsent:
+        T = models.OfferSignatureToken
+        db.execute(delete(T).where(T.offer_id.in_(unsent)))
+    failed = [res for res, _d in valid if res.offer_id is not None and not res.ok]
+    for res in failed:
+        res.status = models.OfferStatus.CANCELLED.value
+    changes = [{"id": res.offer_id, "status": models.OfferStatus.CANCELLED} for res in failed] + updates
+    if changes:
+        db.execute(update(models.Offer), changes)
+        sent = counters.status_key(models.Offer, models.OfferStatus.SENT)
+        cancelled = counters.status_key(models.Offer, models.OfferStatus.CANCELLED)
+        counters.apply(db, {draft: -len(changes), sent: len(updates), cancelled: len(failed)})
+    db.commit()
+    return results
+
+
+# =========================
+# Signing
+# =========================
+def sign_offer(
+    db: Session,
+    offer: models.Offer,
+    *,
+    signer_name: str,
+    ip: Optional[str] = None,
+) -> models.Offer:
+    """
+    Stamp the signature onto the issued PDF and mark the offer Signed (one commit). Without a
+    stored PDF, or one signing.stamp can't read, Offer.html_body is re-rendered with the signature
+    footer instead. An original that no longer matches Offer.pdf_sha256 raises signing.TamperError.
+    Only a Sent offer can be signed; any other status (Draft, Expired, Cancelled, already Signed)
+    raises ValueError.
+    """
+    _require_sent(offer)
+    signed_at = datetime.utcnow()
+    pdf = digest = None
+    if offer.pdf_path:
+        try:
+            original = get_storage().get(offer.pdf_path)
+            pdf, digest = signing.stamp(
+                original, signer_name=signer_name, signed_at=signed_at, ip=ip, expected_sha256=offer.pdf_sha256,
+            )
+        except signing.TamperError:
+            raise
+        except (KeyError, signing.SigningError) as exc:
+            print(f"[signing] offer {offer.id}: can't stamp {offer.pdf_path} ({exc}), re-rendering")
+    if pdf is None and offer.html_body:
+        _, pdf = render_signed(original_html=offer.html_body, signer_name=signer_name, signed_at=signed_at, ip=ip)
+
+    with crud.unit_of_work(db):
+        # re-read under a row lock: a concurrent signing (or the expiry sweep) may have got there
+        # first, and the signed PDF must not replace the one it stored
+        db.refresh(offer, with_for_update=True)
+        _require_sent(offer)
+        signed_key = store_offer_files(offer.id, suffix="signed", pdf=pdf, db=db)
+        if digest:
+            offer.pdf_sha256 = digest  # offers issued before pdf_sha256 existed
+        crud.mark_offer_signed(db, None, signer_name, signed_key, offer=offer, signed_at=signed_at, commit=False)
+    return offer
+
+
+def _require_sent(offer: models.Offer) -> None:
+    if offer.status != models.OfferStatus.SENT:
+        raise ValueError(f"Offer {offer.id} is {offer.status.value}, only a Sent offer can be signed")
+
+
+# =========================
+# Async jobs
+# =========================
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=PIPELINE_WORKERS, thread_name_prefix="offer-pipeline")
+        return _executor
+
+
+def create_job(db: Session, offer: models.Offer) -> models.OfferJob:
+    """Add a queued job for `offer`. Not committed: commit it together with the Draft offer."""
+    job = models.OfferJob(id=uuid.uuid4().hex, offer_id=offer.id, status="queued")
+    db.add(job)
+    return job
+
+
+def get_job(db: Session, job_id: str) -> Optional[models.OfferJob]:
+    return db.query(models.OfferJob).filter(models.OfferJob.id == job_id).first()
+
+
+def run_job(job_id: str) -> None:
+    db = SessionLocal()
+    try:
+        # claim: only one runner moves a job from queued to running
+        claimed = db.execute(
+            update(models.OfferJob)
+            .where(models.OfferJob.id == job_id, models.OfferJob.status == "queued")
+            .values(status="running", updated_at=datetime.utcnow()),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        db.commit()
+        if not claimed:
+            return
+
+        job = get_job(db, job_id)
+
+        def _step(name: str) -> None:
+            # progress goes through its own short session: the pipeline's session commits only once
+            with SessionLocal() as progress:
+                progress.execute(
+                    update(models.OfferJob)
+                    .where(models.OfferJob.id == job_id)
+                    .values(step=name, updated_at=datetime.utcnow()),
+                    execution_options={"synchronize_session": False},
+                )
+                progress.commit()
+
+        try:
+            offer = crud.get_offer_by_id(db, job.offer_id)
+            if offer is None:
+                raise ValueError(f"Offer {job.offer_id} not found")
+            # a resumed job whose earlier run already committed: don't mint a second token / mail
+            if offer.status == models.OfferStatus.DRAFT:
+                candidate = crud.get_candidate(db, offer.candidate_id)
+                if candidate is None:
+                    raise ValueError(f"Candidate {offer.candidate_id} not found")
+                process_offer(db, offer, candidate, on_step=_step)
+        except PdfQueueFull as exc:
+            db.rollback()
+            _retry_busy(db, job, exc)
+            return
+        except Exception as exc:
+            db.rollback()
+            db.refresh(job)
+            job.status = "failed"
+            job.error = f"{type(exc).__name__}: {exc}"[:2000]
+            job.finished_at = datetime.utcnow()
+            db.commit()
+            print(f"[offers] job {job_id} failed at step {job.step}: {job.error}")
+            return
+
+        _busy_retries.pop(job_id, None)
+        job.status, job.error = "done", None
+        job.finished_at = datetime.utcnow()
+        db.commit()
+    finally:
+        db.close()
+
+
+_busy_retries: dict[str, int] = {}
+
+
+def _retry_busy(db: Session, job: models.OfferJob, exc: Exception) -> None:
+    """PDF queue full: back to queued and resubmit after an exponential backoff (failed once exhausted)."""
+    db.refresh(job)
+    attempt = _busy_retries.get(job.id, 0) + 1
+    job.error = f"{type(exc).__name__}: {exc}"[:2000]
+    if attempt > JOB_BUSY_MAX_RETRIES:
+        _busy_retries.pop(job.id, None)
+        job.status = "failed"
+        job.finished_at = datetime.utcnow()
+        db.commit()
+        print(f"[offers] job {job.id} failed: PDF queue still full after {JOB_BUSY_MAX_RETRIES} retries")
+        return
+    _busy_retries[job.id] = attempt
+    delay = JOB_BUSY_RETRY_SECONDS * 2 ** (attempt - 1)
+    job.status = "queued"
+    db.commit()
+    # queued in the database too: if this process dies first, resume_pending picks it up
+    timer = threading.Timer(delay, submit_job, args=(job.id,))
+    timer.daemon = True
+    timer.start()
+
+
+def submit_job(job_id: str) -> None:
+    _pool().submit(run_job, job_id)
+
+
+def resume_pending() -> int:
+    """Re-submit queued jobs and jobs whose runner died mid-way (process restart)."""
+    db = SessionLocal()
+    try:
+        stale_before = datetime.utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+        db.execute(
+            update(models.OfferJob)
+            .where(models.OfferJob.status == "running", models.OfferJob.updated_at < stale_before)
+            .values(status="queued"),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+        ids = [j for (j,) in db.query(models.OfferJob.id).filter(models.OfferJob.status == "queued")]
+    finally:
+        db.close()
+    for job_id in ids:
+        submit_job(job_id)
+    return len(ids)
+
+
+def shutdown() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
@@ -0,0 +1,289 @@
+# backend/app/services/outbox.py
+"""
+Transactional email outbox.
+
+Request handlers call `enqueue(db, ...)` before their commit, so the mail row is stored atomically
+with the business change and nothing is sent from the web worker. One or more worker processes
+drain the table:
+
+    python -m app.cli outbox-worker            # run forever
+    python -m app.cli outbox-worker --once     # one batch, e.g. from cron
+
+Each worker claims a batch with a lease (FOR UPDATE SKIP LOCKED on PostgreSQL, so workers never
+share rows), sends through the pooled mailer, and on failure reschedules with exponential backoff.
+After OUTBOX_MAX_ATTEMPTS the row is dead-lettered (status "dead") for inspection / requeue.
+A crashed worker's rows become claimable again once their lease expires.
+"""
+from __future__ import annotations
+
+import json
+import os
+import random
+import secrets
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import SessionLocal
+
+BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "2"))
+LEASE_SECONDS = int(os.getenv("OUTBOX_LEASE_SECONDS", "300"))
+MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+BACKOFF_BASE = float(os.getenv("OUTBOX_BACKOFF_BASE", "30"))      # seconds; doubles per attempt
+BACKOFF_MAX = float(os.getenv("OUTBOX_BACKOFF_MAX", "3600"))
+DOMAIN_RATE_PER_MIN = float(os.getenv("OUTBOX_DOMAIN_RATE_PER_MIN", "60"))
+# per-domain overrides, e.g. "gmail.com=30,outlook.com=20"
+DOMAIN_RATES = {
+    d.strip().lower(): float(r)
+    for d, _, r in (item.partition("=") for item in os.getenv("OUTBOX_DOMAIN_RATES", "").split(","))
+    if d.strip() and r
+}
+
+
+# ---- enqueue (web side)
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"cannot store {type(value).__name__} in an outbox payload")
+
+
+def enqueue(db: Session, kind: str, to_email: str, **payload) -> models.OutboxEmail:
+    """Add a mail to the outbox. Does not commit: the caller's commit makes it durable."""
+    if kind not in SENDERS:
+        raise ValueError(f"unknown outbox kind {kind!r}")
+    row = models.OutboxEmail(
+        kind=kind,
+        to_email=to_email,
+        domain=to_email.rpartition("@")[2].lower(),
+        payload=json.dumps(payload, default=_json_default),
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.utcnow(),
+    )
+    db.add(row)
+    return row
+
+
+# ---- senders (worker side)
+def _send_invite(to_email: str, payload: dict) -> None:
+    """
+    The temporary password is minted here, at send time, and only its hash is stored: the outbox
+    never holds the credential. Every attempt (a retry, a requeued dead row) sets a fresh one.
+    Rows queued before user_id was in the payload find the user by address.
+    """
+    from app import crud
+    from app.services import mailer
+
+    temp_password = secrets.token_urlsafe(8)
+    with SessionLocal() as db:
+        if payload.get("user_id") is not None:
+            user = db.get(models.User, payload["user_id"])
+        else:
+            user = db.query(models.User).filter(models.User.email == to_email).first()
+        if user is None:
+            raise ValueError(f"no user for invite to {to_email}")
+        user.hashed_password = crud.get_password_hash(temp_password)
+        db.commit()
+    mailer.send_invite_email(to_email, payload.get("first_name"), temp_password)
+
+
+def _send_offer(to_email: str, payload: dict) -> None:
+    from app.services import mailer
+
+    expire_at = payload.get("expire_at")
+    mailer.send_offer_email(
+        to_email=to_email,
+        candidate_name=payload["candidate_name"],
+        offer_link=payload["offer_link"],
+        company_name=payload.get("company_name"),
+        expire_at=datetime.fromisoformat(expire_at) if expire_at else None,
+    )
+
+
+SENDERS: dict[str, Callable[[str, dict], None]] = {
+    "invite": _send_invite,
+    "offer": _send_offer,
+}
+
+
+class DomainRateLimiter:
+    """Token bucket per recipient domain (per worker process)."""
+
+    def __init__(self, default_per_min: float = DOMAIN_RATE_PER_MIN, overrides: Optional[dict] = None):
+        self.default_per_min = default_per_min
+        self.overrides = overrides if overrides is not None else DOMAIN_RATES
+        self._buckets: dict[str, tuple[float, float]] = {}  # domain -> (tokens, last refill)
+
+    def wait_time(self, domain: str) -> float:
+        """0 if a mail to `domain` may go now (and takes the token), else seconds until it may."""
+        rate = self.overrides.get(domain, self.default_per_min) / 60.0
+        if rate <= 0:
+            return 0.0
+        burst = max(1.0, rate * 60.0)
+        now = time.monotonic()
+        tokens, last = self._buckets.get(domain, (burst, now))
+        tokens = min(burst, tokens + (now - last) * rate)
+        if tokens >= 1:
+            self._buckets[domain] = (tokens - 1, now)
+            return 0.0
+        self._buckets[domain] = (tokens, now)
+        return (1 - tokens) / rate
+
+
+def _backoff(attempts: int) -> timedelta:
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** (attempts - 1)))
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def claim_batch(db: Session, worker_id: str, batch_size: int = BATCH_SIZE) -> list[models.OutboxEmail]:
+    now = datetime.utcnow()
+    Outbox = models.OutboxEmail
+    ready = or_(
+        and_(Outbox.status == "pending", Outbox.next_attempt_at <= now),
+        and_(Outbox.status == "sending", Outbox.locked_until < now),  # lease of a dead worker
+    )
+    ids = select(Outbox.id).where(ready).order_by(Outbox.next_attempt_at, Outbox.id).limit(batch_size)
+    if db.get_bind().dialect.name == "postgresql":
+        ids = ids.with_for_update(skip_locked=True)
+    db.execute(
+        update(Outbox)
+        .where(Outbox.id.in_(ids))
+        .values(status="sending", locked_by=worker_id, locked_until=now + timedelta(seconds=LEASE_SECONDS)),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+    return (
+        db.query(Outbox)
+        .filter(Outbox.locked_by == worker_id, Outbox.status == "sending")
+        .order_by(Outbox.id)
+        .all()
+    )
+
+
+def _renew_lease(db: Session, row: models.OutboxEmail, worker_id: str) -> bool:
+    """Restart the lease on `row` for one send; False if the lease ran out and another worker took it."""
+    Outbox = models.OutboxEmail
+    result = db.execute(
+        update(Outbox)
+        .where(Outbox.id == row.id, Outbox.locked_by == worker_id, Outbox.status == "sending")
+        .values(locked_until=datetime.utcnow() + timedelta(seconds=LEASE_SECONDS)),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def deliver(db: Session, row: models.OutboxEmail, limiter: DomainRateLimiter, worker_id: str) -> str:
+    """Send one claimed row and record the outcome. Returns sent | retry | throttled | dead | lost."""
+    # a slow batch can outlive the lease taken at claim time; re-check ownership row by row so
+    # a row re-claimed by another worker isn't sent twice
+    if not _renew_lease(db, row, worker_id):
+        return "lost"
+
+    wait = limiter.wait_time(row.domain)
+    if wait:
+        # over the domain's rate: hand it back without burning an attempt
+        row.status = "pending"
+        row.next_attempt_at = datetime.utcnow() + timedelta(seconds=wait)
+        row.locked_by = row.locked_until = None
+        db.commit()
+        return "throttled"
+
+    try:
+        SENDERS[row.kind](row.to_email, json.loads(row.payload))
+    except Exception as exc:
+        row.attempts += 1
+        row.last_error = f"{type(exc).__name__}: {exc}"[:2000]
+        row.locked_by = row.locked_until = None
+        if row.attempts >= MAX_ATTEMPTS:
+            row.status = "dead"
+            row.payload = _scrubbed(row.payload)
+            outcome = "dead"
+            print(f"[outbox] dead-lettered #{row.id} ({row.kind} -> {row.to_email}): {row.last_error}")
+        else:
+            row.status = "pending"
+            row.next_attempt_at = datetime.utcnow() + _backoff(row.attempts)
+            outcome = "retry"
+        db.commit()
+        return outcome
+
+    row.status = "sent"
+    row.sent_at = datetime.utcnow()
+    row.attempts += 1
+    row.last_error = None
+    row.locked_by = row.locked_until = None
+    row.payload = _scrubbed(row.payload)
+    db.commit()
+    return "sent"
+
+
+def _scrubbed(payload: str) -> str:
+    # invites queued before _send_invite minted the password carried it in plain text
+    data = json.loads(payload)
+    return json.dumps({k: v for k, v in data.items() if k != "temp_password"}) if "temp_password" in data else payload
+
+
+def run_worker(
+    *,
+    batch_size: int = BATCH_SIZE,
+    poll_interval: float = POLL_INTERVAL,
+    once: bool = False,
+    stop: Optional[threading.Event] = None,
+) -> dict:
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    limiter = DomainRateLimiter()
+    totals = {"sent": 0, "retry": 0, "throttled": 0, "dead": 0, "lost": 0}
+    stop = stop or threading.Event()
+
+    failures = 0
+    while not stop.is_set():
+        db = SessionLocal()
+        rows = []
+        try:
+            rows = claim_batch(db, worker_id, batch_size)
+            for row in rows:
+                totals[deliver(db, row, limiter, worker_id)] += 1
+            failures = 0
+        except Exception as exc:  # e.g. the database went away: keep the worker alive, back off
+            db.rollback()
+            failures += 1
+            print(f"[outbox] {worker_id}: batch failed ({type(exc).__name__}: {exc}), retry #{failures}")
+        finally:
+            db.close()
+        if rows:
+            print(f"[outbox] {worker_id}: batch of {len(rows)} -> {totals}")
+        if once:
+            break
+        if failures:
+            # rows claimed by the failed batch come back when their lease runs out
+            stop.wait(min(BACKOFF_MAX, poll_interval * 2 ** failures))
+        elif not rows:
+            stop.wait(poll_interval)
+    return totals
+
+
+def start_background_worker() -> threading.Event:
+    """Drain the outbox from a daemon thread in this process (dev / single-box setups)."""
+    stop = threading.Event()
+    threading.Thread(target=run_worker, kwargs={"stop": stop}, name="outbox-worker", daemon=True).start()
+    return stop
+
+
+def requeue_dead(db: Session) -> int:
+    """Put dead-lettered rows back in the queue (an invite gets a new temporary password when it goes out)."""
+    result = db.execute(
+        update(models.OutboxEmail)
+        .where(models.OutboxEmail.status == "dead")
+        .values(status="pending", attempts=0, next_attempt_at=datetime.utcnow()),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+    return result.rowcount
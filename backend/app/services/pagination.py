@@ -0,0 +1,148 @@
+# backend/app/services/pagination.py
+from __future__ import annotations
+
+import base64
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import DateTime, String, tuple_, type_coerce
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+DEFAULT_PAGE_SIZE = int(os.getenv("ADMIN_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("ADMIN_PAGE_SIZE_MAX", "500"))
+
+
+@dataclass
+class Page:
+    items: list
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    page_size: int = DEFAULT_PAGE_SIZE
+    total: Optional[int] = None  # only filled when asked for (approximate on PostgreSQL)
+
+
+# cursor = urlsafe base64 of {"k": [sort key values], "d": "next" | "prev"}
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    raise TypeError(f"cannot encode {type(value).__name__} in a cursor")
+
+
+def _json_hook(obj: dict):
+    if "$dt" in obj:
+        return datetime.fromisoformat(obj["$dt"])
+    return obj
+
+
+def encode_cursor(key: Sequence[Any], direction: str) -> str:
+    raw = json.dumps({"k": list(key), "d": direction}, default=_json_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[tuple[list, str]]:
+    # a broken / tampered cursor just means "first page"
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded), object_hook=_json_hook)
+        return list(data["k"]), ("prev" if data.get("d") == "prev" else "next")
+    except Exception:
+        return None
+
+
+def parse_page_size(raw: Optional[str]) -> int:
+    try:
+        size = int(raw) if raw else DEFAULT_PAGE_SIZE
+    except ValueError:
+        size = DEFAULT_PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+class _EstimatePlan(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) <statement>, compiled and bound like any statement (so for any driver)."""
+    inherit_cache = False
+
+    def __init__(self, stmt):
+        self.statement = stmt
+
+
+@compiles(_EstimatePlan)
+def _compile_estimate_plan(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def approximate_count(query: Query) -> int:
+    """Row count for a query. PostgreSQL uses the planner estimate (no scan); other DBs count."""
+    session = query.session
+    if session.get_bind().dialect.name == "postgresql":
+        plan = session.execute(_EstimatePlan(query.order_by(None).statement)).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    return query.order_by(None).count()
+
+
+def _key_exprs(query: Query, sort_cols: Sequence[Any]) -> list:
+    # SQLite keeps DateTime as text, and rows filled by server_default (CURRENT_TIMESTAMP) are
+    # formatted differently from SQLAlchemy-bound datetimes, so compare the stored text as-is there.
+    if query.session.get_bind().dialect.name != "sqlite":
+        return list(sort_cols)
+    return [type_coerce(c, String) if isinstance(c.type, DateTime) else c for c in sort_cols]
+
+
+def keyset_page(
+    query: Query,
+    sort_cols: Sequence[Any],
+    *,
+    cursor: Optional[str] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    descending: bool = False,
+    with_total: bool = False,
+) -> Page:
+    """
+    Cursor (keyset) pagination: WHERE (sort_cols) > (last key) ORDER BY sort_cols LIMIT n+1.
+    sort_cols must end in a unique column (e.g. id) so the order is total.
+    Items are the query's entity, or a tuple when the query selects several entities.
+    """
+    sort_cols = _key_exprs(query, sort_cols)
+    n = len(sort_cols)
+    single = len(query.column_descriptions) == 1
+    decoded = decode_cursor(cursor)
+    if decoded and len(decoded[0]) != n:
+        decoded = None
+    backwards = decoded is not None and decoded[1] == "prev"
+    total = approximate_count(query) if with_total else None
+
+    # fetch in the direction we are travelling; "prev" walks the display order in reverse
+    ascending = descending == backwards
+    q = query.add_columns(*sort_cols)
+    if decoded:
+        bound, key = tuple_(*sort_cols), tuple_(*decoded[0])
+        q = q.filter(bound > key if ascending else bound < key)
+    q = q.order_by(None).order_by(*[c.asc() if ascending else c.desc() for c in sort_cols])
+
+    rows = q.limit(page_size + 1).all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+
+    items = [row[0] if single else tuple(row[:-n]) for row in rows]
+    keys = [tuple(row[-n:]) for row in rows]
+
+    next_cursor = prev_cursor = None
+    if keys:
+        if backwards:
+            prev_cursor = encode_cursor(keys[0], "prev") if has_more else None
+            next_cursor = encode_cursor(keys[-1], "next")
+        else:
+            next_cursor = encode_cursor(keys[-1], "next") if has_more else None
+            prev_cursor = encode_cursor(keys[0], "prev") if decoded else None
+
+    return Page(items=items, next_cursor=next_cursor, prev_cursor=prev_cursor, page_size=page_size, total=total)
@@ -0,0 +1,362 @@
+# backend/app/services/pdf_engine.py
+"""
+PDF rendering engine.
+
+The renderer (WeasyPrint, else pdfkit) is imported once per process and warmed with a tiny document,
+so only the first render pays for imports and font loading. Jobs take the HTML as a string and hand
+the PDF back as bytes: nothing touches the disk, and the caller decides where (and whether) to keep it. By default renders run in a pool of
+worker processes: concurrent offers render in parallel, and a hung or crashing render is killed
+without taking a web worker with it.
+
+  PDF_ENGINE       process (default) | inline  (render in the calling thread)
+  PDF_WORKERS      pool size (default min(4, cpu count))
+  PDF_QUEUE_MAX    jobs queued or running at once; submit() waits PDF_QUEUE_WAIT s for a slot
+  PDF_JOB_TIMEOUT  seconds a render may run (counted from when a worker starts it, not while queued)
+                   before it is abandoned and the pool recycled; the other jobs on it are resubmitted
+  PDF_RENDERER     auto (default) | weasyprint | pdfkit | stub (fixed-cost fake, for benchmarks)
+  PDF_BASE_URL     where relative URLs in the HTML (images, CSS) resolve (default templates/offers/)
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Optional
+
+ENGINE_MODE = os.getenv("PDF_ENGINE", "process")
+WORKERS = int(os.getenv("PDF_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+QUEUE_MAX = int(os.getenv("PDF_QUEUE_MAX", "32"))
+QUEUE_WAIT = float(os.getenv("PDF_QUEUE_WAIT", "5"))
+JOB_TIMEOUT = float(os.getenv("PDF_JOB_TIMEOUT", "60"))
+RENDERER = os.getenv("PDF_RENDERER", "auto")
+STUB_MS = float(os.getenv("PDF_STUB_MS", "200"))
+MP_START = os.getenv("PDF_MP_START", "spawn")  # don't fork a threaded web server
+BASE_URL = os.getenv("PDF_BASE_URL") or str(Path(__file__).resolve().parents[2] / "templates" / "offers") + os.sep
+
+
+class PdfQueueFull(RuntimeError):
+    pass
+
+
+# =========================
+# Renderer (one per process)
+# =========================
+_renderer: Optional[Callable[[str], bytes]] = None
+_renderer_name: Optional[str] = None
+_renderer_loaded = False
+
+
+def minimal_pdf(text: str = "") -> bytes:
+    """A valid one-page PDF showing `text`; what the stub renderer writes."""
+    safe = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")[:200]
+    stream = f"BT /F1 12 Tf 72 720 Td ({safe}) Tj ET".encode("latin-1", "replace")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def _stub_render(html: str) -> bytes:
+    # burn CPU like a real layout pass would, then return a tiny real PDF
+    deadline = time.perf_counter() + STUB_MS / 1000
+    while time.perf_counter() < deadline:
+        pass
+    return minimal_pdf(f"{len(html)} characters of HTML")
+
+
+def load_renderer() -> Optional[Callable[[str], bytes]]:
+    """Import the PDF backend once for this process; None if nothing is installed."""
+    global _renderer, _renderer_name, _renderer_loaded
+    if _renderer_loaded:
+        return _renderer
+    _renderer_loaded = True
+
+    if RENDERER == "stub":
+        _renderer, _renderer_name = _stub_render, "stub"
+        return _renderer
+    if RENDERER in ("auto", "weasyprint"):
+        try:
+            from weasyprint import HTML  # type: ignore
+
+            _renderer = lambda html: HTML(string=html, base_url=BASE_URL).write_pdf()
+            _renderer_name = "weasyprint"
+            return _renderer
+        except Exception:
+            pass
+    if RENDERER in ("auto", "pdfkit"):
+        try:
+            import pdfkit  # type: ignore
+
+            _renderer = lambda html: pdfkit.from_string(html, False)
+            _renderer_name = "pdfkit"
+            return _renderer
+        except Exception:
+            pass
+    print(f"[pdf] no PDF renderer available (PDF_RENDERER={RENDERER}); offers will have no PDF")
+    return None
+
+
+def render_html(html: str) -> Optional[bytes]:
+    """Render an HTML string to PDF bytes in this process, or None if it failed."""
+    renderer = load_renderer()
+    if renderer is None:
+        return None
+    try:
+        return renderer(html)
+    except Exception as exc:
+        print(f"[pdf] {_renderer_name} failed: {exc}")
+        return None
+
+
+_started = None  # pool processes: queue of (job id, start time) back to the engine
+
+
+def _warm_worker(started=None) -> None:
+    # runs once in every pool process: import + first layout (fonts, CSS) happen here, not on a job
+    global _started
+    _started = started
+    if load_renderer() is None or _renderer_name == "stub":
+        return
+    render_html("<html><body><p>warm-up</p></body></html>")
+
+
+def _render_job(job_id: int, html: str) -> Optional[bytes]:
+    # report the start, so the job's timeout doesn't count the time it spent queued
+    if _started is not None:
+        _started.put((job_id, time.time()))
+    return render_html(html)
+
+
+def _noop() -> None:
+    return None
+
+
+# =========================
+# Engine
+# =========================
+POLL = 0.2  # how often a waiter checks whether its queued job has started
+
+
+class RenderJob:
+    """
+    Handle to a submitted render. result() returns the PDF bytes, or None on failure/timeout.
+
+    The timeout runs from when a worker starts the job, not from submit(). A job whose pool was
+    recycled under it (another job hung or crashed a worker) is submitted again once instead of
+    failing with the culprit.
+    """
+
+    def __init__(self, engine: "PdfEngine", html: str, future: Future, generation: int, job_id: int, timeout: float):
+        self._engine = engine
+        self._html = html
+        self._future = future
+        self._generation = generation
+        self._job_id = job_id
+        self._retried = False
+        self._awaitable: Optional[tuple[Future, asyncio.Future]] = None
+        self.timeout = timeout
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def _deadline(self, timeout: float) -> Optional[float]:
+        started = self._engine._started_at(self._job_id)
+        return None if started is None else started + timeout
+
+    def _wait_slice(self, timeout: float) -> float:
+        deadline = self._deadline(timeout)
+        return POLL if deadline is None else max(0.0, deadline - time.time())
+
+    def _settle(self, timeout: float) -> tuple[bool, Optional[bytes]]:
+        """(True, pdf or None) once the job has an outcome; (False, None) while it is still running."""
+        if not self._future.done():
+            deadline = self._deadline(timeout)
+            if deadline is None or time.time() < deadline:
+                return False, None
+            print(f"[pdf] render timed out after {timeout}s; recycling worker pool")
+            self._engine._recycle(self._generation)
+            return True, None
+        try:
+            return True, self._future.result()
+        except (BrokenProcessPool, CancelledError):
+            if self._engine._recycle(self._generation):
+                print("[pdf] render worker crashed; recycling worker pool")
+            if self._retried:
+                return True, None
+            self._retried = True
+            try:
+                self._future, self._generation, self._job_id = self._engine._enqueue(self._html)
+            except PdfQueueFull:
+                return True, None
+            return False, None
+        except Exception as exc:
+            print(f"[pdf] render failed: {exc}")
+            return True, None
+
+    def result(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        timeout = timeout if timeout is not None else self.timeout
+        while True:
+            settled, pdf = self._settle(timeout)
+            if settled:
+                return pdf
+            try:
+                self._future.result(timeout=self._wait_slice(timeout))
+            except Exception:
+                pass  # timeout / crash / render error: _settle() sorts it out
+
+    async def wait(self) -> Optional[bytes]:
+        """Await the result from async code without blocking the event loop."""
+        while True:
+            settled, pdf = self._settle(self.timeout)
+            if settled:
+                return pdf
+            if self._awaitable is None or self._awaitable[0] is not self._future:
+                self._awaitable = (self._future, asyncio.wrap_future(self._future))
+            await asyncio.wait({self._awaitable[1]}, timeout=self._wait_slice(self.timeout))
+
+
+class PdfEngine:
+    def __init__(
+        self,
+        *,
+        mode: str = ENGINE_MODE,
+        workers: int = WORKERS,
+        queue_max: int = QUEUE_MAX,
+        queue_wait: float = QUEUE_WAIT,
+        job_timeout: float = JOB_TIMEOUT,
+    ):
+        self.mode = mode
+        self.workers = workers
+        self.queue_max = max(queue_max, 1)
+        self.queue_wait = queue_wait
+        self.job_timeout = job_timeout
+        self._slots = threading.BoundedSemaphore(self.queue_max)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._generation = 0
+        self._job_ids = itertools.count(1)
+        self._started_queue = None
+        self._pending: set[int] = set()
+        self._started: dict[int, float] = {}
+
+    def _pool(self) -> tuple[ProcessPoolExecutor, int]:
+        with self._lock:
+            if self._executor is None:
+                context = multiprocessing.get_context(MP_START)
+                # a fresh queue per pool: a worker killed mid-put can leave the old one unusable
+                self._started_queue = context.SimpleQueue()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=context,
+                    initializer=_warm_worker,
+                    initargs=(self._started_queue,),
+                )
+                self._generation += 1
+            return self._executor, self._generation
+
+    def _started_at(self, job_id: int) -> Optional[float]:
+        """When a worker picked job `job_id` up, or None if it is still queued."""
+        with self._lock:
+            queue = self._started_queue
+            while queue is not None and not queue.empty():
+                started_id, at = queue.get()
+                if started_id in self._pending:
+                    self._started[started_id] = at
+            return self._started.get(job_id)
+
+    def _job_done(self, job_id: int) -> None:
+        self._slots.release()
+        with self._lock:
+            self._pending.discard(job_id)
+            self._started.pop(job_id, None)
+
+    def _recycle(self, generation: int) -> bool:
+        # kill the pool a bad job ran on (a hung WeasyPrint can't be cancelled any other way); the
+        # other jobs on it fail with BrokenProcessPool / CancelledError and their RenderJobs resubmit
+        with self._lock:
+            if self._executor is None or generation != self._generation:
+                return False
+            executor, self._executor = self._executor, None
+        for proc in list((getattr(executor, "_processes", None) or {}).values()):
+            proc.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+        return True
+
+    def warm(self) -> None:
+        """Start every worker now (imports + warm-up render) instead of on the first offer."""
+        if self.mode != "process":
+            load_renderer()
+            return
+        executor, _ = self._pool()
+        for f in [executor.submit(_noop) for _ in range(self.workers)]:
+            f.result(timeout=self.job_timeout)
+
+    def _enqueue(self, html: str) -> tuple[Future, int, int]:
+        """Take a queue slot and hand the render to the pool: (future, pool generation, job id)."""
+        if not self._slots.acquire(timeout=self.queue_wait):
+            raise PdfQueueFull(f"PDF render queue is full ({self.queue_max} jobs)")
+        job_id = next(self._job_ids)
+        try:
+            with self._lock:
+                self._pending.add(job_id)
+            try:
+                executor, generation = self._pool()
+                future = executor.submit(_render_job, job_id, html)
+            except BrokenProcessPool:
+                self._recycle(self._generation)
+                executor, generation = self._pool()
+                future = executor.submit(_render_job, job_id, html)
+        except BaseException:
+            self._job_done(job_id)
+            raise
+        future.add_done_callback(lambda _f: self._job_done(job_id))
+        return future, generation, job_id
+
+    def submit(self, html: str) -> RenderJob:
+        if self.mode != "process":
+            future: Future = Future()
+            future.set_result(render_html(html))
+            return RenderJob(self, html, future, self._generation, 0, self.job_timeout)
+        future, generation, job_id = self._enqueue(html)
+        return RenderJob(self, html, future, generation, job_id, self.job_timeout)
+
+    def render(self, html: str) -> Optional[bytes]:
+        return self.submit(html).result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+_engine: Optional[PdfEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> PdfEngine:
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = PdfEngine()
+        return _engine
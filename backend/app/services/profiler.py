@@ -0,0 +1,212 @@
+# backend/app/services/profiler.py
+"""
+On-demand sampling profiler for live requests, toggled from /admin/profiles.
+
+While profiling is on, a fraction of requests (per route template, or all routes) is profiled:
+a sampler thread snapshots the Python stacks every PROFILE_INTERVAL_MS until the response is
+sent, and the folded stacks are written as one collapsed-stack file per request
+("frame;frame;frame count" lines), which speedscope, flamegraph.pl and inferno open directly.
+
+There is no tracing hook, so unprofiled requests pay nothing and profiled ones pay roughly one
+sys._current_frames() walk per interval. The sampler reads every busy thread in the process: a
+sync route runs in the threadpool and an async one on the event loop, and neither can be told
+apart from concurrent requests on the same threads. Each stack is rooted at its thread name,
+so with concurrent traffic, read the profile per thread.
+
+  PROFILING             1 = on at startup (default 0; the admin page toggles it at runtime)
+  PROFILE_SAMPLE_RATE   fraction of matching requests to profile (default 0.05)
+  PROFILE_INTERVAL_MS   sampling interval (default 5)
+  PROFILE_DIR           where profiles go (default backend/profiles)
+  PROFILE_MAX_FILES     newest N profiles kept, older ones deleted (default 50)
+  PROFILE_MAX_ACTIVE    profiled requests running at once (default 2)
+
+State changed from the admin page is per process.
+"""
+from __future__ import annotations
+
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from starlette.routing import Match
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", str(BASE_DIR / "profiles")))
+INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+MAX_ACTIVE = int(os.getenv("PROFILE_MAX_ACTIVE", "2"))
+MAX_DEPTH = 128
+
+# leaf frames of threads that are just waiting (idle pool workers, the event loop's select)
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+}
+
+
+@dataclass
+class Settings:
+    enabled: bool = os.getenv("PROFILING", "0") == "1"
+    sample_rate: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0.05"))
+    routes: set[str] = field(default_factory=set)  # route templates; empty = every route
+
+
+settings = Settings()
+_active = threading.BoundedSemaphore(MAX_ACTIVE)
+
+
+def configure(enabled: bool, sample_rate: float, routes: set[str]) -> None:
+    settings.enabled = enabled
+    settings.sample_rate = min(max(sample_rate, 0.0), 1.0)
+    settings.routes = routes
+
+
+def should_profile(route: Optional[str]) -> bool:
+    if not settings.enabled or route is None:
+        return False
+    if settings.routes and route not in settings.routes:
+        return False
+    return random.random() < settings.sample_rate
+
+
+# =========================
+# Sampler
+# =========================
+class Sampler:
+    """Folds every busy thread's stack into Counter[collapsed stack] until stop()."""
+
+    def __init__(self, interval: float = INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> "Sampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_LEAVES:
+                    continue
+                self.stacks[_fold(names.get(ident, f"thread-{ident}"), frame)] += 1
+            self.samples += 1
+
+
+def _fold(thread_name: str, frame) -> str:
+    parts = []
+    while frame is not None and len(parts) < MAX_DEPTH:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    parts.append(thread_name)
+    return ";".join(reversed(parts))
+
+
+# =========================
+# Storage
+# =========================
+@dataclass
+class ProfileFile:
+    name: str
+    size: int
+    modified: datetime
+
+
+def _slug(route: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+
+
+def save(method: str, route: str, elapsed_ms: float, sampler: Sampler) -> Optional[Path]:
+    if not sampler.stacks:
+        return None
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    path = PROFILE_DIR / f"{stamp}_{method}_{_slug(route)}_{elapsed_ms:.0f}ms.collapsed"
+    lines = [f"{stack} {n}" for stack, n in sampler.stacks.most_common()]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    _prune()
+    return path
+
+
+def _prune() -> None:
+    files = sorted(PROFILE_DIR.glob("*.collapsed"), key=lambda p: p.name, reverse=True)
+    for old in files[MAX_FILES:]:
+        old.unlink(missing_ok=True)
+
+
+def recent() -> list[ProfileFile]:
+    if not PROFILE_DIR.exists():
+        return []
+    files = sorted(PROFILE_DIR.glob("*.collapsed"), key=lambda p: p.name, reverse=True)
+    out = []
+    for p in files:
+        st = p.stat()
+        out.append(ProfileFile(p.name, st.st_size, datetime.utcfromtimestamp(st.st_mtime)))
+    return out
+
+
+def path_for(name: str) -> Optional[Path]:
+    """Resolve a listed profile name, refusing anything outside PROFILE_DIR."""
+    if "/" in name or "\\" in name or not name.endswith(".collapsed"):
+        return None
+    path = PROFILE_DIR / name
+    return path if path.is_file() else None
+
+
+# =========================
+# Middleware
+# =========================
+class ProfilerMiddleware:
+    """ASGI middleware: profiles a sample of requests while profiling is switched on."""
+
+    def __init__(self, app, router=None):
+        self.app = app
+        self.router = router  # the FastAPI app's router, to resolve the route template up front
+
+    def _route(self, scope) -> Optional[str]:
+        if self.router is None:
+            return None
+        for route in self.router.routes:
+            match, _child = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", None)
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.enabled:
+            await self.app(scope, receive, send)
+            return
+        route = self._route(scope)
+        if not should_profile(route) or not _active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        sampler = Sampler().start()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            sampler.stop()
+            _active.release()
+            save(scope["method"], route, (time.perf_counter() - started) * 1000, sampler)
@@ -0,0 +1,232 @@
+# backend/app/services/search.py
+"""
+Keyword index behind the /admin/users `q` filter.
+
+One document per candidate (candidate name/email/mobile + the linked user's username/email),
+kept in a side table that the database can index for substring search:
+
+  * SQLite      -> FTS5 virtual table with the trigram tokenizer
+  * PostgreSQL  -> plain table + pg_trgm GIN index (serves LIKE '%q%')
+  * anything else (or SQLite without trigram) -> the old ILIKE scan
+
+The backend is picked from DATABASE_URL. Documents are rewritten from a session after_flush hook,
+so every create/update through crud or the routers (sync or async sessions) lands in the same
+transaction. Core bulk statements (candidate import) call reindex_candidates() themselves.
+Rebuild with:  python -m app.cli search-rebuild
+"""
+from __future__ import annotations
+
+from functools import reduce
+from typing import Iterable
+
+from sqlalchemy import Column, Integer, MetaData, Table, Text, delete, event, func, insert, or_, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+
+from app import models
+from app.database import DATABASE_URL, AsyncSyncSession, SessionLocal, engine
+
+TABLE_NAME = "candidate_search"
+MIN_INDEXED_LEN = 3  # trigram indexes can't serve shorter needles
+
+
+def _document(lower: bool):
+    fields = (
+        models.Candidate.first_name,
+        models.Candidate.last_name,
+        models.Candidate.email,
+        models.Candidate.mobile,
+        models.User.username,
+        models.User.email,
+    )
+    doc = reduce(lambda a, b: a + " " + b, [func.coalesce(f, "") for f in fields])
+    return func.lower(doc) if lower else doc
+
+
+def _like_pattern(q: str) -> str:
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class _LikeBackend:
+    """No index: the original six ILIKE predicates (needs the User join already in the query)."""
+
+    name = "like"
+
+    def create(self, conn: Connection) -> None:
+        pass
+
+    def reindex(self, conn: Connection, candidate_ids: Iterable[int] = (), user_ids: Iterable[int] = ()) -> None:
+        pass
+
+    def remove(self, conn: Connection, candidate_ids: Iterable[int]) -> None:
+        pass
+
+    def rebuild(self, conn: Connection) -> int:
+        return 0
+
+    def match(self, q: str):
+        like = f"%{q}%"
+        return or_(
+            models.Candidate.first_name.ilike(like),
+            models.Candidate.last_name.ilike(like),
+            models.Candidate.email.ilike(like),
+            models.Candidate.mobile.ilike(like),
+            models.User.username.ilike(like),
+            models.User.email.ilike(like),
+        )
+
+
+class _TableBackend(_LikeBackend):
+    """Shared delete+insert maintenance for the side-table backends."""
+
+    table: Table
+    key: Column
+    lower_document = False
+
+    def _source(self):
+        return (
+            select(models.Candidate.id, _document(self.lower_document))
+            .select_from(models.Candidate)
+            .outerjoin(models.User, models.User.id == models.Candidate.user_id)
+        )
+
+    def reindex(self, conn: Connection, candidate_ids: Iterable[int] = (), user_ids: Iterable[int] = ()) -> None:
+        candidate_ids, user_ids = set(candidate_ids), set(user_ids)
+        if user_ids:
+            candidate_ids |= set(
+                conn.execute(
+                    select(models.Candidate.id).where(models.Candidate.user_id.in_(user_ids))
+                ).scalars()
+            )
+        if not candidate_ids:
+            return
+        self.remove(conn, candidate_ids)
+        conn.execute(
+            insert(self.table).from_select(
+                [self.key.name, "document"], self._source().where(models.Candidate.id.in_(candidate_ids))
+            )
+        )
+
+    def remove(self, conn: Connection, candidate_ids: Iterable[int]) -> None:
+        candidate_ids = set(candidate_ids)
+        if candidate_ids:
+            conn.execute(delete(self.table).where(self.key.in_(candidate_ids)))
+
+    def rebuild(self, conn: Connection) -> int:
+        conn.execute(delete(self.table))
+        conn.execute(insert(self.table).from_select([self.key.name, "document"], self._source()))
+        return conn.execute(select(func.count()).select_from(self.table)).scalar_one()
+
+
+class _SqliteFts5Backend(_TableBackend):
+    name = "sqlite-fts5"
+    table = Table(TABLE_NAME, MetaData(), Column("rowid", Integer), Column("document", Text))
+    key = table.c.rowid
+
+    def create(self, conn: Connection) -> None:
+        conn.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE_NAME} USING fts5(document, tokenize='trigram')"
+        )
+
+    def match(self, q: str):
+        if len(q) >= MIN_INDEXED_LEN:
+            # a quoted phrase of trigrams == case-insensitive substring match
+            cond = self.table.c.document.op("MATCH")('"' + q.replace('"', '""') + '"')
+        else:
+            cond = self.table.c.document.like(_like_pattern(q), escape="\\")
+        return models.Candidate.id.in_(select(self.key).where(cond))
+
+
+class _PgTrigramBackend(_TableBackend):
+    name = "postgresql-trgm"
+    table = Table(
+        TABLE_NAME,
+        MetaData(),
+        Column("candidate_id", Integer, primary_key=True),
+        Column("document", Text, nullable=False),
+    )
+    key = table.c.candidate_id
+    lower_document = True
+
+    def create(self, conn: Connection) -> None:
+        conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        self.table.create(conn, checkfirst=True)
+        conn.exec_driver_sql(
+            f"CREATE INDEX IF NOT EXISTS ix_{TABLE_NAME}_document_trgm "
+            f"ON {TABLE_NAME} USING gin (document gin_trgm_ops)"
+        )
+
+    def match(self, q: str):
+        cond = self.table.c.document.like(_like_pattern(q.lower()), escape="\\")
+        return models.Candidate.id.in_(select(self.key).where(cond))
+
+
+def _pick_backend() -> _LikeBackend:
+    if DATABASE_URL.startswith("sqlite"):
+        with engine.connect() as conn:
+            try:
+                conn.exec_driver_sql("CREATE VIRTUAL TABLE temp._trigram_probe USING fts5(x, tokenize='trigram')")
+                conn.exec_driver_sql("DROP TABLE temp._trigram_probe")
+            except DBAPIError:
+                print("[search] SQLite build has no FTS5 trigram tokenizer; falling back to ILIKE scans")
+                return _LikeBackend()
+        return _SqliteFts5Backend()
+    if DATABASE_URL.startswith("postgresql"):
+        return _PgTrigramBackend()
+    return _LikeBackend()
+
+
+backend = _pick_backend()
+
+
+def candidate_filter(q: str):
+    """WHERE clause on Candidate for keyword `q` (matches candidate or linked user fields)."""
+    return backend.match(q.strip())
+
+
+def ensure_index() -> None:
+    """Create the index if missing; an empty fresh index is filled from the current tables."""
+    global backend
+    try:
+        with engine.begin() as conn:
+            backend.create(conn)
+            if isinstance(backend, _TableBackend):
+                empty = conn.execute(select(backend.key).select_from(backend.table).limit(1)).first() is None
+                if empty:
+                    backend.rebuild(conn)
+    except DBAPIError as exc:
+        print(f"[search] could not create {backend.name} index ({exc.orig}); falling back to ILIKE scans")
+        backend = _LikeBackend()
+
+
+def reindex_candidates(conn: Connection, candidate_ids: Iterable[int]) -> None:
+    """For Core bulk writes, which the flush hook below doesn't see."""
+    backend.reindex(conn, candidate_ids)
+
+
+def rebuild_index() -> int:
+    with engine.begin() as conn:
+        backend.create(conn)
+        return backend.rebuild(conn)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+@event.listens_for(AsyncSyncSession, "after_flush")
+def _sync_search_index(session, flush_context) -> None:
+    if not isinstance(backend, _TableBackend):
+        return
+    cand_ids, user_ids, removed = set(), set(), set()
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, models.Candidate):
+            cand_ids.add(obj.id)
+        elif isinstance(obj, models.User):
+            user_ids.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, models.Candidate):
+            removed.add(obj.id)
+    if not (cand_ids or user_ids or removed):
+        return
+    conn = session.connection()
+    backend.remove(conn, removed)
+    backend.reindex(conn, cand_ids - removed, user_ids)
@@ -0,0 +1,404 @@
+# backend/app/services/signing.py
+"""
+Signing engine: stamps the signature onto the PDF rendered at issuance (Offer.pdf_path) instead of
+laying the whole offer out a second time.
+
+The signed PDF is the original, byte for byte, followed by one incremental update (ISO 32000 7.5.6):
+a signature page appended to the page tree, plus the signer in the document info. Nothing before
+the original's %%EOF is rewritten, so the SHA-256 taken at issuance (Offer.pdf_sha256, also printed
+on the signature page) still matches the signed file's leading bytes; verify() checks that.
+
+Standard library only: the handful of objects needed (trailer, catalog, page-tree root, info) are
+looked up through the xref table or xref stream, compressed object streams included. A PDF this
+can't follow raises SigningError and the caller re-renders instead (offer_pipeline.sign_offer).
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import zlib
+from datetime import datetime
+from typing import Optional
+
+A4 = (0.0, 0.0, 595.0, 842.0)
+
+_REF = re.compile(rb"(\d+)\s+(\d+)\s+R")
+_OBJ = re.compile(rb"(\d+)\s+(\d+)\s+obj\s*")
+_XREF_HEADER = re.compile(rb"\s*(\d+)\s+(\d+)[ \t]*\r?\n")
+_XREF_ENTRY = re.compile(rb"\s*(\d{10})\s+(\d{5})\s+([nf])")
+_EOF = re.compile(rb"%%EOF(\r\n|\r|\n)?")
+
+
+class SigningError(Exception):
+    """The original PDF can't be stamped (a structure or encoding this module doesn't read)."""
+
+
+class TamperError(SigningError):
+    """The stored original no longer matches the hash taken when it was issued."""
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+# =========================
+# Reading the original
+# =========================
+def _skip_string(buf: bytes, i: int) -> int:
+    # literal string at buf[i] == '(': balanced parentheses, backslash escapes
+    depth = 0
+    while i < len(buf):
+        ch = buf[i]
+        if ch == 0x5C:  # backslash
+            i += 2
+            continue
+        if ch == 0x28:
+            depth += 1
+        elif ch == 0x29:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    raise SigningError("unterminated string")
+
+
+def _dict_at(buf: bytes, pos: int) -> bytes:
+    """The dictionary starting at buf[pos] ('<<'), nested dictionaries and strings included."""
+    depth, i = 0, pos
+    while i < len(buf):
+        pair = buf[i:i + 2]
+        if pair == b"<<":
+            depth += 1
+            i += 2
+        elif pair == b">>":
+            depth -= 1
+            i += 2
+            if depth == 0:
+                return buf[pos:i]
+        elif buf[i] == 0x28:
+            i = _skip_string(buf, i)
+        elif buf[i] == 0x3C:  # hex string
+            i = buf.index(b">", i) + 1
+        else:
+            i += 1
+    raise SigningError("unterminated dictionary")
+
+
+def _ref(d: bytes, key: bytes) -> Optional[tuple[int, int]]:
+    m = re.search(rb"/" + key + rb"\s+(\d+)\s+(\d+)\s+R", d)
+    return (int(m.group(1)), int(m.group(2))) if m else None
+
+
+def _int(d: bytes, key: bytes) -> Optional[int]:
+    m = re.search(rb"/" + key + rb"\s+(\d+)(?!\d)(?!\s+\d+\s+R)", d)
+    return int(m.group(1)) if m else None
+
+
+def _array(d: bytes, key: bytes) -> Optional[bytes]:
+    m = re.search(rb"/" + key + rb"\s*\[([^\]]*)\]", d)
+    return m.group(1) if m else None
+
+
+def _unpredict(data: bytes, columns: int) -> bytes:
+    # PNG predictors (DecodeParms /Predictor >= 10): one filter-type byte per row
+    out, prev, row_len = bytearray(), bytearray(columns), columns + 1
+    for start in range(0, len(data), row_len):
+        kind, row = data[start], bytearray(data[start + 1:start + row_len])
+        for i in range(len(row)):
+            left = row[i - 1] if i else 0
+            up = prev[i]
+            if kind == 1:
+                row[i] = (row[i] + left) & 0xFF
+            elif kind == 2:
+                row[i] = (row[i] + up) & 0xFF
+            elif kind == 3:
+                row[i] = (row[i] + (left + up) // 2) & 0xFF
+            elif kind == 4:
+                up_left = prev[i - 1] if i else 0
+                p = left + up - up_left
+                pa, pb, pc = abs(p - left), abs(p - up), abs(p - up_left)
+                row[i] = (row[i] + (left if pa <= pb and pa <= pc else up if pb <= pc else up_left)) & 0xFF
+            elif kind != 0:
+                raise SigningError(f"unknown PNG predictor row type {kind}")
+        out += row
+        prev = row
+    return bytes(out)
+
+
+class _Reader:
+    """Just enough of a PDF reader to find the objects an appended page has to touch."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        at = data.rfind(b"startxref", max(0, len(data) - 2048))
+        m = re.compile(rb"startxref\s+(\d+)").match(data, at) if at != -1 else None
+        if not m:
+            raise SigningError("no startxref")
+        self.startxref = int(m.group(1))
+        self.entries: dict[int, Optional[tuple]] = {}  # num -> (1, offset, gen) | (2, objstm, index) | None
+        self._objstms: dict[int, tuple[bytes, list[int]]] = {}
+        self.trailer, self.xref_stream = self._read_section(self.startxref)
+        seen, prev = {self.startxref}, _int(self.trailer, b"Prev")
+        while prev is not None and prev not in seen:  # older sections only fill what newer ones didn't
+            seen.add(prev)
+            older, _ = self._read_section(prev)
+            prev = _int(older, b"Prev")
+
+    def _read_section(self, offset: int) -> tuple[bytes, bool]:
+        data = self.data
+        if data.startswith(b"xref", offset):
+            pos = offset + 4
+            while (m := _XREF_HEADER.match(data, pos)) is not None:
+                first, count = int(m.group(1)), int(m.group(2))
+                pos = m.end()
+                for num in range(first, first + count):
+                    e = _XREF_ENTRY.match(data, pos)
+                    if e is None:
+                        raise SigningError(f"bad xref entry for object {num}")
+                    pos = e.end()
+                    entry = (1, int(e.group(1)), int(e.group(2))) if e.group(3) == b"n" else None
+                    self.entries.setdefault(num, entry)
+            at = data.find(b"trailer", pos)
+            if at == -1:
+                raise SigningError("no trailer")
+            return _dict_at(data, data.index(b"<<", at)), False
+
+        m = _OBJ.match(data, offset)
+        if m is None or not data.startswith(b"<<", m.end()):
+            raise SigningError(f"no xref section at offset {offset}")
+        d = _dict_at(data, m.end())
+        if b"/XRef" not in d:
+            raise SigningError(f"object at offset {offset} is not an xref stream")
+        raw = self._stream(d, m.end() + len(d))
+        widths = [int(w) for w in (_array(d, b"W") or b"").split()]
+        if len(widths) != 3:
+            raise SigningError("xref stream without /W")
+        index = [int(x) for x in (_array(d, b"Index") or b"0 %d" % _int(d, b"Size")).split()]
+        row, pos = sum(widths), 0
+
+        def field(start: int, width: int, default: int) -> int:
+            return int.from_bytes(raw[start:start + width], "big") if width else default
+
+        for first, count in zip(index[::2], index[1::2]):
+            for num in range(first, first + count):
+                kind = field(pos, widths[0], 1)
+                a = field(pos + widths[0], widths[1], 0)
+                b = field(pos + widths[0] + widths[1], widths[2], 0)
+                pos += row
+                entry = (1, a, b) if kind == 1 else (2, a, b) if kind == 2 else None
+                self.entries.setdefault(num, entry)
+        return d, True
+
+    def _stream(self, d: bytes, end: int) -> bytes:
+        # stream data following the dictionary that ends at `end`, decoded
+        m = re.compile(rb"\s*stream\r?\n").match(self.data, end)
+        if m is None:
+            raise SigningError("expected a stream")
+        length = _int(d, b"Length")
+        if length is None:
+            length_ref = _ref(d, b"Length")
+            if length_ref is None:
+                raise SigningError("stream without /Length")
+            length = int(self.get(*length_ref))
+        raw = self.data[m.end():m.end() + length]
+        filters = re.findall(rb"/(\w+)", (re.search(rb"/Filter\s*(\[[^\]]*\]|/\w+)", d) or [b"", b""])[1])
+        for name in filters:
+            if name != b"FlateDecode":
+                raise SigningError(f"unsupported stream filter /{name.decode()}")
+            raw = zlib.decompress(raw)
+        predictor = _int(d, b"Predictor") or 1
+        if predictor >= 10:
+            raw = _unpredict(raw, _int(d, b"Columns") or 1)
+        elif predictor != 1:
+            raise SigningError(f"unsupported predictor {predictor}")
+        return raw
+
+    def _from_objstm(self, stm_num: int, index: int) -> bytes:
+        if stm_num not in self._objstms:
+            entry = self.entries.get(stm_num)
+            if not entry or entry[0] != 1:
+                raise SigningError(f"object stream {stm_num} not found")
+            m = _OBJ.match(self.data, entry[1])
+            if m is None:
+                raise SigningError(f"object stream {stm_num} not at its xref offset")
+            d = _dict_at(self.data, m.end())
+            body = self._stream(d, m.end() + len(d))
+            first, n = _int(d, b"First"), _int(d, b"N")
+            header = [int(x) for x in body[:first].split()[:2 * n]]
+            self._objstms[stm_num] = (body[first:], header[1::2])
+        body, offsets = self._objstms[stm_num]
+        if index >= len(offsets):
+            raise SigningError(f"object stream {stm_num} has no object {index}")
+        end = offsets[index + 1] if index + 1 < len(offsets) else len(body)
+        return body[offsets[index]:end].strip()
+
+    def get(self, num: int, gen: int = 0) -> bytes:
+        """Object `num`: its dictionary if it is one (streams: just the dictionary), else its token."""
+        entry = self.entries.get(num)
+        if entry is None:
+            raise SigningError(f"object {num} {gen} R not in the xref")
+        if entry[0] == 2:
+            value, start = self._from_objstm(entry[1], entry[2]), 0
+        else:
+            m = _OBJ.match(self.data, entry[1])
+            if m is None or int(m.group(1)) != num:
+                raise SigningError(f"object {num} not at its xref offset")
+            value, start = self.data, m.end()
+        if value.startswith(b"<<", start):
+            return _dict_at(value, start)
+        token = re.compile(rb"[^\s%/<>\[\]()]+").match(value, start)
+        if token is None:
+            raise SigningError(f"object {num} is neither a dictionary nor a simple value")
+        return token.group(0)
+
+
+# =========================
+# The incremental update
+# =========================
+def _text(value: str) -> bytes:
+    # PDF text string (document info): UTF-16BE with BOM, so any signer name survives
+    return b"<FEFF" + value.encode("utf-16-be").hex().upper().encode("ascii") + b">"
+
+
+def _shown(value: str) -> bytes:
+    # string operand of Tj in a WinAnsiEncoding Helvetica; characters outside it print as '?'
+    raw = value.encode("cp1252", "replace")
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _pdf_date(dt: datetime) -> bytes:
+    return dt.strftime("(D:%Y%m%d%H%M%SZ)").encode("ascii")
+
+
+def _media_box(reader: _Reader, pages: bytes) -> tuple[float, ...]:
+    # the first page's box (inherited from the page tree if need be), else A4
+    node, inherited = pages, _array(pages, b"MediaBox")
+    for _ in range(32):
+        box = _array(node, b"MediaBox") or inherited
+        kids = _array(node, b"Kids")
+        if b"/Pages" not in node or not kids or not _REF.search(kids):
+            break
+        inherited = box
+        node = reader.get(*map(int, _REF.search(kids).groups()))
+    else:
+        box = None
+    try:
+        values = tuple(float(v) for v in (box or b"").split())
+    except ValueError:
+        values = ()
+    return values if len(values) == 4 else A4
+
+
+def _signature_page(box: tuple[float, ...], lines: list[tuple[int, str]]) -> bytes:
+    x, y = box[0] + 72, box[3] - 96
+    ops = [b"BT", b"%.2f %.2f Td" % (x, y)]
+    for size, line in lines:
+        ops += [b"/F1 %d Tf" % size, _shown(line) + b" Tj", b"0 %d Td" % -(size + 8)]
+    ops.append(b"ET")
+    return b"\n".join(ops)
+
+
+def stamp(
+    original: bytes,
+    *,
+    signer_name: str,
+    signed_at: datetime,
+    ip: Optional[str] = None,
+    expected_sha256: Optional[str] = None,
+) -> tuple[bytes, str]:
+    """
+    (signed PDF, SHA-256 of `original`). Appends a signature page to `original` as an incremental
+    update. With `expected_sha256` (the hash kept at issuance) a changed original raises TamperError.
+    """
+    digest = sha256(original)
+    if expected_sha256 and digest != expected_sha256:
+        raise TamperError(f"original PDF hashes to {digest}, issued as {expected_sha256}")
+
+    reader = _Reader(original)
+    trailer = reader.trailer
+    size, root = _int(trailer, b"Size"), _ref(trailer, b"Root")
+    if size is None or root is None:
+        raise SigningError("trailer without /Size or /Root")
+    pages_ref = _ref(reader.get(*root), b"Pages")
+    if pages_ref is None:
+        raise SigningError("catalog without /Pages")
+    pages = reader.get(*pages_ref)
+    kids, count = _array(pages, b"Kids"), _int(pages, b"Count")
+    if kids is None or count is None:
+        raise SigningError("page tree root without /Kids or /Count")
+
+    font, content, page = size, size + 1, size + 2
+    info_ref = _ref(trailer, b"Info")
+    info_num, info_gen = info_ref or (size + 3, 0)
+    next_num = size + 3 if info_ref else size + 4
+
+    box = _media_box(reader, pages)
+    stamped = signed_at.strftime("%Y-%m-%d %H:%M:%S")
+    stream = _signature_page(box, [
+        (16, "Electronic signature"),
+        (11, f"Signed by: {signer_name}"),
+        (11, f"Date (UTC): {stamped}"),
+        (11, f"IP: {ip or '-'}"),
+        (9, f"Pages 1-{count} are the document as issued, unchanged. Its SHA-256:"),
+        (9, digest),
+    ])
+    info = reader.get(*info_ref) if info_ref else b"<< >>"
+    info = re.sub(rb"/(ModDate|SignedBy|SignedAt|SignerIP|OriginalSHA256)\s*(\([^)]*\)|<[^>]*>)", b"", info)
+    info = info[:-2].rstrip() + b" /ModDate %s /SignedBy %s /SignedAt %s /SignerIP %s /OriginalSHA256 (%s) >>" % (
+        _pdf_date(signed_at), _text(signer_name), _pdf_date(signed_at), _text(ip or "-"), digest.encode("ascii"),
+    )
+    new_pages = re.sub(rb"/Kids\s*\[[^\]]*\]", lambda _m: b"/Kids [" + kids.strip() + b" %d 0 R]" % page, pages, count=1)
+    new_pages = re.sub(rb"/Count\s+\d+", b"/Count %d" % (count + 1), new_pages, count=1)
+
+    objects = {
+        pages_ref[0]: (pages_ref[1], new_pages),
+        font: (0, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"),
+        content: (0, b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"),
+        page: (0, b"<< /Type /Page /Parent %d %d R /Contents %d 0 R /Resources << /Font << /F1 %d 0 R >> >> "
+                  b"/MediaBox [%s] >>" % (pages_ref[0], pages_ref[1], content, font,
+                                          b" ".join(b"%g" % v for v in box))),
+        info_num: (info_gen, info),
+    }
+
+    out = bytearray(original)
+    if not out.endswith(b"\n"):
+        out += b"\n"
+    offsets = {}
+    for num in sorted(objects):
+        gen, body = objects[num]
+        offsets[num] = (len(out), gen)
+        out += b"%d %d obj\n" % (num, gen) + body + b"\nendobj\n"
+
+    ids = re.search(rb"/ID\s*\[[^\]]*\]", trailer)
+    tail = b"/Root %d %d R /Info %d %d R %s/Prev %d" % (
+        root[0], root[1], info_num, info_gen, ids.group(0) + b" " if ids else b"", reader.startxref,
+    )
+    if reader.xref_stream:
+        # the original uses an xref stream, so the update does too
+        xref_num = next_num
+        offsets[xref_num] = (len(out), 0)
+        nums = sorted(offsets)
+        rows = b"".join(b"\x01" + offsets[n][0].to_bytes(4, "big") + offsets[n][1].to_bytes(2, "big") for n in nums)
+        data = zlib.compress(rows)
+        xref_at = len(out)
+        out += b"%d 0 obj\n<< /Type /XRef /Size %d /Index [%s] /W [1 4 2] /Filter /FlateDecode /Length %d %s >>\nstream\n" % (
+            xref_num, xref_num + 1, b" ".join(b"%d 1" % n for n in nums), len(data), tail,
+        ) + data + b"\nendstream\nendobj\n"
+    else:
+        xref_at = len(out)
+        out += b"xref\n0 1\n0000000000 65535 f \n"  # head of the free list, as full writers emit it
+        for n in sorted(offsets):
+            off, gen = offsets[n]
+            out += b"%d 1\n%010d %05d n \n" % (n, off, gen)
+        out += b"trailer\n<< /Size %d %s >>\n" % (next_num, tail)
+    out += b"startxref\n%d\n%%%%EOF\n" % xref_at
+    return bytes(out), digest
+
+
+def verify(signed: bytes, original_sha256: str) -> bool:
+    """True if `signed` starts with the document that hashed to `original_sha256` (any revision)."""
+    for m in _EOF.finditer(signed):
+        for end in {m.start() + 5, m.end()}:
+            if sha256(signed[:end]) == original_sha256:
+                return True
+    return False
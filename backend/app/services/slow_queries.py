@@ -0,0 +1,214 @@
+# backend/app/services/slow_queries.py
+"""
+Opt-in slow-query log with EXPLAIN capture, shown at /admin/slow-queries.
+
+  SLOW_QUERY_MS      record statements slower than this many ms (default 0 = off)
+  SLOW_QUERY_BUFFER  how many recent slow statements to keep (default 200, oldest dropped)
+
+Each entry keeps the statement text, the *shape* of its parameters (types and counts, never the
+values: token hashes and emails must not end up on an admin page), the duration and the route
+that ran it. The first time a statement text turns up slow, a background thread runs
+EXPLAIN QUERY PLAN (SQLite) / EXPLAIN (PostgreSQL) for it on a separate connection, with the
+parameters of that execution; later occurrences reuse the stored plan.
+
+Plans are taken through the sync engine, so statements from the async engine are explained by
+re-compiling their SQLAlchemy construct there (raw driver SQL from the async side is logged
+without a plan).
+"""
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.database import engine as sync_engine
+from app.services import metrics
+
+THRESHOLD_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+BUFFER_SIZE = int(os.getenv("SLOW_QUERY_BUFFER", "200"))
+MAX_PLANS = 500
+EXPLAINABLE = ("select", "with", "update", "delete")
+
+
+@dataclass
+class SlowQuery:
+    at: datetime
+    duration_ms: float
+    statement: str
+    params: str
+    route: Optional[str]
+    engine: str
+
+
+_entries: deque[SlowQuery] = deque(maxlen=BUFFER_SIZE)
+_plans: OrderedDict[str, str] = OrderedDict()  # statement -> plan text (or why there is none)
+_lock = threading.Lock()
+_explain_queue: queue.Queue = queue.Queue(maxsize=100)
+_worker: Optional[threading.Thread] = None
+_installed: set[str] = set()
+
+
+def enabled() -> bool:
+    return THRESHOLD_MS > 0
+
+
+# =========================
+# EXPLAIN construct
+# =========================
+class _Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, stmt):
+        self.statement = stmt
+
+
+@compiles(_Explain)
+def _compile_explain(element, compiler, **kw):
+    prefix = "EXPLAIN QUERY PLAN " if compiler.dialect.name == "sqlite" else "EXPLAIN "
+    return prefix + compiler.process(element.statement, **kw)
+
+
+def explain(conn, stmt, params: dict | None = None) -> str:
+    """The database's plan for a Core/ORM statement, one line per plan row."""
+    return "\n".join(" | ".join(str(col) for col in row) for row in conn.execute(_Explain(stmt), params or {}))
+
+
+def _run_explain(job: tuple) -> str:
+    construct, params, raw_sql, raw_params = job
+    with sync_engine.connect() as conn:
+        conn.info["slow_queries_skip"] = True
+        if construct is not None:
+            plan = explain(conn, construct, params)
+        else:
+            prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+            result = conn.exec_driver_sql(prefix + raw_sql, raw_params)
+            plan = "\n".join(" | ".join(str(col) for col in row) for row in result)
+        conn.rollback()
+    return plan
+
+
+def _explain_loop() -> None:
+    while True:
+        statement, job = _explain_queue.get()
+        try:
+            plan = _run_explain(job)
+        except Exception as exc:  # a plan is a diagnostic; never let it take anything down
+            plan = f"EXPLAIN failed: {exc}"
+        _store_plan(statement, plan)
+
+
+def _store_plan(statement: str, plan: str) -> None:
+    with _lock:
+        _plans[statement] = plan
+        while len(_plans) > MAX_PLANS:
+            _plans.popitem(last=False)
+
+
+def _ensure_worker() -> None:
+    global _worker
+    if _worker is None or not _worker.is_alive():
+        _worker = threading.Thread(target=_explain_loop, name="slow-query-explain", daemon=True)
+        _worker.start()
+
+
+# =========================
+# Recording
+# =========================
+def _shape(parameters, executemany: bool) -> str:
+    def _one(p) -> str:
+        if isinstance(p, dict):
+            return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in p.items()) + "}"
+        if isinstance(p, (list, tuple)):
+            return "(" + ", ".join(type(v).__name__ for v in p) + ")"
+        return type(p).__name__
+
+    if executemany and isinstance(parameters, (list, tuple)):
+        return f"{len(parameters)} x {_one(parameters[0])}" if parameters else "0 rows"
+    return _one(parameters) if parameters else "()"
+
+
+def _explain_job(statement: str, parameters, context, executemany: bool, engine_name: str):
+    if executemany or not statement.lstrip().lower().startswith(EXPLAINABLE):
+        return None
+    compiled = getattr(context, "compiled", None)
+    if compiled is not None and getattr(compiled, "statement", None) is not None:
+        params = context.compiled_parameters[0] if context.compiled_parameters else {}
+        return (compiled.statement, dict(params), None, None)
+    if engine_name == "sync":
+        return (None, None, statement, parameters)
+    return None
+
+
+def _before(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slow_queries_started", []).append(time.perf_counter())
+
+
+def _make_after(engine_name: str):
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("slow_queries_started")
+        if not started:
+            return
+        duration_ms = (time.perf_counter() - started.pop()) * 1000
+        if duration_ms < THRESHOLD_MS or conn.info.get("slow_queries_skip"):
+            return
+        entry = SlowQuery(
+            at=datetime.utcnow(),
+            duration_ms=duration_ms,
+            statement=statement,
+            params=_shape(parameters, executemany),
+            route=metrics.current_route(),
+            engine=engine_name,
+        )
+        with _lock:
+            _entries.append(entry)
+            first_time = statement not in _plans
+            if first_time:
+                _plans[statement] = ""  # claimed: one EXPLAIN per distinct statement
+        if not first_time:
+            return
+        job = _explain_job(statement, parameters, context, executemany, engine_name)
+        if job is None:
+            _store_plan(statement, "no plan (not an explainable statement)")
+            return
+        try:
+            _explain_queue.put_nowait((statement, job))
+            _ensure_worker()
+        except queue.Full:
+            with _lock:
+                _plans.pop(statement, None)  # try again next time it is slow
+
+    return _after
+
+
+def install(engine: Engine, name: str) -> None:
+    """Hook `engine` (sync Engine or AsyncEngine.sync_engine) if SLOW_QUERY_MS is set."""
+    if not enabled() or name in _installed:
+        return
+    _installed.add(name)
+    event.listen(engine, "before_cursor_execute", _before)
+    event.listen(engine, "after_cursor_execute", _make_after(name))
+
+
+# =========================
+# Reading
+# =========================
+def recent() -> list[tuple[SlowQuery, str]]:
+    """Newest first, each with its plan ("" while the EXPLAIN is still pending)."""
+    with _lock:
+        return [(e, _plans.get(e.statement, "")) for e in reversed(_entries)]
+
+
+def clear() -> None:
+    with _lock:
+        _entries.clear()
+        _plans.clear()
@@ -0,0 +1,154 @@
+# backend/app/services/smtp_pool.py
+from __future__ import annotations
+
+import smtplib
+import ssl
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from email.message import EmailMessage
+from typing import Optional
+
+
+class _PooledConnection:
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.sent = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.broken = False
+
+    def close(self) -> None:
+        try:
+            self.smtp.quit()
+        except Exception:
+            try:
+                self.smtp.close()
+            except Exception:
+                pass
+
+
+class SMTPPool:
+    """
+    Thread-safe pool of logged-in SMTP connections.
+
+    - at most `max_size` connections exist at once (callers block up to `timeout` for a free one)
+    - idle connections are kept open; one idle for more than `noop_after` seconds is NOOP-checked
+      before reuse, one idle for more than `max_idle` seconds is closed instead
+    - a connection is recycled after `max_messages` messages
+    - a send that hits SMTPServerDisconnected (server dropped a stale connection) is retried once
+      on a fresh connection
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        *,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_ssl: bool = False,
+        starttls: bool = True,
+        tls_context: Optional[ssl.SSLContext] = None,
+        timeout: float = 10,
+        max_size: int = 4,
+        max_messages: int = 100,
+        max_idle: float = 60,
+        noop_after: float = 10,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_ssl = use_ssl
+        self.starttls = starttls
+        self.tls_context = tls_context or ssl.create_default_context()
+        self.timeout = timeout
+        self.max_size = max_size
+        self.max_messages = max_messages
+        self.max_idle = max_idle
+        self.noop_after = noop_after
+
+        self._idle: deque[_PooledConnection] = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._closed = False
+
+    # ---- connection lifecycle
+    def _connect(self) -> _PooledConnection:
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(self.host, self.port, context=self.tls_context, timeout=self.timeout)
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            smtp.ehlo()
+            if self.starttls:
+                smtp.starttls(context=self.tls_context)
+                smtp.ehlo()
+        if self.username and self.password:
+            smtp.login(self.username, self.password)
+        return _PooledConnection(smtp)
+
+    def _healthy(self, conn: _PooledConnection) -> bool:
+        idle_for = time.monotonic() - conn.last_used
+        if idle_for > self.max_idle:
+            return False
+        if idle_for > self.noop_after:
+            try:
+                return conn.smtp.noop()[0] == 250
+            except (smtplib.SMTPException, OSError):
+                return False
+        return True
+
+    def _checkout(self) -> _PooledConnection:
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None  # LIFO keeps the warm ones busy
+            if conn is None:
+                return self._connect()
+            if self._healthy(conn):
+                return conn
+            conn.close()
+
+    def _checkin(self, conn: _PooledConnection) -> None:
+        conn.last_used = time.monotonic()
+        if conn.broken or self._closed or conn.sent >= self.max_messages:
+            conn.close()
+            return
+        with self._lock:
+            self._idle.append(conn)
+
+    @contextmanager
+    def connection(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"no SMTP connection free within {self.timeout}s (pool size {self.max_size})")
+        try:
+            conn = self._checkout()
+            try:
+                yield conn
+            except BaseException:
+                conn.broken = True
+                raise
+            finally:
+                self._checkin(conn)
+        finally:
+            self._slots.release()
+
+    # ---- public API
+    def send(self, msg: EmailMessage) -> None:
+        for attempt in (1, 2):
+            try:
+                with self.connection() as conn:
+                    conn.smtp.send_message(msg)
+                    conn.sent += 1
+                return
+            except smtplib.SMTPServerDisconnected:
+                if attempt == 2:
+                    raise
+
+    def close(self) -> None:
+        self._closed = True
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            conn.close()
@@ -0,0 +1,409 @@
+# backend/app/services/storage.py
+"""
+Pluggable storage for generated offer documents and candidate uploads.
+
+Files are addressed by key, e.g. "offers/offer_12_orig.pdf" or "uploads/<sha256>.pdf", and the
+key is what the database keeps (Offer.pdf_path, CandidateProfile.resume_path, ...). Pages link to
+them through GET /files/{key} (url()).
+
+  STORAGE_BACKEND     local (default) | s3
+  STORAGE_DIR         root of the local backend (default backend/storage)
+  STORAGE_S3_BUCKET   bucket of the s3 backend
+  STORAGE_S3_ENDPOINT S3-compatible endpoint (e.g. http://localhost:9000 for MinIO); "local" uses
+                      LocalObjectClient, an in-process stand-in that keeps the bucket under
+                      STORAGE_DIR, for development without boto3 or a server
+
+The local backend shards by a hash of the key, <root>/offers/3f/a2/offer_12_orig.pdf, so no
+directory grows past a few hundred entries, and writes to a temp file in the target directory
+before renaming it into place: readers never see a half-written file.
+
+Files from before this module (flat generated/offers/, uploads/ab/cd/...) are moved in, and the
+database paths rewritten, by:
+
+    python -m app.cli storage-migrate [--dry-run]
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import re
+import shutil
+import tempfile
+import threading
+from pathlib import Path, PurePosixPath
+from typing import Iterator, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent.parent
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")
+STORAGE_DIR = Path(os.getenv("STORAGE_DIR") or BACKEND_DIR / "storage")
+S3_BUCKET = os.getenv("STORAGE_S3_BUCKET", "offers")
+S3_ENDPOINT = os.getenv("STORAGE_S3_ENDPOINT") or None
+
+PREFIXES = ("offers", "uploads")
+_KEY_RE = re.compile(r"^[A-Za-z0-9_-]+(/[A-Za-z0-9_.-]+)+$")
+
+
+class StorageError(RuntimeError):
+    pass
+
+
+def check_key(key: str) -> str:
+    """Keys are relative "prefix/.../name" paths under a known prefix; no "..", no absolute paths."""
+    if not _KEY_RE.match(key) or ".." in key.split("/") or key.split("/", 1)[0] not in PREFIXES:
+        raise StorageError(f"invalid storage key: {key!r}")
+    return key
+
+
+def _atomic_write(dest: Path, fill) -> None:
+    """Write through fill(fileobj) to a temp file next to `dest`, then rename it into place."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=dest.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            fill(out)
+        os.replace(tmp, dest)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+class Storage:
+    name = "base"
+
+    def put(self, key: str, data: bytes) -> str:
+        """Store `data` under `key` (replacing it); returns the key."""
+        raise NotImplementedError
+
+    def put_file(self, key: str, src: str | Path, *, move: bool = False) -> str:
+        """Store a local file under `key`; move=True removes `src` afterwards."""
+        raise NotImplementedError
+
+    def get(self, key: str) -> bytes:
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def keys(self, prefix: str = "") -> Iterator[str]:
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """A filesystem path to read the file from, if the backend keeps one."""
+        return None
+
+    def url(self, key: str) -> str:
+        return f"/files/{key}"
+
+
+# =========================
+# Local disk, hash-sharded
+# =========================
+class LocalStorage(Storage):
+    name = "local"
+
+    def __init__(self, root: Path = STORAGE_DIR):
+        self.root = Path(root)
+
+    def path(self, key: str) -> Path:
+        parent, _, name = check_key(key).rpartition("/")
+        shard = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.root / parent / shard[:2] / shard[2:4] / name
+
+    def put(self, key: str, data: bytes) -> str:
+        _atomic_write(self.path(key), lambda out: out.write(data))
+        return key
+
+    def put_file(self, key: str, src: str | Path, *, move: bool = False) -> str:
+        dest = self.path(key)
+        if move:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.replace(src, dest)  # same filesystem: atomic, no copy
+                return key
+            except OSError:
+                pass
+        with open(src, "rb") as fh:
+            _atomic_write(dest, lambda out: shutil.copyfileobj(fh, out, 1024 * 1024))
+        if move:
+            os.unlink(src)
+        return key
+
+    def get(self, key: str) -> bytes:
+        try:
+            return self.path(key).read_bytes()
+        except FileNotFoundError:
+            raise KeyError(key) from None
+
+    def exists(self, key: str) -> bool:
+        return self.path(key).is_file()
+
+    def delete(self, key: str) -> None:
+        try:
+            self.path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def keys(self, prefix: str = "") -> Iterator[str]:
+        for top in PREFIXES:
+            base = self.root / top
+            for path in base.rglob("*") if base.is_dir() else ():
+                if not path.is_file() or path.name.startswith(".tmp-"):
+                    continue
+                # <root>/<parent>/<aa>/<bb>/<name>: drop the two shard levels
+                parent = path.parent.parent.parent.relative_to(self.root).as_posix()
+                key = f"{parent}/{path.name}"
+                if key.startswith(prefix):
+                    yield key
+
+    def local_path(self, key: str) -> Optional[Path]:
+        path = self.path(key)
+        return path if path.is_file() else None
+
+
+# =========================
+# S3 (and a local stand-in)
+# =========================
+class LocalObjectClient:
+    """
+    The handful of boto3 S3 client calls S3Storage makes, served from a directory: one file per
+    object (flat keys, as in a bucket), written atomically. For development and tests.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _path(self, bucket: str, key: str) -> Path:
+        return self.root / bucket / check_key(key)
+
+    def put_object(self, *, Bucket: str, Key: str, Body: bytes) -> dict:
+        _atomic_write(self._path(Bucket, Key), lambda out: out.write(Body))
+        return {"ETag": '"%s"' % hashlib.md5(Body).hexdigest()}
+
+    def upload_file(self, Filename: str, Bucket: str, Key: str) -> None:
+        with open(Filename, "rb") as fh:
+            self.put_object(Bucket=Bucket, Key=Key, Body=fh.read())
+
+    def get_object(self, *, Bucket: str, Key: str) -> dict:
+        try:
+            return {"Body": io.BytesIO(self._path(Bucket, Key).read_bytes())}
+        except FileNotFoundError:
+            raise KeyError(Key) from None
+
+    def head_object(self, *, Bucket: str, Key: str) -> dict:
+        path = self._path(Bucket, Key)
+        if not path.is_file():
+            raise KeyError(Key)
+        return {"ContentLength": path.stat().st_size}
+
+    def delete_object(self, *, Bucket: str, Key: str) -> dict:
+        self._path(Bucket, Key).unlink(missing_ok=True)
+        return {}
+
+    def get_paginator(self, _name: str) -> "LocalObjectClient":
+        return self  # list_objects_v2 in one page
+
+    def paginate(self, *, Bucket: str, Prefix: str = "") -> Iterator[dict]:
+        base = self.root / Bucket
+        paths = sorted(base.rglob("*")) if base.is_dir() else []
+        keys = [p.relative_to(base).as_posix() for p in paths if p.is_file() and not p.name.startswith(".tmp-")]
+        yield {"Contents": [{"Key": k} for k in keys if k.startswith(Prefix)]}
+
+
+class S3Storage(Storage):
+    name = "s3"
+
+    def __init__(self, bucket: str = S3_BUCKET, endpoint: Optional[str] = S3_ENDPOINT, client=None):
+        self.bucket = bucket
+        if client is None:
+            if endpoint == "local":
+                client = LocalObjectClient(STORAGE_DIR / "s3")
+            else:
+                import boto3  # type: ignore  # optional dependency, only for STORAGE_BACKEND=s3
+
+                client = boto3.client("s3", endpoint_url=endpoint)
+        self.client = client
+
+    def _missing(self, exc: Exception) -> bool:
+        if isinstance(exc, KeyError):
+            return True
+        code = str(getattr(exc, "response", {}).get("Error", {}).get("Code", ""))
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    def put(self, key: str, data: bytes) -> str:
+        self.client.put_object(Bucket=self.bucket, Key=check_key(key), Body=data)
+        return key
+
+    def put_file(self, key: str, src: str | Path, *, move: bool = False) -> str:
+        self.client.upload_file(str(src), self.bucket, check_key(key))
+        if move:
+            os.unlink(src)
+        return key
+
+    def get(self, key: str) -> bytes:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=check_key(key))["Body"].read()
+        except Exception as exc:
+            if self._missing(exc):
+                raise KeyError(key) from None
+            raise
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=check_key(key))
+            return True
+        except Exception as exc:
+            if self._missing(exc):
+                return False
+            raise
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=check_key(key))
+
+    def keys(self, prefix: str = "") -> Iterator[str]:
+        for page in self.client.get_paginator("list_objects_v2").paginate(Bucket=self.bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                yield obj["Key"]
+
+
+_storage: Optional[Storage] = None
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> Storage:
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            if STORAGE_BACKEND == "s3":
+                _storage = S3Storage()
+            elif STORAGE_BACKEND == "local":
+                _storage = LocalStorage()
+            else:
+                raise StorageError(f"STORAGE_BACKEND must be 'local' or 's3', not {STORAGE_BACKEND!r}")
+        return _storage
+
+
+def url(key: Optional[str]) -> str:
+    """Link for a stored file (a Jinja global in the page templates); "" for none."""
+    if not key:
+        return ""
+    try:
+        key = legacy_key(key) or key  # a row storage-migrate hasn't rewritten yet
+    except StorageError:
+        return ""
+    return get_storage().url(key)
+
+
+def staging_dir() -> Path:
+    """Scratch space for uploads being hashed before their key is known; same filesystem as STORAGE_DIR."""
+    path = STORAGE_DIR / ".staging"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+# =========================
+# Moving pre-storage files in
+# =========================
+LEGACY_OFFERS_DIR = BACKEND_DIR / "generated" / "offers"
+LEGACY_UPLOADS_DIR = BACKEND_DIR / "uploads"
+_SHARDED_UPLOAD_RE = re.compile(r"^uploads/[0-9a-f]{2}/[0-9a-f]{2}/([^/]+)$")
+
+
+def _upload_key(rel: str) -> str:
+    # uploads/ab/cd/<sha256><ext> (content-addressed, pre-storage) -> uploads/<sha256><ext>
+    sharded = _SHARDED_UPLOAD_RE.match(rel)
+    return f"uploads/{sharded.group(1)}" if sharded else rel
+
+
+def legacy_key(path: Optional[str]) -> Optional[str]:
+    """Storage key for a path saved before this module, or None if `path` already is a key.
+
+    The upload handler and the offer renderer saved absolute paths (<backend>/uploads/12/resume.pdf,
+    <backend>/generated/offers/offer_3_orig.pdf, either with Windows separators); these map to the
+    keys _legacy_files() moves the files to. Anything else raises StorageError.
+    """
+    if not path:
+        return None
+    path = path.replace("\\", "/")
+    if path.startswith("uploads/"):
+        key = _upload_key(path)
+        return key if key != path else None
+    try:
+        check_key(path)
+        return None
+    except StorageError:
+        pass
+    if "/uploads/" in path:
+        return check_key(_upload_key("uploads/" + path.rsplit("/uploads/", 1)[1]))
+    if "/generated/offers/" in path:
+        return check_key("offers/" + path.rsplit("/generated/offers/", 1)[1])
+    raise StorageError(f"not a storage key or a pre-storage path: {path!r}")
+
+
+def _legacy_files() -> Iterator[tuple[Path, str]]:
+    if LEGACY_OFFERS_DIR.is_dir():
+        for path in sorted(LEGACY_OFFERS_DIR.iterdir()):
+            if path.is_file():
+                yield path, f"offers/{path.name}"
+    if LEGACY_UPLOADS_DIR.is_dir():
+        for path in sorted(LEGACY_UPLOADS_DIR.rglob("*")):
+            rel = path.relative_to(BACKEND_DIR).as_posix()
+            if path.is_file() and not rel.startswith("uploads/tmp/"):
+                yield path, _upload_key(rel)
+
+
+def migrate_legacy(*, dry_run: bool = False, batch_size: int = 500) -> dict:
+    """Move pre-storage files into get_storage() and rewrite the paths the database holds."""
+    from sqlalchemy import bindparam, select, update
+
+    from app import models
+    from app.database import SessionLocal
+
+    store = get_storage()
+    totals = {"files": 0, "offers": 0, "profiles": 0, "unrecognised": 0}
+    for path, key in _legacy_files():
+        totals["files"] += 1
+        if dry_run:
+            continue
+        if store.exists(key):
+            path.unlink()
+        else:
+            store.put_file(key, path, move=True)
+
+    columns = [
+        ("offers", models.Offer, ("pdf_path", "signed_pdf_path")),
+        ("profiles", models.CandidateProfile, ("resume_path", "photo_path")),
+    ]
+    with SessionLocal() as db:
+        for total, model, names in columns:
+            table = model.__table__
+            last_id = 0
+            while True:
+                rows = db.execute(
+                    select(table.c.id, *(table.c[n] for n in names))
+                    .where(table.c.id > last_id).order_by(table.c.id).limit(batch_size)
+                ).all()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                changes = []
+                for row in rows:
+                    new = {}
+                    for n in names:
+                        try:
+                            new[n] = legacy_key(getattr(row, n))
+                        except StorageError as exc:  # left as it is, for someone to look at
+                            print(f"[storage] {total} {row.id}.{n}: {exc}")
+                            totals["unrecognised"] += 1
+                            new[n] = None
+                    if any(new.values()):
+                        changes.append({"b_id": row.id, **{n: new[n] or getattr(row, n) for n in names}})
+                totals[total] += len(changes)
+                if changes and not dry_run:
+                    db.execute(update(table).where(table.c.id == bindparam("b_id")), changes)
+                    db.commit()
+    return totals
@@ -0,0 +1,70 @@
+# backend/app/services/token_sweeper.py
+"""
+Expired / used signature-token sweeper.
+
+Tokens are only needed until they are consumed or expire (the signature itself is recorded on
+the offer), so rows older than TOKEN_SWEEP_RETENTION_HOURS past their expiry or use are deleted,
+TOKEN_SWEEP_BATCH rows per transaction so the sweep never holds long locks:
+
+    python -m app.cli tokens-sweep            # one pass, e.g. from cron
+    python -m app.cli tokens-sweep --loop     # run forever, every TOKEN_SWEEP_INTERVAL seconds
+
+TOKEN_SWEEP_INPROCESS=1 runs the loop in a daemon thread of the web process instead.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, or_, select
+
+from app import models
+from app.database import SessionLocal
+
+BATCH_SIZE = int(os.getenv("TOKEN_SWEEP_BATCH", "1000"))
+INTERVAL = float(os.getenv("TOKEN_SWEEP_INTERVAL", "3600"))
+RETENTION_HOURS = float(os.getenv("TOKEN_SWEEP_RETENTION_HOURS", "168"))
+
+
+def sweep_once(batch_size: int = BATCH_SIZE, retention_hours: float = RETENTION_HOURS) -> int:
+    """Delete tokens expired or used before the retention cutoff. Returns rows deleted."""
+    T = models.OfferSignatureToken
+    cutoff = datetime.utcnow() - timedelta(hours=retention_hours)
+    deleted = 0
+    db = SessionLocal()
+    try:
+        while True:
+            ids = list(db.scalars(
+                select(T.id).where(or_(T.expires_at < cutoff, T.used_at < cutoff)).limit(batch_size)
+            ))
+            if not ids:
+                break
+            db.execute(delete(T).where(T.id.in_(ids)), execution_options={"synchronize_session": False})
+            db.commit()
+            deleted += len(ids)
+            if len(ids) < batch_size:
+                break
+    finally:
+        db.close()
+    return deleted
+
+
+def run(*, stop: Optional[threading.Event] = None, interval: float = INTERVAL, **options) -> None:
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        try:
+            count = sweep_once(**options)
+            if count:
+                print(f"[tokens] swept {count} expired/used signature tokens")
+        except Exception as exc:  # keep the schedule going; the next pass retries
+            print(f"[tokens] sweep failed: {exc}")
+        stop.wait(interval)
+
+
+def start_background_sweeper() -> threading.Event:
+    """Sweep from a daemon thread in this process (dev / single-box setups)."""
+    stop = threading.Event()
+    threading.Thread(target=run, kwargs={"stop": stop}, name="token-sweeper", daemon=True).start()
+    return stop
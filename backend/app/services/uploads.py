@@ -0,0 +1,102 @@
+# backend/app/services/uploads.py
+"""
+Content-addressed storage for candidate uploads (resume / photo).
+
+Files are copied from the upload's spooled temp file in UPLOAD_CHUNK_SIZE chunks on a worker
+thread, hashed on the way, and stored (app.services.storage) under the key
+
+    uploads/<sha256><ext>
+
+so an identical file uploaded twice (or by two candidates) is kept once. Memory per upload stays
+at one chunk whatever the file size. Limits:
+
+  UPLOAD_MAX_BYTES   largest accepted file (default 10 MiB). Requests whose Content-Length is
+                     already over it are refused before the multipart body is parsed
+                     (SizeLimitedRoute); chunked bodies are cut off while copying.
+  UPLOAD_CHUNK_SIZE  copy buffer (default 1 MiB)
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO, Callable
+
+from fastapi import HTTPException, Request, Response, UploadFile
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+
+from app.services import storage
+
+MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+MULTIPART_OVERHEAD = 64 * 1024  # boundaries + the other form fields
+
+_EXT_RE = re.compile(r"^\.[a-z0-9]{1,8}$")
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+@dataclass
+class StoredFile:
+    path: str      # storage key, e.g. "uploads/abcd....pdf" (linked through storage.url)
+    sha256: str
+    size: int
+    deduplicated: bool
+
+
+def safe_ext(filename: str, default: str) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    return ext if _EXT_RE.match(ext) else default
+
+
+def _copy_to_store(src: BinaryIO, ext: str, max_bytes: int) -> StoredFile:
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=storage.staging_dir())
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := src.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"file is larger than {max_bytes} bytes")
+                digest.update(chunk)
+                out.write(chunk)
+
+        sha = digest.hexdigest()
+        key = f"uploads/{sha}{ext}"
+        store = storage.get_storage()
+        if store.exists(key):
+            os.unlink(tmp_path)
+            return StoredFile(key, sha, size, deduplicated=True)
+        store.put_file(key, tmp_path, move=True)  # atomic: readers never see a half-written file
+        return StoredFile(key, sha, size, deduplicated=False)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+async def store_upload(file: UploadFile, *, ext: str, max_bytes: int = MAX_BYTES) -> StoredFile:
+    """Stream `file` into the content-addressed store off the event loop."""
+    await file.seek(0)
+    return await run_in_threadpool(_copy_to_store, file.file, ext, max_bytes)
+
+
+class SizeLimitedRoute(APIRoute):
+    """Route class that answers 413 from Content-Length alone, before the body is read."""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def _handler(request: Request) -> Response:
+            length = request.headers.get("content-length")
+            if length and length.isdigit() and int(length) > MAX_BYTES + MULTIPART_OVERHEAD:
+                raise HTTPException(status_code=413, detail=f"Upload larger than {MAX_BYTES} bytes")
+            return await handler(request)
+
+        return _handler
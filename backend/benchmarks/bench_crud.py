@@ -0,0 +1,102 @@
+# backend/benchmarks/bench_crud.py
+"""
+Micro-benchmarks for the app.crud helpers and documents.render_offer_html.
+
+Runs against a database seeded by benchmarks.datagen (seeds one at --scale unless --no-seed),
+one Session per call like a request would use. Write paths roll back, except token consumption,
+which eats through distinct seeded tokens.
+
+    cd backend && python -m benchmarks.bench_crud --scale 100k --json crud.json
+    python -m benchmarks.harness compare crud-before.json crud.json
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+import random
+from datetime import datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_data.db")
+os.environ.setdefault("PDF_RENDERER", "stub")
+
+
+def main(argv: list[str] | None = None) -> list[dict]:
+    from benchmarks import datagen
+    from benchmarks.harness import measure, write_json
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", default="1k")
+    parser.add_argument("--no-seed", action="store_true", help="reuse the data already in DATABASE_URL")
+    parser.add_argument("--force", action="store_true", help="seed a DATABASE_URL without 'bench' in it")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    n = datagen.parse_scale(args.scale)
+    if not args.no_seed:
+        datagen.seed(n, force=args.force)
+
+    from app import crud, models, schemas
+    from app.database import SessionLocal
+    from app.services.documents import render_offer_html
+    from app.services.offer_pipeline import build_context
+
+    rnd = random.Random(1)
+    ids = lambda: rnd.randint(1, n)
+
+    def _with_session(fn):
+        def run():
+            with SessionLocal() as db:
+                fn(db)
+        return run
+
+    def _create_candidate(db):
+        i = next(counter)
+        crud.create_candidate(
+            db, schemas.CandidateCreate(first_name="Bench", last_name="Create", email=f"create{i}@example.com"),
+            user_id=1, commit=False,
+        )
+        db.rollback()
+
+    counter = itertools.count()
+    with SessionLocal() as db:
+        token_count = db.query(models.OfferSignatureToken).count()
+        sample_offer = db.query(models.Offer).first()
+        sample_candidate = crud.get_candidate(db, sample_offer.candidate_id) if sample_offer else crud.get_candidate(db, 1)
+        context = build_context(sample_candidate, sample_offer or models.Offer(id=0, job_title="Carer"))
+    # consume unused tokens first; used/expired ones still measure the (cheaper) miss path
+    tokens = iter(range(1, token_count + 1))
+
+    benches = {
+        "crud.get_candidate": _with_session(lambda db: crud.get_candidate(db, ids())),
+        "crud.get_candidates(limit=10)": _with_session(lambda db: crud.get_candidates(db, skip=ids() % 1000, limit=10)),
+        "crud.get_user_by_email": _with_session(lambda db: crud.get_user_by_email(db, f"bench{ids()}@example.com")),
+        "crud.get_candidate_by_user": _with_session(lambda db: crud.get_candidate_by_user(db, ids())),
+        "crud.get_or_create_profile": _with_session(lambda db: (crud.get_or_create_profile(db, ids(), commit=False), db.rollback())),
+        "crud.list_offers(status=Sent)": _with_session(lambda db: crud.list_offers(db, status=models.OfferStatus.SENT)),
+        "crud.list_offers(candidate_id)": _with_session(lambda db: crud.list_offers(db, candidate_id=ids())),
+        "crud.create_candidate (rolled back)": _with_session(_create_candidate),
+        "crud.verify_and_consume_token": _with_session(
+            lambda db: crud.verify_and_consume_token(db, datagen.raw_token(next(tokens, 0)))
+        ),
+        "crud.verify_and_consume_token (unknown)": _with_session(
+            lambda db: crud.verify_and_consume_token(db, "no-such-token")
+        ),
+        "documents.render_offer_html": lambda: render_offer_html("offer_default.html", {**context, "now": datetime.utcnow()}),
+    }
+
+    repeat = args.repeat
+    results = []
+    for name, fn in benches.items():
+        times = min(repeat, token_count) if name == "crud.verify_and_consume_token" else repeat
+        if times:
+            results.append(measure(name, fn, repeat=times, warmup=0 if "consume" in name else 10))
+
+    if args.json:
+        write_json(args.json, "crud", results, scale=n, database=os.environ["DATABASE_URL"].split("://")[0])
+    return results
+
+
+if __name__ == "__main__":
+    main()
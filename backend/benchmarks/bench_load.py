@@ -0,0 +1,186 @@
+# backend/benchmarks/bench_load.py
+"""
+Load test: async admin list route vs. the same page served by a sync (threadpool) route.
+
+Starts uvicorn (one worker) on a seeded SQLite database and drives it with httpx at 50 / 200 /
+1000 concurrent clients, reporting requests/sec and p50/p95/p99 latency for
+
+  async  GET /admin/applicants              (AsyncSession, the real route)
+  sync   GET /_bench/sync/admin/applicants  (Session via get_db in Starlette's threadpool,
+                                             i.e. the route as it was before the async port)
+
+    cd backend && python -m benchmarks.bench_load --seconds 10 --concurrency 50 200 1000
+    # point at PostgreSQL instead (a database with "bench" in its URL, or --force; it is wiped):
+    #   DATABASE_URL=postgresql://.../intake_bench python -m benchmarks.bench_load
+
+SQLite serialises writers but these are reads; PostgreSQL + asyncpg shows the bigger gap.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from fastapi import Depends, Request
+from fastapi.responses import HTMLResponse
+from sqlalchemy.orm import Session
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_load.db")
+
+ROUTES = {
+    "async": "/admin/applicants",
+    "sync": "/_bench/sync/admin/applicants",
+}
+
+
+def create_app():
+    """uvicorn factory: the real app plus the sync baseline route."""
+    from app import models
+    from app.database import get_db
+    from app.main import APPLICANT_STATUSES_EXCLUDE, _page_args, _pager, app, templates
+    from app.services.pagination import keyset_page
+
+    @app.get("/_bench/sync/admin/applicants", response_class=HTMLResponse, include_in_schema=False)
+    def sync_applicants(request: Request, db: Session = Depends(get_db)):
+        page = keyset_page(
+            db.query(models.Candidate).filter(~models.Candidate.status.in_(APPLICANT_STATUSES_EXCLUDE)),
+            (models.Candidate.applied_on, models.Candidate.id),
+            descending=True,
+            **_page_args(request),
+        )
+        return templates.TemplateResponse(
+            "applicants.html", {"request": request, "applicants": page.items, "flash": None, **_pager(request, page)}
+        )
+
+    return app
+
+
+def _seed(rows: int) -> None:
+    from app import models
+    from app.database import Base, SessionLocal, engine
+    from app.services import migrations, search
+
+    Base.metadata.drop_all(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE IF EXISTS alembic_version")
+    migrations.upgrade()
+    search.ensure_index()
+    with SessionLocal() as db:
+        users = [
+            models.User(username=f"load{i}", email=f"load{i}@example.com", hashed_password="x") for i in range(rows)
+        ]
+        db.add_all(users)
+        db.flush()
+        db.add_all(
+            models.Candidate(
+                first_name=f"Load{i}", last_name="Test", email=u.email, status="Applied", job_title="Carer", user_id=u.id
+            )
+            for i, u in enumerate(users)
+        )
+        db.commit()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(port: int) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "--factory", "benchmarks.bench_load:create_app",
+         "--port", str(port), "--log-level", "warning", "--no-access-log", "--backlog", "4096"],
+        env=os.environ.copy(),
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise SystemExit("uvicorn did not start")
+
+
+async def _drive(base_url: str, path: str, concurrency: int, seconds: float) -> dict:
+    import httpx
+
+    latencies: list[float] = []
+    errors = 0
+    stop_at = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def _client():
+            nonlocal errors
+            while time.perf_counter() < stop_at:
+                started = time.perf_counter()
+                try:
+                    r = await client.get(path)
+                    ok = r.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(_client() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    ms = sorted(x * 1000 for x in latencies) or [0.0]
+    pct = lambda p: ms[min(len(ms) - 1, int(len(ms) * p))]
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(ms), 1),
+        "p95_ms": round(pct(0.95), 1),
+        "p99_ms": round(pct(0.99), 1),
+    }
+
+
+def main(argv: list[str] | None = None) -> list[dict]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--force", action="store_true", help="seed a DATABASE_URL without 'bench' in it")
+    args = parser.parse_args(argv)
+
+    from benchmarks.harness import guard_database
+
+    guard_database(args.force)  # _seed drops every table
+    _seed(args.rows)
+    port = _free_port()
+    server = _start_server(port)
+    results = []
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        for concurrency in args.concurrency:
+            for label, path in ROUTES.items():
+                row = {"route": label, "concurrency": concurrency, **asyncio.run(_drive(base_url, path, concurrency, args.seconds))}
+                results.append(row)
+                print(f"{label:>5} c={concurrency:<5} {row['rps']:>8} req/s  p50={row['p50_ms']}ms"
+                      f"  p95={row['p95_ms']}ms  p99={row['p99_ms']}ms  errors={row['errors']}")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# backend/benchmarks/bench_mailer.py
+"""
+SMTP throughput: one connection per message (old mailer) vs. the pooled transport.
+
+Runs against a local aiosmtpd stand-in (pip install aiosmtpd), so no real mail leaves the box.
+The stand-in speaks plain SMTP without TLS/AUTH, so real-world savings (TLS handshake + LOGIN per
+message) are larger than what this shows.
+
+    cd backend && python -m benchmarks.bench_mailer --messages 500 --threads 4
+"""
+from __future__ import annotations
+
+import argparse
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+
+from app.services.smtp_pool import SMTPPool
+
+
+def _message(i: int) -> EmailMessage:
+    msg = EmailMessage()
+    msg["Subject"] = f"bench {i}"
+    msg["From"] = "HR <hr@example.com>"
+    msg["To"] = f"candidate{i}@example.com"
+    msg.set_content("Please view this email in HTML.")
+    msg.add_alternative(f"<p>message {i}</p>", subtype="html")
+    return msg
+
+
+def _send_unpooled(host: str, port: int, msg: EmailMessage) -> None:
+    with smtplib.SMTP(host, port, timeout=10) as server:
+        server.ehlo()
+        server.send_message(msg)
+
+
+def _run(label: str, send, messages: int, threads: int) -> dict:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as ex:
+        list(ex.map(send, (_message(i) for i in range(messages))))
+    elapsed = time.perf_counter() - started
+    result = {"mode": label, "messages": messages, "threads": threads,
+              "seconds": round(elapsed, 3), "msgs_per_sec": round(messages / elapsed, 1)}
+    print(f"{label:>10}: {messages} msgs in {elapsed:.2f}s -> {messages / elapsed:.1f} msg/s")
+    return result
+
+
+def main(argv: list[str] | None = None) -> list[dict]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args(argv)
+
+    try:
+        from aiosmtpd.controller import Controller
+        from aiosmtpd.handlers import Sink
+    except ImportError:
+        raise SystemExit("aiosmtpd is required for this benchmark: pip install aiosmtpd")
+
+    controller = Controller(Sink(), hostname="127.0.0.1", port=args.port)
+    controller.start()
+    try:
+        host, port = controller.hostname, controller.port
+        results = [_run("unpooled", lambda m: _send_unpooled(host, port, m), args.messages, args.threads)]
+
+        pool = SMTPPool(host, port, starttls=False, max_size=args.threads)
+        try:
+            results.append(_run("pooled", pool.send, args.messages, args.threads))
+        finally:
+            pool.close()
+    finally:
+        controller.stop()
+
+    speedup = results[1]["msgs_per_sec"] / results[0]["msgs_per_sec"]
+    print(f"speedup: {speedup:.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# backend/benchmarks/bench_pdf.py
+"""
+Offer PDF throughput with 1, 4 and N render workers.
+
+Renders the real offer template through app.services.pdf_engine. Uses WeasyPrint/pdfkit when
+installed; `--renderer stub` swaps in a fixed-cost CPU-bound stand-in (PDF_STUB_MS) so pool
+scaling can be measured anywhere.
+
+    cd backend && python -m benchmarks.bench_pdf --docs 40 --workers 1 4 8
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from datetime import datetime
+
+
+def main(argv: list[str] | None = None) -> list[dict]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, default=40)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, os.cpu_count() or 1])
+    parser.add_argument("--renderer", default=os.getenv("PDF_RENDERER", "auto"))
+    args = parser.parse_args(argv)
+
+    # pool processes are spawned and read their config from the environment
+    os.environ["PDF_RENDERER"] = args.renderer
+    from app.services import pdf_engine
+    from app.services.documents import render_offer_html
+
+    pdf_engine.RENDERER = args.renderer
+    html = render_offer_html("offer_default.html", {
+        "candidate_name": "Bench Candidate", "job_title": "Support Worker", "salary": "$80,000",
+        "start_date": datetime(2026, 1, 5), "offer_valid_until": datetime(2026, 1, 1),
+        "company_name": "Bench Co", "location": "Melbourne", "hr_contact_name": "HR",
+        "hr_contact_email": "hr@example.com", "offer_id": 1, "now": datetime.utcnow(),
+    })
+
+    results = []
+    for workers in dict.fromkeys(args.workers):  # keep order, drop duplicates
+        engine = pdf_engine.PdfEngine(mode="process", workers=workers, queue_max=args.docs)
+        engine.warm()  # measure steady state, not process start-up
+        started = time.perf_counter()
+        jobs = [engine.submit(html) for _ in range(args.docs)]
+        ok = sum(1 for job in jobs if job.result())
+        elapsed = time.perf_counter() - started
+        engine.shutdown()
+        row = {"workers": workers, "docs": args.docs, "ok": ok, "seconds": round(elapsed, 3),
+               "docs_per_sec": round(args.docs / elapsed, 2)}
+        results.append(row)
+        print(f"workers={workers:>2}: {ok}/{args.docs} PDFs in {elapsed:.2f}s -> {row['docs_per_sec']} docs/s")
+    return results
+
+
+if __name__ == "__main__":
+    main()
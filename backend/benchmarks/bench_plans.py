@@ -0,0 +1,103 @@
+# backend/benchmarks/bench_plans.py
+"""
+Query plans and timings of the admin list queries before and after the filter indexes.
+
+Seeds with benchmarks.datagen (unless --no-seed), migrates down to --before (the revision before
+the composite indexes), EXPLAINs and times each query, migrates back up to head and does the same
+again. The plans go to stdout and, with --json, into each result row next to its timings.
+
+    cd backend && python -m benchmarks.bench_plans --scale 100k --json plans.json
+"""
+from __future__ import annotations
+
+import argparse
+import os
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_data.db")
+
+WORKER_STATUSES = ("Hired", "Employee", "Active")  # app.main.WORKER_STATUSES
+PAGE = 50
+
+
+def queries() -> dict:
+    """The statements behind the admin views, as the routes build them (first keyset page)."""
+    from sqlalchemy import func, select
+
+    from app import models
+
+    C, U, O = models.Candidate, models.User, models.Offer
+    since = datetime.utcnow() - timedelta(days=90)
+    workers = (
+        select(U.id, C.id).join(C, C.user_id == U.id)
+        .order_by(func.lower(U.username), U.id).limit(PAGE + 1)
+    )
+    return {
+        "candidates page": select(C).order_by(C.applied_on.desc(), C.id.desc()).limit(PAGE + 1),
+        "applicants page": (
+            select(C).where(~C.status.in_(WORKER_STATUSES))
+            .order_by(C.applied_on.desc(), C.id.desc()).limit(PAGE + 1)
+        ),
+        "workers page": workers.where(C.status.in_(WORKER_STATUSES)),
+        "workers ?status&date range": workers.where(C.status == "Hired", C.applied_on >= since),
+        "workers ?status&role": workers.where(C.status == "Hired", C.job_title == "Nurse"),
+        "workers facets": (
+            select(C.status, C.job_title, func.count())
+            .where(C.status.in_(WORKER_STATUSES), C.applied_on >= since)
+            .group_by(C.status, C.job_title)
+        ),
+        "get_candidate_by_user": select(C).where(C.user_id == 4242).limit(1),
+        "list_offers(status=Sent)": (
+            select(O).where(O.status == models.OfferStatus.SENT).order_by(O.id.desc()).limit(PAGE)
+        ),
+    }
+
+
+def run_suite(label: str, repeat: int) -> list[dict]:
+    from app.database import engine
+    from app.services.slow_queries import explain
+    from benchmarks.harness import measure
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")  # fresh planner statistics for the indexes there are now
+    results = []
+    with engine.connect() as conn:
+        for name, stmt in queries().items():
+            plan = explain(conn, stmt)
+            print(f"-- {name} [{label}]\n{plan}")
+            row = measure(f"{name} [{label}]", lambda: conn.execute(stmt).all(), repeat=repeat, plan=plan)
+            results.append(row)
+    return results
+
+
+def main(argv: list[str] | None = None) -> list[dict]:
+    from benchmarks import datagen
+    from benchmarks.harness import write_json
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", default="1k")
+    parser.add_argument("--no-seed", action="store_true", help="reuse the data already in DATABASE_URL")
+    parser.add_argument("--force", action="store_true", help="seed a DATABASE_URL without 'bench' in it")
+    parser.add_argument("--before", default="0002", help="revision to measure the 'before' plans at")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    n = datagen.parse_scale(args.scale)
+    if not args.no_seed:
+        datagen.seed(n, force=args.force)
+
+    from app.services import migrations
+
+    migrations.downgrade(args.before)
+    results = run_suite("before", args.repeat)
+    migrations.upgrade()
+    results += run_suite("after", args.repeat)
+
+    if args.json:
+        write_json(args.json, "plans", results, scale=n, database=os.environ["DATABASE_URL"].split("://")[0])
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# backend/benchmarks/bench_routes.py
+"""
+Route-level benchmarks through TestClient for the admin and portal pages and the offer flow.
+
+Seeds with benchmarks.datagen, then times each request in-process (no network), including the
+middleware stack. Local stand-ins keep it self-contained: PDFs use the stub renderer
+(PDF_RENDERER=stub, PDF_STUB_MS) and the mailer's SMTP pool is replaced by an in-memory sink, so
+the offer flow's outbox drain runs the real templates without sending anything.
+
+    cd backend && python -m benchmarks.bench_routes --scale 100k --json routes.json
+    python -m benchmarks.harness compare routes-before.json routes.json
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import threading
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_data.db")
+os.environ.setdefault("PDF_RENDERER", "stub")
+os.environ.setdefault("PDF_STUB_MS", "5")
+os.environ.setdefault("PDF_ENGINE", "inline")
+os.environ.setdefault("SMTP_USERNAME", "bench")
+os.environ.setdefault("SMTP_PASSWORD", "bench")
+
+
+class SinkPool:
+    """Stand-in for the mailer's SMTPPool: keeps a count instead of talking SMTP."""
+
+    def __init__(self):
+        self.sent = 0
+        self._lock = threading.Lock()
+
+    def send(self, msg) -> None:
+        msg.as_bytes()  # still serialise the message, like smtplib would
+        with self._lock:
+            self.sent += 1
+
+    def close(self) -> None:
+        pass
+
+
+def main(argv: list[str] | None = None) -> list[dict]:
+    from benchmarks import datagen
+    from benchmarks.harness import measure, write_json
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", default="1k")
+    parser.add_argument("--no-seed", action="store_true", help="reuse the data already in DATABASE_URL")
+    parser.add_argument("--force", action="store_true", help="seed a DATABASE_URL without 'bench' in it")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    n = datagen.parse_scale(args.scale)
+    if not args.no_seed:
+        datagen.seed(n, force=args.force)
+
+    from fastapi.testclient import TestClient
+
+    from app import models
+    from app.database import SessionLocal
+    from app.main import app
+    from app.services import mailer, outbox
+
+    sink = SinkPool()
+    mailer._pool = sink
+
+    with SessionLocal() as db:
+        worker = db.query(models.Candidate).filter(models.Candidate.status == "Hired").first()
+        role = worker.job_title if worker else "Carer"
+        candidate_id = db.query(models.Candidate.id).order_by(models.Candidate.id).limit(1).scalar()
+
+    results = []
+    with TestClient(app) as client:
+        def get(path: str):
+            def run():
+                r = client.get(path)
+                assert r.status_code == 200, (path, r.status_code)
+            return run
+
+        pages = {
+            "GET /admin": "/admin",
+            "GET /admin/users": "/admin/users",
+            "GET /admin/users?status=Hired": "/admin/users?status=Hired",
+            "GET /admin/users?role&date range": f"/admin/users?role={role}&date_from=2000-01-01&date_to=2100-01-01",
+            "GET /admin/users?q=bench12": "/admin/users?q=bench12",
+            "GET /admin/users?page_size=100": "/admin/users?page_size=100",
+            "GET /admin/applicants": "/admin/applicants",
+            "GET /admin/applicants?page_size=100": "/admin/applicants?page_size=100",
+        }
+        for name, path in pages.items():
+            results.append(measure(name, get(path), repeat=args.repeat))
+
+        # portal: log in as seeded user 1 (bcrypt once), then the profile page
+        r = client.post("/auth/login", data={"email": "bench1@example.com", "password": datagen.PASSWORD})
+        assert r.status_code == 200, r.status_code
+        results.append(measure("GET /portal/profile", get("/portal/profile"), repeat=args.repeat))
+
+        # offer flow: create + render + token + queue mail, then drain the outbox through the sink
+        def create_offer():
+            r = client.post("/api/admin/offers", json={"candidate_id": candidate_id, "job_title": "Support Worker"})
+            assert r.status_code == 200, r.text
+
+        def create_offer_async():
+            r = client.post("/api/admin/offers?async=1", json={"candidate_id": candidate_id, "job_title": "Support Worker"})
+            assert r.status_code == 202, r.text
+            status_url = r.json()["status_url"]
+            while client.get(status_url).json()["status"] not in ("done", "failed"):
+                time.sleep(0.001)
+
+        def offer_batch():
+            items = [{"candidate_id": candidate_id, "job_title": "Support Worker"} for _ in range(20)]
+            r = client.post("/api/admin/offers/batch", json=items)
+            assert r.status_code == 200, r.text
+
+        flow_repeat = max(5, args.repeat // 5)
+        results.append(measure("POST /api/admin/offers", create_offer, repeat=flow_repeat))
+        results.append(measure("POST /api/admin/offers?async=1 (until done)", create_offer_async, repeat=flow_repeat))
+        results.append(measure("POST /api/admin/offers/batch (20)", offer_batch, repeat=flow_repeat))
+        results.append(measure(
+            "outbox drain (one batch)", lambda: outbox.run_worker(once=True), repeat=flow_repeat, warmup=0
+        ))
+
+    print(f"sink received {sink.sent} mails")
+    if args.json:
+        write_json(args.json, "routes", results, scale=n, database=os.environ["DATABASE_URL"].split("://")[0])
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# backend/benchmarks/bench_signing.py
+"""
+Signing latency: stamping the issued PDF versus re-rendering the signed offer.
+
+Renders the real offer template once, then times documents.render_signed (the whole document laid
+out again with the signature footer) against signing.stamp (a signature page appended to the
+original as an incremental update). Uses WeasyPrint/pdfkit when installed; `--renderer stub`
+stands in with a fixed-cost render (PDF_STUB_MS) and a one-page PDF.
+
+    cd backend && python -m benchmarks.bench_signing --repeat 20 --json signing.json
+"""
+from __future__ import annotations
+
+import argparse
+import os
+from datetime import datetime
+
+
+def main(argv: list[str] | None = None) -> list[dict]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--renderer", default=os.getenv("PDF_RENDERER", "auto"))
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    # render in this process: the comparison is per document, not pool throughput
+    os.environ["PDF_RENDERER"], os.environ["PDF_ENGINE"] = args.renderer, "inline"
+    from app.services import documents, pdf_engine, signing
+    from benchmarks.harness import measure, write_json
+
+    pdf_engine.RENDERER, pdf_engine.ENGINE_MODE = args.renderer, "inline"
+    html, original = documents.render_original(context={
+        "candidate_name": "Bench Candidate", "job_title": "Support Worker", "salary": "$80,000",
+        "start_date": datetime(2026, 1, 5), "offer_valid_until": datetime(2026, 1, 1),
+        "company_name": "Bench Co", "location": "Melbourne", "hr_contact_name": "HR",
+        "hr_contact_email": "hr@example.com", "offer_id": 1, "now": datetime.utcnow(),
+    })
+    if not original:
+        parser.error(f"no PDF renderer available (--renderer {args.renderer})")
+    signer = {"signer_name": "Bench Candidate", "signed_at": datetime.utcnow(), "ip": "203.0.113.7"}
+    digest = signing.sha256(original)
+
+    results = [
+        measure("re-render (render_signed)", lambda: documents.render_signed(original_html=html, **signer),
+                repeat=args.repeat, warmup=2),
+        measure("stamp (signing.stamp)", lambda: signing.stamp(original, expected_sha256=digest, **signer),
+                repeat=args.repeat * 10, warmup=5, original_bytes=len(original)),
+    ]
+    ratio = results[1]["p50_us"] / results[0]["p50_us"]
+    print(f"stamping takes {ratio:.2%} of a re-render (p50)")
+    if args.json:
+        write_json(args.json, "signing", results, renderer=args.renderer)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# backend/benchmarks/bench_statements.py
+"""
+SQL statements and commits per request for the offer and profile write paths.
+
+Counts every cursor execute on the sync and async engines while one request runs, against a throwaway
+SQLite database. `--check` exits non-zero when a route goes over its budget, so an N+1 or a
+re-introduced commit-per-crud-call shows up as a failure. The same budgets are asserted by
+tests/test_statement_counts.py.
+
+    cd backend && DATABASE_URL=sqlite:///./bench.db python -m benchmarks.bench_statements --check
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import threading
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_statements.db")
+os.environ.setdefault("PDF_RENDERER", "stub")
+os.environ.setdefault("PDF_STUB_MS", "1")
+os.environ.setdefault("PDF_ENGINE", "inline")
+
+# statements / commits one request may issue
+BUDGETS = {
+    "POST /api/admin/offers": (10, 2),
+    "POST /api/admin/offers?async=1": (6, 1),
+    "POST /portal/profile/admin/{id}": (10, 1),
+}
+
+
+class _Counter:
+    # async offer jobs run on the offer-pipeline threads after the 202; they are not the request's cost
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+
+    @staticmethod
+    def _background() -> bool:
+        return threading.current_thread().name.startswith("offer-pipeline")
+
+    def on_execute(self, *args, **kwargs):
+        if not self._background():
+            self.statements += 1
+
+    def on_commit(self, *args, **kwargs):
+        if not self._background():
+            self.commits += 1
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--check", action="store_true", help="fail when a route exceeds its budget")
+    parser.add_argument("--force", action="store_true", help="rebuild a DATABASE_URL without 'bench' in it")
+    args = parser.parse_args(argv)
+
+    from benchmarks.harness import guard_database
+
+    guard_database(args.force)  # the tables are dropped and recreated below
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    from app import models
+    from app.database import Base, SessionLocal, async_engine, engine
+    from app.main import app
+    from app.services import migrations, search
+
+    Base.metadata.drop_all(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE IF EXISTS alembic_version")
+    migrations.upgrade()
+    search.ensure_index()
+    with SessionLocal() as db:
+        user = models.User(username="bench", email="bench@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        cand = models.Candidate(first_name="Bench", last_name="User", email="bench@example.com", user_id=user.id)
+        db.add(cand)
+        db.commit()
+        user_id, cand_id = user.id, cand.id
+
+    counter = _Counter()
+    results = {}
+    with TestClient(app) as client:
+        requests = {
+            "POST /api/admin/offers": lambda: client.post(
+                "/api/admin/offers", json={"candidate_id": cand_id, "job_title": "Support Worker"}
+            ),
+            "POST /api/admin/offers?async=1": lambda: client.post(
+                "/api/admin/offers?async=1", json={"candidate_id": cand_id, "job_title": "Support Worker"}
+            ),
+            "POST /portal/profile/admin/{id}": lambda: client.post(
+                f"/portal/profile/admin/{user_id}",
+                data={"summary": "s", "skills": "k", "job_title": "Support Worker"},
+                follow_redirects=False,
+            ),
+        }
+        engines = (engine, async_engine.sync_engine)
+        for e in engines:
+            event.listen(e, "before_cursor_execute", counter.on_execute)
+            event.listen(e, "commit", counter.on_commit)
+        try:
+            for name, send in requests.items():
+                counter.statements = counter.commits = 0
+                response = send()
+                results[name] = {"status": response.status_code, "statements": counter.statements, "commits": counter.commits}
+        finally:
+            for e in engines:
+                event.remove(e, "before_cursor_execute", counter.on_execute)
+                event.remove(e, "commit", counter.on_commit)
+
+    failed = False
+    for name, row in results.items():
+        max_statements, max_commits = BUDGETS[name]
+        over = row["statements"] > max_statements or row["commits"] > max_commits
+        failed |= over
+        print(f"{name:<34} {row['status']}  statements={row['statements']:>3} (budget {max_statements})"
+              f"  commits={row['commits']} (budget {max_commits}){'  OVER' if over else ''}")
+    if args.check and failed:
+        sys.exit(1)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# backend/benchmarks/datagen.py
+"""
+Seeded synthetic data for the benchmarks: Users, Candidates, CandidateProfiles, Offers and
+signature tokens at 1k / 100k / 1m candidates.
+
+    cd backend && python -m benchmarks.datagen --scale 100k [--seed 42]
+
+Same seed, same rows: every user/candidate pair is `bench{i}` / bench{i}@example.com, all users
+share PASSWORD, and token i's raw value is raw_token(i), so benchmarks can log in and consume
+real tokens. Rows go in through multi-row Core INSERTs with explicit ids, then the search index
+and dashboard counters are rebuilt from the tables.
+
+The tables are dropped and rebuilt through the migrations (app.services.migrations), so the
+benchmarks see the same indexes as production; this refuses a DATABASE_URL without "bench" in
+it unless --force is given.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench_data.db")
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+PASSWORD = "bench-password"
+BATCH = 5_000
+
+STATUSES = ["Applied"] * 6 + ["Interview"] * 1 + ["Hired", "Employee", "Active"]
+JOB_TITLES = ["Support Worker", "Carer", "Nurse", "Coordinator", "Cleaner", "Driver", "Team Leader"]
+OFFER_STATUSES = ["Draft", "Sent", "Sent", "Signed", "Expired", "Cancelled"]
+
+
+def raw_token(i: int) -> str:
+    return f"bench-token-{i}"
+
+
+def _insert(conn, table, rows: list[dict]) -> None:
+    for start in range(0, len(rows), BATCH):
+        conn.execute(table.insert(), rows[start:start + BATCH])
+
+
+def _chunks(n: int):
+    for start in range(0, n, BATCH):
+        yield range(start + 1, min(n, start + BATCH) + 1)
+
+
+def seed(candidates: int, seed: int = 42, *, force: bool = False) -> dict:
+    from app import crud, models
+    from app.database import Base, engine
+    from app.services import counters, migrations, search
+    from benchmarks.harness import guard_database
+
+    guard_database(force)  # every caller drops the tables through here
+
+    rnd = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    password_hash = crud.get_password_hash(PASSWORD)  # bcrypt once, shared by every user
+    totals = {"users": 0, "candidates": 0, "profiles": 0, "offers": 0, "tokens": 0}
+
+    Base.metadata.drop_all(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE IF EXISTS alembic_version")
+    migrations.upgrade()
+    search.ensure_index()
+
+    offer_id = token_id = profile_id = 0
+    with engine.begin() as conn:
+        for ids in _chunks(candidates):
+            users, cands, profiles, offers, tokens = [], [], [], [], []
+            for i in ids:
+                users.append({"id": i, "username": f"bench{i}", "email": f"bench{i}@example.com",
+                              "hashed_password": password_hash})
+                cands.append({
+                    "id": i, "first_name": f"First{i}", "last_name": f"Last{i % 997}",
+                    "email": f"bench{i}@example.com", "mobile": f"04{i:08d}",
+                    "job_title": rnd.choice(JOB_TITLES), "address": f"{i} Bench St",
+                    "status": rnd.choice(STATUSES), "applied_on": now - timedelta(minutes=rnd.randrange(2 * 365 * 24 * 60)),
+                    "user_id": i,
+                })
+                if rnd.random() < 0.5:
+                    profile_id += 1
+                    profiles.append({"id": profile_id, "candidate_id": i, "summary": "Synthetic profile",
+                                     "skills": "first aid, manual handling", "linkedin": None, "address": None})
+                if rnd.random() < 0.3:
+                    offer_id += 1
+                    status = rnd.choice(OFFER_STATUSES)
+                    expire_at = now + timedelta(days=rnd.randint(-30, 30))
+                    offers.append({
+                        "id": offer_id, "candidate_id": i, "job_title": cands[-1]["job_title"], "salary": "$35/h",
+                        "start_date": now + timedelta(days=14), "expire_at": expire_at,
+                        "status": models.OfferStatus(status),
+                        "html_body_z": None, "html_body_sha256": None, "pdf_path": None, "pdf_sha256": None,
+                        "signed_at": now if status == "Signed" else None,
+                        "signed_by_name": f"First{i} Last{i % 997}" if status == "Signed" else None,
+                        "created_at": now, "updated_at": now,
+                    })
+                    if status in ("Sent", "Signed", "Expired"):
+                        token_id += 1
+                        tokens.append({
+                            "id": token_id, "offer_id": offer_id,
+                            "token_hash": crud._hash_token(raw_token(token_id)),
+                            "expires_at": expire_at,
+                            "used_at": now if status == "Signed" else None,
+                            "created_at": now,
+                        })
+            _insert(conn, models.User.__table__, users)
+            _insert(conn, models.Candidate.__table__, cands)
+            _insert(conn, models.CandidateProfile.__table__, profiles)
+            _insert(conn, models.Offer.__table__, offers)
+            _insert(conn, models.OfferSignatureToken.__table__, tokens)
+            totals["users"] += len(users)
+            totals["candidates"] += len(cands)
+            totals["profiles"] += len(profiles)
+            totals["offers"] += len(offers)
+            totals["tokens"] += len(tokens)
+
+    search.rebuild_index()
+    counters.reconcile()
+    return totals
+
+
+def parse_scale(value: str) -> int:
+    return SCALES.get(value.lower()) or int(value)
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", default="1k", help=f"{' | '.join(SCALES)} or a candidate count")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--force", action="store_true", help="allow a DATABASE_URL without 'bench' in it")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    totals = seed(parse_scale(args.scale), args.seed, force=args.force)
+    print(f"seeded {totals} in {time.perf_counter() - started:.1f}s")
+    return totals
+
+
+if __name__ == "__main__":
+    main()
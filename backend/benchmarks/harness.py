@@ -0,0 +1,115 @@
+# backend/benchmarks/harness.py
+"""
+Shared timing + JSON output for bench_crud / bench_routes, the "is this a bench database" guard
+for everything that drops tables, and a comparer for two result files:
+
+    python -m benchmarks.harness compare before.json after.json [--threshold 10]
+
+Result files carry the commit, scale and Python version, so runs from different commits can be
+lined up by benchmark name.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+
+def measure(name: str, fn: Callable[[], object], *, repeat: int = 200, warmup: int = 10, **extra) -> dict:
+    """Call fn `warmup` + `repeat` times; latency stats in microseconds over the timed calls."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    pct = lambda p: samples[min(len(samples) - 1, int(len(samples) * p))]
+    row = {
+        "name": name,
+        "repeat": repeat,
+        "mean_us": round(statistics.fmean(samples), 1),
+        "p50_us": round(statistics.median(samples), 1),
+        "p95_us": round(pct(0.95), 1),
+        "max_us": round(samples[-1], 1),
+        "ops_per_sec": round(1e6 / statistics.fmean(samples), 1),
+        **extra,
+    }
+    print(f"{name:<48} p50={row['p50_us']:>10.1f}us  p95={row['p95_us']:>10.1f}us  {row['ops_per_sec']:>10.1f} ops/s")
+    return row
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def guard_database(force: bool = False) -> str:
+    """
+    The DATABASE_URL a benchmark is about to drop and rebuild. Exits unless it has "bench" in it
+    (or `force`): an exported dev or production URL must never be wiped by a benchmark run.
+    """
+    url = os.environ["DATABASE_URL"]
+    if "bench" not in url and not force:
+        sys.exit(f"refusing to drop and reseed {url!r}: use a bench database or pass --force")
+    return url
+
+
+def write_json(path: str, suite: str, results: list[dict], **meta) -> None:
+    payload = {
+        "suite": suite,
+        "commit": _git_commit(),
+        "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        **meta,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+    print(f"wrote {len(results)} results to {path}")
+
+
+def compare(before_path: str, after_path: str, threshold: float = 10.0) -> int:
+    """Print p50 change per benchmark; returns the number of regressions beyond `threshold` %."""
+    with open(before_path) as f:
+        before = {r["name"]: r for r in json.load(f)["results"]}
+    with open(after_path) as f:
+        after_doc = json.load(f)
+    regressions = 0
+    for row in after_doc["results"]:
+        old = before.get(row["name"])
+        if not old or not old["p50_us"]:
+            print(f"{row['name']:<48} new")
+            continue
+        change = (row["p50_us"] - old["p50_us"]) / old["p50_us"] * 100
+        flag = ""
+        if change > threshold:
+            flag, regressions = "  REGRESSION", regressions + 1
+        print(f"{row['name']:<48} {old['p50_us']:>10.1f} -> {row['p50_us']:>10.1f}us  {change:+6.1f}%{flag}")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.harness")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("compare", help="compare two result files by benchmark name")
+    p.add_argument("before")
+    p.add_argument("after")
+    p.add_argument("--threshold", type=float, default=10.0, help="p50 slowdown (%%) counted as a regression")
+    args = parser.parse_args(argv)
+    return 1 if compare(args.before, args.after, args.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+# backend/migrations/env.py
+"""Alembic environment: the app's engine and models, so revisions see the same DATABASE_URL."""
+from logging.config import fileConfig
+
+from alembic import context
+
+from app import models  # noqa: F401  (registers every table on Base.metadata)
+from app.database import Base, engine
+
+if context.config.config_file_name:
+    fileConfig(context.config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    # tables the models don't know about (the search index, alembic's own) are not ours to drop
+    return not (type_ == "table" and reflected and compare_to is None)
+
+
+def _configure(**kwargs) -> None:
+    context.configure(
+        target_metadata=target_metadata,
+        include_object=include_object,
+        # SQLite can't ALTER most things; batch mode rebuilds the table instead
+        render_as_batch=engine.dialect.name == "sqlite",
+        compare_type=True,
+        # a revision that commits as it goes (autocommit_block) is recorded as soon as it finishes,
+        # not only once the whole upgrade does
+        transaction_per_migration=True,
+        **kwargs,
+    )
+
+
+def run_migrations_offline() -> None:
+    """`--sql` mode: print the DDL instead of running it."""
+    _configure(url=engine.url, literal_binds=True, dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    with engine.connect() as connection:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,103 @@
+"""baseline: the schema create_all() used to build at startup
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+
+The five tables and their indexes exactly as the models had them before migrations existed.
+Databases that already have them are stamped at this revision by `python -m app.cli db-upgrade`
+instead of running it, so everything added since belongs in a later revision.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "candidates",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("first_name", sa.String(), nullable=False),
+        sa.Column("last_name", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("mobile", sa.String(), nullable=True),
+        sa.Column("job_title", sa.String(), nullable=True),
+        sa.Column("address", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("applied_on", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+    )
+    op.create_index("ix_candidates_id", "candidates", ["id"])
+    op.create_index("ix_candidates_email", "candidates", ["email"], unique=True)
+
+    op.create_table(
+        "candidate_profiles",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("candidate_id", sa.Integer(), sa.ForeignKey("candidates.id"), nullable=False, unique=True),
+        sa.Column("summary", sa.String(), nullable=True),
+        sa.Column("skills", sa.String(), nullable=True),
+        sa.Column("linkedin", sa.String(), nullable=True),
+        sa.Column("address", sa.String(), nullable=True),
+        sa.Column("resume_path", sa.String(), nullable=True),
+        sa.Column("photo_path", sa.String(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_candidate_profiles_id", "candidate_profiles", ["id"])
+
+    op.create_table(
+        "offers",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("candidate_id", sa.Integer(), sa.ForeignKey("candidates.id"), nullable=False),
+        sa.Column("job_title", sa.String(200), nullable=False),
+        sa.Column("salary", sa.String(100), nullable=True),
+        sa.Column("start_date", sa.DateTime(), nullable=True),
+        sa.Column("expire_at", sa.DateTime(), nullable=True),
+        sa.Column(
+            "status",
+            sa.Enum("DRAFT", "SENT", "SIGNED", "EXPIRED", "CANCELLED", name="offerstatus"),
+            nullable=False,
+        ),
+        sa.Column("html_body", sa.Text(), nullable=True),
+        sa.Column("pdf_path", sa.String(500), nullable=True),
+        sa.Column("signed_pdf_path", sa.String(500), nullable=True),
+        sa.Column("signed_at", sa.DateTime(), nullable=True),
+        sa.Column("signed_by_name", sa.String(200), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_offers_id", "offers", ["id"])
+    op.create_index("ix_offers_candidate_id", "offers", ["candidate_id"])
+
+    op.create_table(
+        "offer_signature_tokens",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("offer_id", sa.Integer(), sa.ForeignKey("offers.id"), nullable=False),
+        sa.Column("token_hash", sa.String(128), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("used_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_offer_signature_tokens_id", "offer_signature_tokens", ["id"])
+    op.create_index("ix_offer_signature_tokens_offer_id", "offer_signature_tokens", ["offer_id"])
+    op.create_index("ix_offer_signature_tokens_token_hash", "offer_signature_tokens", ["token_hash"], unique=True)
+
+
+def downgrade() -> None:
+    for table in ("offer_signature_tokens", "offers", "candidate_profiles", "candidates", "users"):
+        op.drop_table(table)
+    sa.Enum(name="offerstatus").drop(op.get_bind(), checkfirst=True)
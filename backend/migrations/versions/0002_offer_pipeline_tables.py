@@ -0,0 +1,85 @@
+"""tables and indexes the offer pipeline, outbox and counters added on top of the baseline
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+
+- offer_jobs: async offer creation progress (services.offer_pipeline)
+- email_outbox: durable outgoing mail (services.outbox)
+- counters: maintained row counts (services.counters)
+- offer_signature_tokens (expires_at), (used_at): the token sweeper's range scans
+- offers (status, expire_at): the offer-expiry sweep
+
+A database that create_all() built after some of these had been added to the models is stamped at
+0001 like any other, so each object is created only if it isn't there yet.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_offer_signature_tokens_expires_at", "offer_signature_tokens", ["expires_at"]),
+    ("ix_offer_signature_tokens_used_at", "offer_signature_tokens", ["used_at"]),
+    ("ix_offers_status_expire_at", "offers", ["status", "expire_at"]),
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "offer_jobs",
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("offer_id", sa.Integer(), sa.ForeignKey("offers.id"), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("step", sa.String(20), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index("ix_offer_jobs_offer_id", "offer_jobs", ["offer_id"], if_not_exists=True)
+    op.create_index("ix_offer_jobs_status", "offer_jobs", ["status"], if_not_exists=True)
+
+    op.create_table(
+        "email_outbox",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("kind", sa.String(50), nullable=False),
+        sa.Column("to_email", sa.String(320), nullable=False),
+        sa.Column("domain", sa.String(255), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("locked_by", sa.String(100), nullable=True),
+        sa.Column("locked_until", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index("ix_email_outbox_id", "email_outbox", ["id"], if_not_exists=True)
+    op.create_index(
+        "ix_email_outbox_status_next_attempt", "email_outbox", ["status", "next_attempt_at"], if_not_exists=True,
+    )
+
+    op.create_table(
+        "counters",
+        sa.Column("name", sa.String(200), primary_key=True),
+        sa.Column("value", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        if_not_exists=True,
+    )
+
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
+    for table in ("counters", "email_outbox", "offer_jobs"):
+        op.drop_table(table, if_exists=True)
@@ -0,0 +1,49 @@
+"""composite indexes for the admin list filters and sorts
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+
+- candidates (applied_on, id): keyset pages of /admin/candidates, /admin/applicants
+- candidates (status, applied_on): Workers view status filter + joining-date range
+- candidates (status, job_title): Workers view status + role filter, facet GROUP BY
+- candidates (user_id): the users<->candidates join, get_candidate_by_user
+- users (lower(username), id): keyset pages of /admin/users
+- offers (status, id): list_offers(status=...) newest first
+
+`python -m benchmarks.bench_plans` prints the query plans before and after this revision.
+On PostgreSQL the indexes are built CONCURRENTLY, so a large table stays writable meanwhile.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_candidates_applied_on_id", "candidates", ["applied_on", "id"]),
+    ("ix_candidates_status_applied_on", "candidates", ["status", "applied_on"]),
+    ("ix_candidates_status_job_title", "candidates", ["status", "job_title"]),
+    ("ix_candidates_user_id", "candidates", ["user_id"]),
+    ("ix_users_lower_username_id", "users", [sa.text("lower(username)"), "id"]),
+    ("ix_offers_status_id", "offers", ["status", "id"]),
+]
+
+
+def _concurrently() -> dict:
+    return {"postgresql_concurrently": True} if op.get_context().dialect.name == "postgresql" else {}
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, **_concurrently())
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, **_concurrently())
@@ -0,0 +1,88 @@
+"""offers.html_body -> zlib-compressed html_body_z + html_body_sha256
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16
+
+The body is read only for audit, yet as a Text column it came along with every Offer
+fetched. The model now defers html_body_z and (de)compresses it behind Offer.html_body;
+the hash lets an unchanged body skip the write. Existing bodies are converted BATCH rows
+per transaction, each batch clearing the column it read from, so a run that stops partway picks up
+where it left off when it is run again.
+"""
+import hashlib
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+BATCH = 500
+
+offers = sa.table(
+    "offers",
+    sa.column("id", sa.Integer()),
+    sa.column("html_body", sa.Text()),
+    sa.column("html_body_z", sa.LargeBinary()),
+    sa.column("html_body_sha256", sa.String(64)),
+)
+
+
+def _missing(*columns: str) -> list[str]:
+    """The given offers columns that aren't there yet (left over from an interrupted run)."""
+    have = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("offers")}
+    return [c for c in columns if c not in have]
+
+
+def _convert(source, write) -> None:
+    """Page through offers with a non-null `source` column by id, `write` each batch and commit it."""
+    last_id = 0
+    while True:
+        conn = op.get_bind()
+        rows = conn.execute(
+            sa.select(offers.c.id, source).where(offers.c.id > last_id, source.isnot(None))
+            .order_by(offers.c.id).limit(BATCH)
+        ).all()
+        if not rows:
+            break
+        conn.execute(offers.update().where(offers.c.id == sa.bindparam("b_id")), [write(r) for r in rows])
+        last_id = rows[-1][0]
+        # entering the block commits the migration's transaction; leaving it begins the next one
+        with op.get_context().autocommit_block():
+            pass
+
+
+def upgrade() -> None:
+    types = {"html_body_z": sa.LargeBinary(), "html_body_sha256": sa.String(64)}
+    with op.batch_alter_table("offers") as batch:
+        for name in _missing(*types):
+            batch.add_column(sa.Column(name, types[name], nullable=True))
+
+    def pack(row):
+        raw = row[1].encode("utf-8")
+        return {
+            "b_id": row[0], "html_body": None,
+            "html_body_z": zlib.compress(raw, 6), "html_body_sha256": hashlib.sha256(raw).hexdigest(),
+        }
+
+    _convert(offers.c.html_body, pack)
+    with op.batch_alter_table("offers") as batch:
+        batch.drop_column("html_body")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("offers") as batch:
+        for name in _missing("html_body"):
+            batch.add_column(sa.Column(name, sa.Text(), nullable=True))
+
+    def unpack(row):
+        return {"b_id": row[0], "html_body": zlib.decompress(row[1]).decode("utf-8"), "html_body_z": None}
+
+    _convert(offers.c.html_body_z, unpack)
+    with op.batch_alter_table("offers") as batch:
+        batch.drop_column("html_body_sha256")
+        batch.drop_column("html_body_z")
@@ -0,0 +1,27 @@
+"""offers.pdf_sha256: hash of the issued PDF, for tamper evidence when it is signed
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16
+
+Signing now stamps the stored original (services.signing) rather than re-rendering it; the hash
+taken at issuance is checked before stamping and printed on the signature page. Offers issued
+before this revision keep NULL and are hashed when they are signed.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("offers") as batch:
+        batch.add_column(sa.Column("pdf_sha256", sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("offers") as batch:
+        batch.drop_column("pdf_sha256")
@@ -0,0 +1,94 @@
+# backend/tests/conftest.py
+"""
+Shared fixtures: the app against a throwaway SQLite database and storage directory.
+
+The environment is set before anything under app/ is imported, since app.database and the
+services read their configuration at import time.
+"""
+import os
+import tempfile
+import threading
+
+import pytest
+
+_TMP = tempfile.mkdtemp(prefix="intake-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP}/test.db"
+os.environ["STORAGE_DIR"] = os.path.join(_TMP, "storage")
+os.environ["PDF_RENDERER"] = "stub"
+os.environ["PDF_STUB_MS"] = "1"
+os.environ["PDF_ENGINE"] = "inline"
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    from app.database import Base, engine
+    from app.main import app
+    from app.services import migrations, search
+
+    Base.metadata.drop_all(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE IF EXISTS alembic_version")
+    migrations.upgrade()
+    search.ensure_index()
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def candidate(client):
+    """A fresh user + candidate pair; returns (user_id, candidate_id)."""
+    return make_candidate()
+
+
+def make_candidate():
+    from app import models
+    from app.database import SessionLocal
+
+    with SessionLocal() as db:
+        n = db.query(models.User).count() + 1
+        user = models.User(username=f"test{n}", email=f"test{n}@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        cand = models.Candidate(first_name="Test", last_name=f"User{n}", email=f"test{n}@example.com", user_id=user.id)
+        db.add(cand)
+        db.commit()
+        return user.id, cand.id
+
+
+class SqlCounter:
+    """Cursor executes and commits on the sync and async engines, outside the offer-pipeline threads."""
+
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+
+    @staticmethod
+    def _background() -> bool:
+        return threading.current_thread().name.startswith("offer-pipeline")
+
+    def on_execute(self, *args, **kwargs):
+        if not self._background():
+            self.statements += 1
+
+    def on_commit(self, *args, **kwargs):
+        if not self._background():
+            self.commits += 1
+
+
+@pytest.fixture
+def count_sql(client):
+    from sqlalchemy import event
+
+    from app.database import async_engine, engine
+
+    counter = SqlCounter()
+    engines = (engine, async_engine.sync_engine)
+    for e in engines:
+        event.listen(e, "before_cursor_execute", counter.on_execute)
+        event.listen(e, "commit", counter.on_commit)
+    yield counter
+    for e in engines:
+        event.remove(e, "before_cursor_execute", counter.on_execute)
+        event.remove(e, "commit", counter.on_commit)
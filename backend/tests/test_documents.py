@@ -0,0 +1,78 @@
+# backend/tests/test_documents.py
+"""
+Deferred offer-document writes (OFFER_DEFER_WRITES): held until the session that stores the key
+commits, dropped on rollback, and unlinked from the offer again if the write fails.
+"""
+import pytest
+
+
+@pytest.fixture
+def offer_id(client, candidate):
+    response = client.post("/api/admin/offers", json={"candidate_id": candidate[1], "job_title": "Support Worker"})
+    assert response.status_code < 400, response.text
+    return response.json()["id"]
+
+
+@pytest.fixture
+def puts(monkeypatch):
+    """Keys passed to storage put(), which fails for any key ending in "_broken.pdf"."""
+    from app.services import storage
+
+    store, seen = storage.get_storage(), []
+    real_put = store.put
+
+    def put(key, data):
+        seen.append(key)
+        if key.endswith("_broken.pdf"):
+            raise storage.StorageError("disk full")
+        return real_put(key, data)
+
+    monkeypatch.setattr(store, "put", put)
+    return seen
+
+
+def _store(offer_id, suffix, *, commit):
+    from app import crud, models
+    from app.database import SessionLocal
+    from app.services import documents
+
+    with SessionLocal() as db:
+        offer = db.get(models.Offer, offer_id)
+        key = documents.store_offer_files(offer_id, suffix=suffix, pdf=b"%PDF-1.4 test", defer=True, db=db)
+        crud.update_offer_files(db, offer=offer, pdf_path=key, pdf_sha256="0" * 64, commit=False)
+        if commit:
+            db.commit()
+        else:
+            db.rollback()
+    documents.flush_writes()
+    return key
+
+
+def _offer(offer_id):
+    from app import models
+    from app.database import SessionLocal
+
+    with SessionLocal() as db:
+        return db.get(models.Offer, offer_id)
+
+
+def test_deferred_write_lands_after_commit(offer_id, puts):
+    key = _store(offer_id, "reissued", commit=True)
+
+    assert puts == [key]
+    assert _offer(offer_id).pdf_path == key
+
+
+def test_deferred_write_dropped_on_rollback(offer_id, puts):
+    _store(offer_id, "reissued", commit=False)
+
+    assert puts == []
+
+
+def test_failed_deferred_write_unlinks_the_pdf(offer_id, puts):
+    key = _store(offer_id, "broken", commit=True)
+
+    assert puts == [key]
+    offer = _offer(offer_id)
+    assert offer.pdf_path is None
+    assert offer.pdf_sha256 is None
@@ -0,0 +1,66 @@
+# backend/tests/test_files.py
+"""
+GET /files/{key}: uploads are served to anyone, offer documents only with that offer's signing token.
+"""
+import pytest
+
+
+@pytest.fixture
+def offer(client, candidate):
+    """A sent offer with its PDF in storage; returns (offer_id, pdf key)."""
+    _user_id, cand_id = candidate
+    response = client.post("/api/admin/offers", json={"candidate_id": cand_id, "job_title": "Support Worker"})
+    assert response.status_code < 400, response.text
+    body = response.json()
+    assert body["pdf_path"], body
+    return body["id"], body["pdf_path"]
+
+
+def _token(offer_id, **kwargs):
+    from app import crud
+    from app.database import SessionLocal
+
+    with SessionLocal() as db:
+        return crud.create_signature_token(db, offer_id, **kwargs)
+
+
+def test_offer_file_refused_without_token(client, offer):
+    _offer_id, key = offer
+
+    assert client.get(f"/files/{key}").status_code == 404
+    assert client.get(f"/files/{key}", params={"token": "not-a-token"}).status_code == 404
+
+
+def test_offer_file_refused_with_another_offers_token(client, offer, candidate):
+    _offer_id, key = offer
+    other_id = client.post(
+        "/api/admin/offers", json={"candidate_id": candidate[1], "job_title": "Support Worker"}
+    ).json()["id"]
+
+    assert client.get(f"/files/{key}", params={"token": _token(other_id)}).status_code == 404
+
+
+def test_offer_file_refused_with_expired_token(client, offer):
+    offer_id, key = offer
+
+    assert client.get(f"/files/{key}", params={"token": _token(offer_id, ttl_hours=-1)}).status_code == 404
+
+
+def test_offer_file_served_with_its_token(client, offer):
+    offer_id, key = offer
+
+    response = client.get(f"/files/{key}", params={"token": _token(offer_id)})
+
+    assert response.status_code == 200
+    assert response.content.startswith(b"%PDF")
+
+
+def test_uploads_served_without_token(client):
+    from app.services import storage
+
+    key = storage.get_storage().put("uploads/" + "ab" * 32 + ".txt", b"resume")
+
+    response = client.get(f"/files/{key}")
+
+    assert response.status_code == 200
+    assert response.content == b"resume"
@@ -0,0 +1,84 @@
+# backend/tests/test_offer_batch.py
+"""
+POST /api/admin/offers/batch: items fail individually, and a failed item is Cancelled with no
+token or mail left behind.
+"""
+from tests.conftest import make_candidate
+
+
+def _batch(client, n):
+    cand_ids = [make_candidate()[1] for _ in range(n)]
+    response = client.post(
+        "/api/admin/offers/batch", json=[{"candidate_id": c, "job_title": "Support Worker"} for c in cand_ids],
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _state(offer_id):
+    from app import models
+    from app.database import SessionLocal
+
+    with SessionLocal() as db:
+        offer = db.get(models.Offer, offer_id)
+        tokens = db.query(models.OfferSignatureToken).filter_by(offer_id=offer_id).count()
+        return offer.status, offer.pdf_path, tokens
+
+
+def _outbox_rows():
+    from app import models
+    from app.database import SessionLocal
+
+    with SessionLocal() as db:
+        return db.query(models.OutboxEmail).filter_by(kind="offer").count()
+
+
+def test_storage_error_cancels_only_that_offer(client, monkeypatch):
+    from app.services import storage
+
+    store = storage.get_storage()
+    real_put, calls = store.put, []
+
+    def put(key, data):
+        calls.append(key)
+        if len(calls) == 2:
+            raise OSError("disk full")
+        return real_put(key, data)
+
+    monkeypatch.setattr(store, "put", put)
+    mails = _outbox_rows()
+
+    body = _batch(client, 3)
+
+    assert (body["created"], body["failed"]) == (2, 1)
+    ok, broken, ok_too = body["results"]
+    assert broken["status"] == "Cancelled" and "disk full" in broken["error"]
+    status, pdf_path, tokens = _state(broken["offer_id"])
+    assert (status.value, pdf_path, tokens) == ("Cancelled", None, 0)
+    for item in (ok, ok_too):
+        status, pdf_path, tokens = _state(item["offer_id"])
+        assert (status.value, pdf_path, tokens) == ("Sent", item["pdf_path"], 1)
+    assert _outbox_rows() == mails + 2
+
+
+def test_missing_pdf_cancels_the_offer(client, monkeypatch):
+    from app.services import offer_pipeline
+
+    real_render = offer_pipeline.render_original
+
+    class NoPdf:
+        def result(self):
+            return None
+
+    def render_original(**kwargs):
+        html, _job = real_render(**kwargs)
+        return html, NoPdf()
+
+    monkeypatch.setattr(offer_pipeline, "render_original", render_original)
+
+    body = _batch(client, 1)
+
+    (item,) = body["results"]
+    assert not item["ok"] and item["status"] == "Cancelled"
+    status, pdf_path, tokens = _state(item["offer_id"])
+    assert (status.value, pdf_path, tokens) == ("Cancelled", None, 0)
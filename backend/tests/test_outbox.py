@@ -0,0 +1,89 @@
+# backend/tests/test_outbox.py
+"""
+Invite mails: the outbox never stores the temporary password; the sender mints it at send time.
+"""
+import json
+
+import pytest
+
+
+@pytest.fixture
+def sent_invites(monkeypatch):
+    """(to_email, temp_password) per invite the mailer was asked to send; offer mails are dropped."""
+    from app.services import mailer
+
+    sent = []
+    monkeypatch.setattr(mailer, "send_invite_email", lambda to, _name, password: sent.append((to, password)))
+    monkeypatch.setattr(mailer, "send_offer_email", lambda **_kwargs: None)
+    return sent
+
+
+def _invite_row(email):
+    from app import models
+    from app.database import SessionLocal
+
+    with SessionLocal() as db:
+        return db.query(models.OutboxEmail).filter_by(kind="invite", to_email=email).one()
+
+
+def _password_ok(email, password):
+    from app import crud, models
+    from app.database import SessionLocal
+
+    with SessionLocal() as db:
+        user = db.query(models.User).filter_by(email=email).one()
+        return crud.verify_password(password, user.hashed_password)
+
+
+def test_new_user_invite_stores_no_password(client, sent_invites):
+    from app.services import outbox
+
+    response = client.post(
+        "/admin/users/new",
+        data={"username": "invitee1", "email": "invitee1@example.com", "first_name": "In"},
+        follow_redirects=False,
+    )
+    assert response.status_code == 303
+    row = _invite_row("invitee1@example.com")
+    assert "temp_password" not in json.loads(row.payload)
+
+    outbox.run_worker(once=True)
+
+    ((to, password),) = sent_invites
+    assert to == "invitee1@example.com"
+    assert _password_ok(to, password)
+    assert _invite_row(to).status == "sent"
+
+
+def test_dead_invite_is_scrubbed_and_requeued_with_a_new_password(client, sent_invites, monkeypatch):
+    from app import models
+    from app.database import SessionLocal
+    from app.services import mailer, outbox
+    from tests.conftest import make_candidate
+
+    user_id, _cand_id = make_candidate()
+    with SessionLocal() as db:
+        email = db.get(models.User, user_id).email
+        # queued before the sender minted passwords: the credential is in the payload
+        outbox.enqueue(db, "invite", email, first_name="Old", temp_password="plain-text")
+        db.commit()
+
+    def fail(*_args):
+        raise RuntimeError("smtp down")
+
+    monkeypatch.setattr(mailer, "send_invite_email", fail)
+    monkeypatch.setattr(outbox, "MAX_ATTEMPTS", 1)
+    outbox.run_worker(once=True)
+
+    row = _invite_row(email)
+    assert row.status == "dead"
+    assert "temp_password" not in json.loads(row.payload)
+
+    monkeypatch.setattr(mailer, "send_invite_email", lambda to, _name, password: sent_invites.append((to, password)))
+    with SessionLocal() as db:
+        outbox.requeue_dead(db)
+    outbox.run_worker(once=True)
+
+    ((to, password),) = sent_invites
+    assert password != "plain-text"
+    assert _password_ok(email, password)
@@ -0,0 +1,51 @@
+# backend/tests/test_signing.py
+"""
+offer_pipeline.sign_offer: stamps a Sent offer once and refuses every other status.
+"""
+import pytest
+
+
+@pytest.fixture
+def offer_id(client, candidate):
+    response = client.post("/api/admin/offers", json={"candidate_id": candidate[1], "job_title": "Support Worker"})
+    assert response.status_code < 400, response.text
+    return response.json()["id"]
+
+
+def _sign(offer_id):
+    from app import models
+    from app.database import SessionLocal
+    from app.services import offer_pipeline
+
+    with SessionLocal() as db:
+        offer = offer_pipeline.sign_offer(db, db.get(models.Offer, offer_id), signer_name="Test Signer")
+        return offer.status, offer.signed_pdf_path
+
+
+def test_sent_offer_is_signed_once(offer_id):
+    from app.services import storage
+
+    status, key = _sign(offer_id)
+    signed = storage.get_storage().get(key)
+
+    assert status.value == "Signed"
+    with pytest.raises(ValueError, match="only a Sent offer"):
+        _sign(offer_id)
+    assert storage.get_storage().get(key) == signed
+
+
+@pytest.mark.parametrize("status", ["DRAFT", "EXPIRED", "CANCELLED"])
+def test_unsent_offer_is_refused(offer_id, status):
+    from app import models
+    from app.database import SessionLocal
+
+    with SessionLocal() as db:
+        db.get(models.Offer, offer_id).status = models.OfferStatus[status]
+        db.commit()
+
+    with pytest.raises(ValueError, match="only a Sent offer"):
+        _sign(offer_id)
+    with SessionLocal() as db:
+        offer = db.get(models.Offer, offer_id)
+        assert offer.status == models.OfferStatus[status]
+        assert offer.signed_pdf_path is None
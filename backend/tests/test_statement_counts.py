@@ -0,0 +1,57 @@
+# backend/tests/test_statement_counts.py
+"""
+Statement and commit budgets for the offer and profile write paths (the unit-of-work mode in
+app.crud): an N+1 or a commit per crud call pushes a request over its budget. Same budgets as
+benchmarks/bench_statements.py.
+"""
+import pytest
+
+from benchmarks.bench_statements import BUDGETS
+
+
+def _post_offer(client, ids, query=""):
+    _user_id, cand_id = ids
+    return client.post(f"/api/admin/offers{query}", json={"candidate_id": cand_id, "job_title": "Support Worker"})
+
+
+def _post_profile(client, ids):
+    user_id, _cand_id = ids
+    return client.post(
+        f"/portal/profile/admin/{user_id}",
+        data={"summary": "s", "skills": "k", "job_title": "Support Worker"},
+        follow_redirects=False,
+    )
+
+
+@pytest.mark.parametrize(
+    "route, send",
+    [
+        ("POST /api/admin/offers", lambda client, ids: _post_offer(client, ids)),
+        ("POST /api/admin/offers?async=1", lambda client, ids: _post_offer(client, ids, "?async=1")),
+        ("POST /portal/profile/admin/{id}", _post_profile),
+    ],
+)
+def test_write_path_within_budget(client, candidate, count_sql, route, send):
+    max_statements, max_commits = BUDGETS[route]
+
+    response = send(client, candidate)
+
+    assert response.status_code < 400, response.text
+    assert count_sql.statements <= max_statements, f"{route}: {count_sql.statements} statements"
+    assert count_sql.commits <= max_commits, f"{route}: {count_sql.commits} commits"
+
+
+def test_sync_offer_commits_once_after_the_draft(client, candidate, count_sql):
+    from app import models
+    from app.database import SessionLocal
+
+    response = _post_offer(client, candidate)
+
+    assert response.status_code == 200, response.text
+    # the Draft insert, then html/pdf/token/outbox/Sent together
+    assert count_sql.commits == 2
+    with SessionLocal() as db:
+        offer = db.get(models.Offer, response.json()["id"])
+        assert offer.status == models.OfferStatus.SENT
+        assert db.query(models.OfferSignatureToken).filter_by(offer_id=offer.id).count() == 1
+        assert db.query(models.OutboxEmail).filter_by(kind="offer").count() >= 1
@@ -0,0 +1,53 @@
+# backend/tests/test_storage.py
+"""
+storage-migrate: paths saved before app.services.storage map to the keys their files are moved to.
+"""
+import pytest
+
+
+def test_legacy_key_maps_absolute_paths():
+    from app.services.storage import legacy_key
+
+    assert legacy_key("/srv/app/backend/uploads/12/resume.pdf") == "uploads/12/resume.pdf"
+    assert legacy_key("C:\\app\\backend\\uploads\\12\\photo.png") == "uploads/12/photo.png"
+    assert legacy_key("/srv/app/backend/generated/offers/offer_3_orig.pdf") == "offers/offer_3_orig.pdf"
+    assert legacy_key("uploads/" + "ab" * 32 + ".pdf") is None
+    assert legacy_key("offers/offer_3_orig.pdf") is None
+
+
+def test_legacy_key_refuses_unknown_paths():
+    from app.services.storage import StorageError, legacy_key
+
+    with pytest.raises(StorageError):
+        legacy_key("/srv/elsewhere/resume.pdf")
+
+
+def test_migrate_moves_a_baseline_upload(client, candidate, tmp_path, monkeypatch):
+    from app import models
+    from app.database import SessionLocal
+    from app.services import storage
+
+    backend = tmp_path / "backend"
+    monkeypatch.setattr(storage, "BACKEND_DIR", backend)
+    monkeypatch.setattr(storage, "LEGACY_OFFERS_DIR", backend / "generated" / "offers")
+    monkeypatch.setattr(storage, "LEGACY_UPLOADS_DIR", backend / "uploads")
+    _user_id, cand_id = candidate
+    # what the baseline upload handler saved: the file under backend/uploads/<candidate id>/, and
+    # str() of its absolute path
+    legacy = backend / "uploads" / str(cand_id) / "resume.pdf"
+    legacy.parent.mkdir(parents=True)
+    legacy.write_bytes(b"%PDF-1.4 resume")
+    with SessionLocal() as db:
+        db.add(models.CandidateProfile(candidate_id=cand_id, resume_path=str(legacy)))
+        db.commit()
+
+    totals = storage.migrate_legacy()
+
+    key = f"uploads/{cand_id}/resume.pdf"
+    assert totals["files"] == 1 and totals["unrecognised"] == 0
+    with SessionLocal() as db:
+        profile = db.query(models.CandidateProfile).filter_by(candidate_id=cand_id).one()
+        assert profile.resume_path == key
+    assert not legacy.exists()
+    assert storage.url(key) == f"/files/{key}"
+    assert client.get(f"/files/{key}").content == b"%PDF-1.4 resume"